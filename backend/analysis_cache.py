@@ -0,0 +1,97 @@
+import hashlib
+import json
+import re
+import unicodedata
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+
+
+def normalize_resume_text(text: str) -> str:
+    text = unicodedata.normalize("NFKC", text)
+    return re.sub(r"\s+", " ", text).strip().lower()
+
+
+def catalog_stamp(jobs: List[Dict]) -> str:
+    # Fingerprint of the candidate jobs offered to the model. Posting, editing or
+    # removing any job that would be in the prompt changes the stamp.
+    fields = [
+        [job["id"], job["title"], job["category"], job["city"], job["country"], job["description"]]
+        for job in jobs
+    ]
+    return hashlib.sha256(json.dumps(fields).encode()).hexdigest()
+
+
+class ResumeAnalysisCache:
+    # Persistent cache of resume analyses in the resume_analyses collection, keyed by
+    # the hash of the normalized resume text plus the catalog stamp of the candidate
+    # jobs. Entries expire through a TTL index on expires_at; once the collection
+    # grows past max_entries the oldest entries are deleted.
+
+    def __init__(self, db, ttl_seconds: float = 7 * 24 * 3600, max_entries: int = 50000):
+        self.db = db
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0 and self.ttl_seconds > 0
+
+    def key(self, resume_text: str, jobs: List[Dict]) -> str:
+        resume_hash = hashlib.sha256(normalize_resume_text(resume_text).encode()).hexdigest()
+        return f"{resume_hash}:{catalog_stamp(jobs)}"
+
+    async def get(self, key: str) -> Optional[Dict]:
+        if not self.enabled:
+            return None
+        # The TTL monitor only runs once a minute, so check expiry here as well
+        entry = await self.db.resume_analyses.find_one(
+            {"_id": key, "expires_at": {"$gt": datetime.now(timezone.utc)}}
+        )
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry
+
+    async def put(self, key: str, analysis: str, recommended_job_ids: List[str]) -> None:
+        if not self.enabled:
+            return
+        now = datetime.now(timezone.utc)
+        await self.db.resume_analyses.replace_one(
+            {"_id": key},
+            {
+                "analysis": analysis,
+                "recommended_job_ids": recommended_job_ids,
+                "created_at": now,
+                "expires_at": now + timedelta(seconds=self.ttl_seconds),
+            },
+            upsert=True,
+        )
+        self.stores += 1
+        await self._evict_overflow()
+
+    async def _evict_overflow(self) -> None:
+        overflow = await self.db.resume_analyses.estimated_document_count() - self.max_entries
+        if overflow <= 0:
+            return
+        oldest = await self.db.resume_analyses.find({}, {"_id": 1}).sort("created_at", 1).limit(overflow).to_list(overflow)
+        result = await self.db.resume_analyses.delete_many({"_id": {"$in": [entry["_id"] for entry in oldest]}})
+        self.evictions += result.deleted_count
+
+    def stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "ttl_seconds": self.ttl_seconds,
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "stores": self.stores,
+            "evictions": self.evictions,
+        }
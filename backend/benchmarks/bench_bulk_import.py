@@ -0,0 +1,131 @@
+import argparse
+import asyncio
+import json
+import sys
+import time
+import tracemalloc
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+# Only server's JobCreate model is used here
+from bulk_import import BulkJobImporter, iter_lines, ndjson_rows  # noqa: E402
+from server import JobCreate  # noqa: E402
+from synthetic import make_jobs  # noqa: E402
+
+# Throughput of /api/job/bulk's import pipeline (streamed NDJSON -> JobCreate
+# validation -> unordered insert_many batches) against one insert_one per job, as
+# post_job does, in jobs/second. Also reports the peak memory allocated while
+# importing, which should stay flat as the upload grows.
+#
+# Runs against mongomock_motor (pip install mongomock-motor) unless --mongo-url
+# points at a real server, where a throwaway database is created and dropped.
+# mongomock adds --latency-ms per call to stand in for the round trip to mongod,
+# and keeps the inserted jobs in memory, so its peak grows with --jobs.
+#
+#   python benchmarks/bench_bulk_import.py --jobs 1000 10000 --batch-sizes 100 500 1000
+
+CHUNK_BYTES = 64 * 1024
+
+FIELDS = list(JobCreate.model_fields)
+
+
+def make_job(fields):
+    job = JobCreate.model_validate(fields).model_dump()
+    job.update(id=str(uuid.uuid4()), expired=False, job_posted_on=datetime.now(timezone.utc), posted_by="bench")
+    return job
+
+
+def ndjson_lines(count: int):
+    for job in make_jobs(count):
+        yield json.dumps({field: job[field] for field in FIELDS}) + "\n"
+
+
+async def body_chunks(count: int):
+    # Generated on the fly, like a client streaming a file, in CHUNK_BYTES pieces
+    buffer = ""
+    for line in ndjson_lines(count):
+        buffer += line
+        if len(buffer) >= CHUNK_BYTES:
+            yield buffer.encode()
+            buffer = ""
+    if buffer:
+        yield buffer.encode()
+
+
+class RoundTripLatency:
+    def __init__(self, collection, seconds: float):
+        self.collection = collection
+        self.seconds = seconds
+
+    async def insert_one(self, document):
+        await asyncio.sleep(self.seconds)
+        return await self.collection.insert_one(document)
+
+    async def insert_many(self, documents, **kwargs):
+        await asyncio.sleep(self.seconds)
+        return await self.collection.insert_many(documents, **kwargs)
+
+
+async def one_by_one(jobs, count: int) -> int:
+    created = 0
+    async for _, fields, _ in ndjson_rows(iter_lines(body_chunks(count))):
+        await jobs.insert_one(make_job(fields))
+        created += 1
+    return created
+
+
+async def bulk(jobs, count: int, batch_size: int) -> int:
+    importer = BulkJobImporter(jobs, batch_size=batch_size, max_rows=count)
+    summary = None
+    async for entry in importer.run(ndjson_rows(iter_lines(body_chunks(count))), make_job):
+        summary = entry.get("summary", summary)
+    return summary["created"]
+
+
+async def measure(db, run):
+    await db.jobs.delete_many({})
+    tracemalloc.start()
+    started = time.perf_counter()
+    created = await run()
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return created / elapsed, peak / 1024 / 1024
+
+
+async def main(args):
+    if args.mongo_url:
+        from motor.motor_asyncio import AsyncIOMotorClient
+        client = AsyncIOMotorClient(args.mongo_url)
+        db = client[f"bench_bulk_import_{uuid.uuid4().hex[:8]}"]
+        jobs = db.jobs
+    else:
+        from mongomock_motor import AsyncMongoMockClient
+        client = AsyncMongoMockClient()
+        db = client["bench_bulk_import"]
+        jobs = RoundTripLatency(db.jobs, args.latency_ms / 1000)
+
+    print(f"{'jobs':>8}{'mode':>14}{'jobs/s':>12}{'peak MiB':>10}")
+    try:
+        for count in args.jobs:
+            modes = [("insert_one", lambda: one_by_one(jobs, count))]
+            modes += [(f"bulk/{size}", lambda size=size: bulk(jobs, count, size)) for size in args.batch_sizes]
+            for mode, run in modes:
+                rate, peak = await measure(db, run)
+                print(f"{count:>8}{mode:>14}{rate:>12.0f}{peak:>10.1f}")
+    finally:
+        if args.mongo_url:
+            await client.drop_database(db.name)
+        client.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--jobs", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[100, 500, 1000])
+    parser.add_argument("--mongo-url", default=None)
+    parser.add_argument("--latency-ms", type=float, default=0.5)
+    asyncio.run(main(parser.parse_args()))
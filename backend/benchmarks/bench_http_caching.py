@@ -0,0 +1,73 @@
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import httpx
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from mongomock_motor import AsyncMongoMockClient  # noqa: E402
+
+import server  # noqa: E402
+from http_caching import ENCODINGS  # noqa: E402
+from synthetic import make_jobs  # noqa: E402
+
+# Bytes on the wire and latency for the job read endpoints, through the whole ASGI
+# stack in-process, per way a client can ask:
+#
+#   identity     no Accept-Encoding, no validator: what every request cost before
+#   gzip / br    compressed (br only with the brotli package installed)
+#   revalidate   If-None-Match with the ETag from a previous response: 304, no body
+#
+#   python benchmarks/bench_http_caching.py --jobs 1000 --limit 20 100
+
+
+async def measure(client, url, headers, repeat: int):
+    samples = []
+    wire = 0
+    for _ in range(repeat):
+        started = time.perf_counter()
+        response = await client.get(url, headers=headers)
+        samples.append(time.perf_counter() - started)
+        wire = response.num_bytes_downloaded
+        assert response.status_code in (200, 304), response.text
+    return statistics.median(samples) * 1000, wire, response.status_code
+
+
+async def main(args):
+    # An in-memory database, bound without running the lifespan (no indexes or workers needed)
+    server.bind_database(AsyncMongoMockClient(tz_aware=True)["benchmark"])
+    await server.db.jobs.insert_many(make_jobs(args.jobs))
+    transport = httpx.ASGITransport(app=server.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        response = await client.post("/api/user/register", json={
+            "name": "Bench User", "email": "bench@example.com", "phone": 1, "role": "Job Seeker",
+            "password": "bench-password",
+        })
+        auth = {"Authorization": f"Bearer {response.json()['token']}"}
+        job_id = (await server.db.jobs.find_one({}))["id"]
+
+        urls = [(f"getall?limit={limit}", f"/api/job/getall?limit={limit}", {}) for limit in args.limit]
+        urls.append(("job/{job_id}", f"/api/job/{job_id}", auth))
+
+        print(f"encodings: {', '.join(ENCODINGS)}")
+        print(f"{'endpoint':<18}{'mode':<12}{'status':>7}{'bytes':>9}{'median ms':>11}")
+        for name, url, extra in urls:
+            modes = [("identity", {"Accept-Encoding": "identity"})]
+            modes += [(encoding, {"Accept-Encoding": encoding}) for encoding in ENCODINGS]
+            etag = (await client.get(url, headers={**extra, "Accept-Encoding": ENCODINGS[0]})).headers["etag"]
+            modes.append(("revalidate", {"Accept-Encoding": ENCODINGS[0], "If-None-Match": etag}))
+            for mode, headers in modes:
+                ms, wire, status = await measure(client, url, {**extra, **headers}, args.repeat)
+                print(f"{name:<18}{mode:<12}{status:>7}{wire:>9}{ms:>11.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--jobs", type=int, default=1000)
+    parser.add_argument("--limit", type=int, nargs="+", default=[20, 100])
+    parser.add_argument("--repeat", type=int, default=200)
+    asyncio.run(main(parser.parse_args()))
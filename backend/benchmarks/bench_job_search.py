@@ -0,0 +1,67 @@
+import argparse
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from job_ranking import JobIndex  # noqa: E402
+from synthetic import SKILLS, TITLES, make_jobs  # noqa: E402
+
+# Latency of /api/job/search's in-memory index: builds a JobIndex over N synthetic
+# jobs, replays typeahead-style queries (every prefix of a few keywords) and
+# reports p50/p95/p99. Exits non-zero when p99 is above --target-p99-ms.
+#
+#   python benchmarks/bench_job_search.py --jobs 10000 50000 --target-p99-ms 20
+
+
+def typeahead_queries(rng: random.Random, count: int):
+    queries = []
+    while len(queries) < count:
+        words = rng.sample(SKILLS + [word.lower() for title in TITLES for word in title.split()], 2)
+        text = " ".join(words)
+        queries.extend(text[:end] for end in range(2, len(text) + 1))
+    return queries[:count]
+
+
+def percentile(samples, pct):
+    return samples[min(len(samples) - 1, int(len(samples) * pct / 100))]
+
+
+def main(args):
+    rng = random.Random(7)
+    queries = typeahead_queries(rng, args.queries)
+    failed = False
+    print(f"{'jobs':>8}{'build s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    for count in args.jobs:
+        index = JobIndex()
+        started = time.perf_counter()
+        index.sync(make_jobs(count))
+        build = time.perf_counter() - started
+
+        samples = []
+        for query in queries:
+            started = time.perf_counter()
+            index.search(query, limit=20)
+            samples.append((time.perf_counter() - started) * 1000)
+        samples.sort()
+        p99 = percentile(samples, 99)
+        failed |= p99 > args.target_p99_ms
+        print(
+            f"{count:>8}{build:>10.2f}{statistics.median(samples):>10.2f}"
+            f"{percentile(samples, 95):>10.2f}{p99:>10.2f}{samples[-1]:>10.2f}"
+        )
+
+    if failed:
+        print(f"p99 above target of {args.target_p99_ms} ms")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--jobs", type=int, nargs="+", default=[1000, 10000, 50000])
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--target-p99-ms", type=float, default=20.0)
+    main(parser.parse_args())
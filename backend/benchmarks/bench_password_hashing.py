@@ -0,0 +1,74 @@
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+
+from passlib.context import CryptContext
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from password_hashing import PasswordHasher  # noqa: E402
+
+# Login throughput against concurrency: verifies N passwords with C concurrent
+# "logins", once on the event loop (the old behaviour) and once through
+# PasswordHasher, and reports logins/s plus how late a 10 ms ticker on the same
+# loop ran (the latency every other request would have seen).
+#
+#   python benchmarks/bench_password_hashing.py --rounds 10 --logins 64
+
+
+async def measure(verify, logins: int, concurrency: int):
+    lags = []
+    stop = asyncio.Event()
+
+    async def ticker():
+        while not stop.is_set():
+            started = time.perf_counter()
+            await asyncio.sleep(0.01)
+            lags.append(time.perf_counter() - started - 0.01)
+
+    async def worker(count: int):
+        for _ in range(count):
+            await verify()
+
+    tick = asyncio.create_task(ticker())
+    started = time.perf_counter()
+    per_worker = [logins // concurrency + (1 if i < logins % concurrency else 0) for i in range(concurrency)]
+    await asyncio.gather(*(worker(n) for n in per_worker))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await tick
+
+    lags = lags or [0.0]
+    return logins / elapsed, max(lags) * 1000, statistics.median(lags) * 1000
+
+
+async def main(args):
+    context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=args.rounds)
+    hashed = context.hash("correct horse battery staple")
+    hasher = PasswordHasher(context, max_workers=args.workers, max_pending=10 ** 6)
+
+    async def inline_verify():
+        context.verify("correct horse battery staple", hashed)
+
+    async def pooled_verify():
+        await hasher.verify_and_update("correct horse battery staple", hashed)
+
+    print(f"bcrypt rounds={args.rounds} workers={args.workers} logins={args.logins}")
+    print(f"{'mode':<8}{'conc':>6}{'logins/s':>12}{'max lag ms':>14}{'p50 lag ms':>14}")
+    for concurrency in args.concurrency:
+        for mode, verify in (("inline", inline_verify), ("pooled", pooled_verify)):
+            rate, max_lag, p50_lag = await measure(verify, args.logins, concurrency)
+            print(f"{mode:<8}{concurrency:>6}{rate:>12.1f}{max_lag:>14.1f}{p50_lag:>14.1f}")
+    hasher.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rounds", type=int, default=12)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--logins", type=int, default=32)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16, 64])
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,122 @@
+import argparse
+import asyncio
+import io
+import sys
+import time
+from pathlib import Path
+
+import docx
+import PyPDF2
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from resume_extraction import ResumeExtractor  # noqa: E402
+
+# Resume extraction over a generated corpus of PDFs and DOCX files of varying
+# size: the old inline parse (full document, += concatenation) against
+# ResumeExtractor (process pool, page/char limits). Reports time per file and
+# how late a 10 ms ticker on the event loop ran while extraction was going on.
+#
+#   python benchmarks/bench_resume_extraction.py --pages 1 10 40 --files 8
+
+LINE = "Senior Python developer with FastAPI, MongoDB, React and AWS experience."
+
+
+def make_pdf(pages: int, lines_per_page: int = 40) -> bytes:
+    # Minimal hand-written PDF with one Helvetica text stream per page
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>", None, "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for page in range(pages):
+        text = "".join(f"({LINE} p{page} l{line}) Tj T* " for line in range(lines_per_page))
+        stream = f"BT /F1 9 Tf 11 TL 40 800 Td {text}ET"
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream")
+        content_ref = len(objects)
+        objects.append(
+            "<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 842] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {content_ref} 0 R >>"
+        )
+        kids.append(f"{len(objects)} 0 R")
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {pages} >>"
+
+    out = io.BytesIO()
+    out.write(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(out.tell())
+        out.write(f"{number} 0 obj\n{body}\nendobj\n".encode())
+    xref = out.tell()
+    out.write(f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode())
+    for offset in offsets:
+        out.write(f"{offset:010d} 00000 n \n".encode())
+    out.write(f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode())
+    return out.getvalue()
+
+
+def make_docx(pages: int, paragraphs_per_page: int = 40) -> bytes:
+    document = docx.Document()
+    for page in range(pages):
+        for line in range(paragraphs_per_page):
+            document.add_paragraph(f"{LINE} p{page} l{line}")
+    out = io.BytesIO()
+    document.save(out)
+    return out.getvalue()
+
+
+def inline_pdf(content: bytes) -> str:
+    text = ""
+    for page in PyPDF2.PdfReader(io.BytesIO(content)).pages:
+        text += page.extract_text()
+    return text
+
+
+def inline_docx(content: bytes) -> str:
+    return "\n".join([paragraph.text for paragraph in docx.Document(io.BytesIO(content)).paragraphs])
+
+
+async def measure(extract, corpus):
+    lags = []
+    stop = asyncio.Event()
+
+    async def ticker():
+        while not stop.is_set():
+            started = time.perf_counter()
+            await asyncio.sleep(0.01)
+            lags.append(time.perf_counter() - started - 0.01)
+
+    tick = asyncio.create_task(ticker())
+    started = time.perf_counter()
+    chars = sum(len(text) for text in await asyncio.gather(*(extract(kind, content) for kind, content in corpus)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await tick
+    return elapsed / len(corpus) * 1000, max(lags or [0.0]) * 1000, chars // len(corpus)
+
+
+async def main(args):
+    extractor = ResumeExtractor(max_workers=args.workers, max_pages=args.max_pages, max_chars=args.max_chars)
+
+    async def inline(kind, content):
+        return inline_pdf(content) if kind == "pdf" else inline_docx(content)
+
+    # Warm the pool so worker start-up is not billed to the first size
+    await extractor.extract("pdf", make_pdf(1))
+
+    print(f"workers={args.workers} max_pages={args.max_pages} max_chars={args.max_chars} files/size={args.files}")
+    print(f"{'kind':<6}{'pages':>6}{'mode':>8}{'ms/file':>10}{'max lag ms':>12}{'chars':>8}")
+    for kind, make in (("pdf", make_pdf), ("docx", make_docx)):
+        for pages in args.pages:
+            corpus = [(kind, make(pages))] * args.files
+            for mode, extract in (("inline", inline), ("pooled", extractor.extract)):
+                per_file, max_lag, chars = await measure(extract, corpus)
+                print(f"{kind:<6}{pages:>6}{mode:>8}{per_file:>10.1f}{max_lag:>12.1f}{chars:>8}")
+    extractor.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", type=int, nargs="+", default=[1, 5, 20, 40])
+    parser.add_argument("--files", type=int, default=4)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--max-pages", type=int, default=10)
+    parser.add_argument("--max-chars", type=int, default=2000)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,74 @@
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from datetime import datetime  # noqa: E402
+
+from fastapi.responses import JSONResponse  # noqa: E402
+from fastapi.routing import serialize_response  # noqa: E402
+from fastapi.utils import create_response_field  # noqa: E402
+
+from fast_json import FastJSONResponse, orjson  # noqa: E402
+from server import JobPage, job_public  # noqa: E402
+from synthetic import make_jobs  # noqa: E402
+
+# Response serialization for a page of jobs, per request, at each list size:
+#
+#   before  ISO string timestamps parsed with datetime.fromisoformat, then FastAPI's
+#           response_model path (validate into JobPage, dump, JSONResponse)
+#   after   BSON dates as stored, projected with job_public and encoded straight
+#           to bytes by FastJSONResponse
+#
+#   python benchmarks/bench_serialization.py --jobs 1000 10000
+
+
+async def before(jobs: List[dict], field) -> bytes:
+    for job in jobs:
+        if isinstance(job.get('job_posted_on'), str):
+            job['job_posted_on'] = datetime.fromisoformat(job['job_posted_on'])
+    content = await serialize_response(field=field, response_content=JobPage(jobs=jobs, next_cursor=None))
+    return JSONResponse(content).body
+
+
+async def after(jobs: List[dict], field) -> bytes:
+    return FastJSONResponse({"jobs": [job_public(job) for job in jobs], "next_cursor": None}).body
+
+
+async def measure(fn, make_input, field, repeat: int):
+    samples = []
+    for _ in range(repeat):
+        jobs = make_input()
+        started = time.perf_counter()
+        body = await fn(jobs, field)
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples) * 1000, len(body)
+
+
+async def main(args):
+    field = create_response_field(name="Response_get_all_jobs", type_=JobPage)
+    print(f"encoder: {'orjson ' + orjson.__version__ if orjson else 'json (orjson not installed)'}")
+    print(f"{'jobs':>8}{'mode':>8}{'median ms':>12}{'bytes':>12}")
+    for count in args.jobs:
+        stored = make_jobs(count)
+        legacy = [{**job, "job_posted_on": job["job_posted_on"].isoformat()} for job in stored]
+        results = {}
+        for mode, fn, make_input in (
+            ("before", before, lambda: [dict(job) for job in legacy]),
+            ("after", after, lambda: [dict(job) for job in stored]),
+        ):
+            results[mode] = await measure(fn, make_input, field, args.repeat)
+            print(f"{count:>8}{mode:>8}{results[mode][0]:>12.2f}{results[mode][1]:>12}")
+        print(f"{count:>8}{'speedup':>8}{results['before'][0] / results['after'][0]:>11.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--jobs", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--repeat", type=int, default=7)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,70 @@
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+# Cold start of one API worker: time to import server.py, resident memory and
+# modules loaded afterwards, each measured in a fresh interpreter. "lazy" is the
+# server as shipped; "eager" first imports the SDKs server.py used to load at
+# import (OpenAI, PyPDF2, python-docx, Cloudinary), which is what every worker paid
+# before. With --lifespan the worker also runs its startup and shutdown against an
+# in-memory database, so the RSS includes the pools it opens.
+#
+#   python benchmarks/bench_startup.py --repeat 5 --lifespan
+
+EAGER_MODULES = ["openai", "PyPDF2", "docx", "cloudinary", "cloudinary.uploader"]
+
+CHILD = """
+import json, resource, sys, time
+sys.path.insert(0, {backend!r})
+started = time.perf_counter()
+for name in {preload!r}:
+    __import__(name)
+import server
+imported = time.perf_counter() - started
+if {lifespan!r}:
+    import asyncio
+    from mongomock_motor import AsyncMongoMockClient
+
+    async def cycle():
+        server.bind_database(AsyncMongoMockClient(tz_aware=True)["bench_startup"])
+        async with server.app.router.lifespan_context(server.app):
+            pass
+
+    asyncio.run(cycle())
+# ru_maxrss is in KiB on Linux
+print(json.dumps({{
+    "import_seconds": imported,
+    "rss_mib": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    "modules": len(sys.modules),
+}}))
+"""
+
+
+def measure(preload, lifespan: bool) -> dict:
+    code = CHILD.format(backend=str(BACKEND_DIR), preload=preload, lifespan=lifespan)
+    output = subprocess.run(
+        [sys.executable, "-c", code], check=True, capture_output=True, text=True, cwd=BACKEND_DIR,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main(args):
+    print(f"{'mode':<8}{'import ms':>11}{'rss MiB':>10}{'modules':>9}")
+    for mode, preload in (("lazy", []), ("eager", EAGER_MODULES)):
+        samples = [measure(preload, args.lifespan) for _ in range(args.repeat)]
+        seconds = statistics.median(sample["import_seconds"] for sample in samples)
+        rss = statistics.median(sample["rss_mib"] for sample in samples)
+        modules = samples[-1]["modules"]
+        print(f"{mode:<8}{seconds * 1000:>11.0f}{rss:>10.1f}{modules:>9}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--lifespan", action="store_true")
+    main(parser.parse_args())
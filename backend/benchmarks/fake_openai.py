@@ -0,0 +1,66 @@
+import asyncio
+import json
+import os
+import time
+
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.routing import Route
+
+# Stand-in for the OpenAI-compatible chat completions API, for load tests. Answers
+# every request after latency_seconds with a canned reply; streams send one word
+# every token_seconds. Usage is reported from rough word counts.
+#
+#   FAKE_OPENAI_LATENCY_MS=800 FAKE_OPENAI_TOKEN_MS=20 uvicorn fake_openai:app --port 8090
+
+REPLY = (
+    "Based on your resume, the Python Developer and Machine Learning Engineer roles fit best. "
+    "Highlight your FastAPI and MongoDB projects, and mention the AWS work in your summary."
+)
+
+
+def usage(body: dict) -> dict:
+    prompt = sum(len(message.get("content", "").split()) for message in body.get("messages", []))
+    completion = len(REPLY.split())
+    return {"prompt_tokens": prompt, "completion_tokens": completion, "total_tokens": prompt + completion}
+
+
+def create_app(latency_seconds: float = 0.0, token_seconds: float = 0.0) -> Starlette:
+    async def chat_completions(request: Request):
+        body = await request.json()
+        model = body.get("model", "fake")
+        await asyncio.sleep(latency_seconds)
+        if not body.get("stream"):
+            return JSONResponse({
+                "id": "chatcmpl-fake",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": REPLY}, "finish_reason": "stop"}],
+                "usage": usage(body),
+            })
+
+        def chunk(**fields) -> str:
+            payload = {"id": "chatcmpl-fake", "object": "chat.completion.chunk", "created": 0, "model": model, **fields}
+            return f"data: {json.dumps(payload)}\n\n"
+
+        async def events():
+            for word in REPLY.split(" "):
+                yield chunk(choices=[{"index": 0, "delta": {"content": word + " "}, "finish_reason": None}])
+                if token_seconds:
+                    await asyncio.sleep(token_seconds)
+            yield chunk(choices=[{"index": 0, "delta": {}, "finish_reason": "stop"}])
+            if body.get("stream_options", {}).get("include_usage"):
+                yield chunk(choices=[], usage=usage(body))
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    return Starlette(routes=[Route("/v1/chat/completions", chat_completions, methods=["POST"])])
+
+
+app = create_app(
+    latency_seconds=float(os.environ.get("FAKE_OPENAI_LATENCY_MS", "0")) / 1000,
+    token_seconds=float(os.environ.get("FAKE_OPENAI_TOKEN_MS", "0")) / 1000,
+)
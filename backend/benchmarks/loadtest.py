@@ -0,0 +1,381 @@
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+import uuid
+from collections import defaultdict
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import httpx
+
+BENCHMARKS_DIR = Path(__file__).resolve().parent
+BACKEND_DIR = BENCHMARKS_DIR.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+from synthetic import SKILLS, CATEGORIES, make_jobs  # noqa: E402
+
+# Load test for the whole API: virtual users run scenarios against the app and each
+# request's latency is recorded per operation, reported as requests/s and p50/p95/p99.
+#
+#   auth    register/login storm, one new account per iteration
+#   browse  job listing pages (following the cursor), category filter, search, job detail
+#   apply   application bursts with a resume upload, linked to a job
+#   chat    paste a resume (LLM analysis), then a chat turn and a streamed chat turn
+#
+# --workers 0 (default) drives `app` in-process through an ASGI transport, on
+# mongomock_motor unless --mongo-url is given. --workers N starts uvicorn with N
+# workers and a fake OpenAI server on local ports; that needs --mongo-url, since
+# the workers must share a database. A throwaway database is dropped afterwards.
+# The LLM is fake_openai.py with --llm-latency-ms (plus --llm-token-ms per streamed
+# word); Cloudinary is the in-process FakeCloudinaryUploader with --cloudinary-latency-ms.
+#
+# --save-baseline writes the results as JSON; --baseline compares a run against such
+# a file and exits non-zero when an operation's p95 grew, or a scenario's throughput
+# fell, by more than --tolerance.
+#
+#   python benchmarks/loadtest.py --users 20 --iterations 5
+#   python benchmarks/loadtest.py --scenarios browse apply --save-baseline baseline.json
+#   python benchmarks/loadtest.py --baseline baseline.json --tolerance 0.25
+#   python benchmarks/loadtest.py --workers 4 --mongo-url mongodb://localhost:27017
+
+SCENARIOS = ["auth", "browse", "apply", "chat"]
+PASSWORD = "loadtest-password"
+RESUME_TEXT = (
+    "Senior Python developer, 6 years. FastAPI, Django, MongoDB, PostgreSQL, Docker, AWS.\n"
+    "Built REST APIs serving 2M requests/day; led a team of four; mentored juniors.\n"
+)
+# Small fake PDF; only its bytes are uploaded, nothing parses it
+RESUME_FILE = b"%PDF-1.4\n" + os.urandom(30 * 1024)
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    return samples[min(len(samples) - 1, int(len(samples) * pct / 100))]
+
+
+class Recorder:
+    def __init__(self):
+        self.samples: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+
+    def record(self, op: str, seconds: float, ok: bool) -> None:
+        self.samples[op].append(seconds)
+        if not ok:
+            self.errors[op] += 1
+
+    def summary(self, elapsed: float) -> Dict[str, Dict]:
+        results = {}
+        everything = []
+        for op, samples in self.samples.items():
+            everything.extend(samples)
+            results[op] = self._summarize(samples, self.errors[op], elapsed)
+        if everything:
+            results["total"] = self._summarize(everything, sum(self.errors.values()), elapsed)
+        return results
+
+    @staticmethod
+    def _summarize(samples: List[float], errors: int, elapsed: float) -> Dict:
+        samples = sorted(samples)
+        return {
+            "requests": len(samples),
+            "errors": errors,
+            "rps": len(samples) / elapsed if elapsed else 0.0,
+            "p50_ms": percentile(samples, 50) * 1000,
+            "p95_ms": percentile(samples, 95) * 1000,
+            "p99_ms": percentile(samples, 99) * 1000,
+        }
+
+
+class LoadContext:
+    # What the scenarios share: the HTTP client, the recorder and the accounts and
+    # jobs created during setup (which is not measured)
+
+    def __init__(self, client: httpx.AsyncClient, rng: random.Random):
+        self.client = client
+        self.rng = rng
+        self.run_id = uuid.uuid4().hex[:8]
+        self.recorder = Recorder()
+        self.employer: Dict = {}
+        self.seekers: List[Dict] = []
+        self.job_ids: List[str] = []
+
+    async def call(self, op: str, method: str, url: str, token: Optional[str] = None, **kwargs) -> httpx.Response:
+        headers = {"Authorization": f"Bearer {token}"} if token else {}
+        started = time.perf_counter()
+        try:
+            response = await self.client.request(method, url, headers=headers, **kwargs)
+            # Streamed bodies count until their last byte
+            await response.aread()
+            ok = response.status_code < 400
+        except httpx.HTTPError:
+            response, ok = None, False
+        self.recorder.record(op, time.perf_counter() - started, ok)
+        return response
+
+    async def register(self, role: str, name: str) -> Dict:
+        email = f"{name}-{self.run_id}-{uuid.uuid4().hex[:6]}@example.com"
+        response = await self.client.post("/api/user/register", json={
+            "name": "Load Tester", "email": email, "phone": 9876543210, "role": role, "password": PASSWORD,
+        })
+        response.raise_for_status()
+        data = response.json()
+        return {"id": data["user"]["id"], "email": email, "token": data["token"]}
+
+    async def setup(self, users: int, jobs: int) -> None:
+        self.employer = await self.register("Employer", "employer")
+        self.seekers = await asyncio.gather(*(self.register("Job Seeker", f"seeker{i}") for i in range(users)))
+
+        fields = ["title", "description", "category", "country", "city", "location",
+                  "fixed_salary", "salary_from", "salary_to"]
+        body = "".join(json.dumps({field: job[field] for field in fields}) + "\n" for job in make_jobs(jobs))
+        response = await self.client.post(
+            "/api/job/bulk", content=body.encode(),
+            headers={"Authorization": f"Bearer {self.employer['token']}", "Content-Type": "application/x-ndjson"},
+        )
+        response.raise_for_status()
+        self.job_ids = [
+            entry["id"] for entry in map(json.loads, response.text.splitlines()) if entry.get("status") == "created"
+        ]
+
+
+async def scenario_auth(ctx: LoadContext, user: int) -> None:
+    email = f"storm-{ctx.run_id}-{uuid.uuid4().hex[:8]}@example.com"
+    await ctx.call("register", "POST", "/api/user/register", json={
+        "name": "Storm User", "email": email, "phone": 9876543210, "role": "Job Seeker", "password": PASSWORD,
+    })
+    response = await ctx.call("login", "POST", "/api/user/login", json={"email": email, "password": PASSWORD})
+    if response is not None and response.status_code == 200:
+        await ctx.call("getuser", "GET", "/api/user/getuser", token=response.json()["token"])
+
+
+async def scenario_browse(ctx: LoadContext, user: int) -> None:
+    token = ctx.seekers[user]["token"]
+    cursor = None
+    for _ in range(3):
+        params = {"limit": 20, **({"cursor": cursor} if cursor else {})}
+        response = await ctx.call("getall", "GET", "/api/job/getall", params=params)
+        if response is None or response.status_code != 200:
+            break
+        cursor = response.json()["next_cursor"]
+        if not cursor:
+            break
+    await ctx.call("getall?category", "GET", "/api/job/getall", params={"category": ctx.rng.choice(CATEGORIES)})
+    await ctx.call("search", "GET", "/api/job/search", params={"q": ctx.rng.choice(SKILLS)})
+    await ctx.call("job", "GET", f"/api/job/{ctx.rng.choice(ctx.job_ids)}", token=token)
+
+
+async def scenario_apply(ctx: LoadContext, user: int) -> None:
+    await ctx.call(
+        "apply", "POST", "/api/application/post", token=ctx.seekers[user]["token"],
+        data={
+            "name": "Load Tester", "email": ctx.seekers[user]["email"], "cover_letter": "I would love to join.",
+            "phone": "9876543210", "address": "1 Main Street, Pune",
+            "employer_id": ctx.employer["id"], "job_id": ctx.rng.choice(ctx.job_ids),
+        },
+        files={"resume": ("resume.pdf", RESUME_FILE, "application/pdf")},
+    )
+
+
+async def scenario_chat(ctx: LoadContext, user: int) -> None:
+    token = ctx.seekers[user]["token"]
+    response = await ctx.call("paste-resume", "POST", "/api/chatbot/paste-resume", token=token,
+                              json={"resume_text": RESUME_TEXT + uuid.uuid4().hex})
+    if response is None or response.status_code != 200:
+        return
+    session_id = response.json()["session_id"]
+    await ctx.call("chat", "POST", "/api/chatbot/chat", token=token,
+                   json={"message": "Which of these jobs should I apply to first?", "session_id": session_id})
+    await ctx.call("chat?stream", "POST", "/api/chatbot/chat", token=token, params={"stream": True},
+                   json={"message": "How should I prepare for the interview?", "session_id": session_id})
+
+
+SCENARIO_FUNCTIONS = {
+    "auth": scenario_auth,
+    "browse": scenario_browse,
+    "apply": scenario_apply,
+    "chat": scenario_chat,
+}
+
+
+async def run_scenario(ctx: LoadContext, name: str, users: int, iterations: int) -> Dict[str, Dict]:
+    ctx.recorder = Recorder()
+    scenario = SCENARIO_FUNCTIONS[name]
+
+    async def virtual_user(user: int) -> None:
+        for _ in range(iterations):
+            await scenario(ctx, user)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(virtual_user(user) for user in range(users)))
+    return ctx.recorder.summary(time.perf_counter() - started)
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def wait_until_up(url: str, timeout_seconds: float = 60) -> None:
+    deadline = time.monotonic() + timeout_seconds
+    async with httpx.AsyncClient() as client:
+        while True:
+            try:
+                await client.get(url)
+                return
+            except httpx.TransportError:
+                if time.monotonic() > deadline:
+                    raise RuntimeError(f"{url} did not come up within {timeout_seconds}s")
+                await asyncio.sleep(0.2)
+
+
+@asynccontextmanager
+async def in_process(args, env: Dict[str, str]):
+    os.environ.update(env)
+    if not args.mongo_url:
+        # Every module that imports the Motor client gets the in-memory one
+        import motor.motor_asyncio
+        from mongomock_motor import AsyncMongoMockClient
+        motor.motor_asyncio.AsyncIOMotorClient = AsyncMongoMockClient
+
+    from openai import AsyncOpenAI
+    import server
+    from fake_openai import create_app
+
+    fake_llm = create_app(args.llm_latency_ms / 1000, args.llm_token_ms / 1000)
+    server.llm_gateway.client = AsyncOpenAI(
+        api_key="loadtest", base_url="http://fake-openai/v1",
+        http_client=httpx.AsyncClient(transport=httpx.ASGITransport(app=fake_llm)),
+    )
+
+    async with server.app.router.lifespan_context(server.app):
+        transport = httpx.ASGITransport(app=server.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://loadtest", timeout=120) as client:
+            yield client
+
+
+@asynccontextmanager
+async def multi_worker(args, env: Dict[str, str]):
+    llm_port, api_port = free_port(), free_port()
+    processes = [
+        subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "fake_openai:app", "--port", str(llm_port), "--log-level", "warning"],
+            cwd=BENCHMARKS_DIR,
+            env={**os.environ, "FAKE_OPENAI_LATENCY_MS": str(args.llm_latency_ms),
+                 "FAKE_OPENAI_TOKEN_MS": str(args.llm_token_ms)},
+        ),
+        subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "server:app", "--port", str(api_port),
+             "--workers", str(args.workers), "--log-level", "warning"],
+            cwd=BACKEND_DIR,
+            env={**os.environ, **env, "LLM_BASE_URL": f"http://127.0.0.1:{llm_port}/v1"},
+        ),
+    ]
+    try:
+        await wait_until_up(f"http://127.0.0.1:{llm_port}/")
+        await wait_until_up(f"http://127.0.0.1:{api_port}/api/health")
+        limits = httpx.Limits(max_connections=args.users * 2, max_keepalive_connections=args.users * 2)
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{api_port}", limits=limits, timeout=120) as client:
+            yield client
+    finally:
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            process.wait(timeout=30)
+
+
+def print_results(results: Dict[str, Dict[str, Dict]]) -> None:
+    print(f"{'scenario':<10}{'op':<18}{'requests':>9}{'errors':>8}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}")
+    for scenario, ops in results.items():
+        for op, row in ops.items():
+            print(f"{scenario:<10}{op:<18}{row['requests']:>9}{row['errors']:>8}{row['rps']:>9.1f}"
+                  f"{row['p50_ms']:>9.1f}{row['p95_ms']:>9.1f}{row['p99_ms']:>9.1f}")
+
+
+def compare(results: Dict, baseline: Dict, tolerance: float) -> List[str]:
+    # p95 gets 1 ms of slack so sub-millisecond operations do not fail on noise
+    regressions = []
+    for scenario, ops in results.items():
+        for op, row in ops.items():
+            base = baseline.get(scenario, {}).get(op)
+            if base is None:
+                continue
+            if row["p95_ms"] > base["p95_ms"] * (1 + tolerance) + 1:
+                regressions.append(f"{scenario}/{op}: p95 {base['p95_ms']:.1f} -> {row['p95_ms']:.1f} ms")
+            if op == "total" and row["rps"] < base["rps"] * (1 - tolerance):
+                regressions.append(f"{scenario}: throughput {base['rps']:.1f} -> {row['rps']:.1f} req/s")
+            if row["errors"] > base["errors"]:
+                regressions.append(f"{scenario}/{op}: errors {base['errors']} -> {row['errors']}")
+    return regressions
+
+
+async def main(args) -> int:
+    if args.workers and not args.mongo_url:
+        print("--workers needs --mongo-url: each worker would otherwise get its own in-memory database")
+        return 2
+
+    env = {
+        "MONGO_URL": args.mongo_url or "mongodb://loadtest",
+        "DB_NAME": f"loadtest_{uuid.uuid4().hex[:8]}",
+        "EMERGENT_LLM_KEY": "loadtest",
+        "CLOUDINARY_FAKE": "true",
+        "CLOUDINARY_FAKE_LATENCY_MS": str(args.cloudinary_latency_ms),
+        # Users and jobs from earlier runs do not share this database; expiry only adds noise
+        "JOB_LIFETIME_DAYS": "0",
+        "MONGO_MIGRATE_DATETIMES": "false",
+    }
+    env.update(dict(item.split("=", 1) for item in args.env))
+
+    harness = multi_worker if args.workers else in_process
+    results = {}
+    try:
+        async with harness(args, env) as client:
+            ctx = LoadContext(client, random.Random(7))
+            await ctx.setup(args.users, args.jobs)
+            for scenario in args.scenarios:
+                results[scenario] = await run_scenario(ctx, scenario, args.users, args.iterations)
+    finally:
+        if args.mongo_url:
+            from motor.motor_asyncio import AsyncIOMotorClient
+            mongo = AsyncIOMotorClient(args.mongo_url)
+            await mongo.drop_database(env["DB_NAME"])
+            mongo.close()
+
+    mode = f"{args.workers} uvicorn workers" if args.workers else "in-process"
+    print(f"{mode}, {'mongod' if args.mongo_url else 'mongomock'}, {args.users} users x {args.iterations} iterations")
+    print_results(results)
+
+    if args.save_baseline:
+        Path(args.save_baseline).write_text(json.dumps(results, indent=2))
+    if args.baseline:
+        regressions = compare(results, json.loads(Path(args.baseline).read_text()), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=SCENARIOS)
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--iterations", type=int, default=5)
+    parser.add_argument("--jobs", type=int, default=500)
+    parser.add_argument("--workers", type=int, default=0)
+    parser.add_argument("--mongo-url", default=None)
+    parser.add_argument("--llm-latency-ms", type=float, default=300)
+    parser.add_argument("--llm-token-ms", type=float, default=5)
+    parser.add_argument("--cloudinary-latency-ms", type=float, default=150)
+    parser.add_argument("--env", nargs="*", default=[], metavar="NAME=VALUE",
+                        help="Extra settings for the app, e.g. BCRYPT_ROUNDS=10")
+    parser.add_argument("--save-baseline", default=None)
+    parser.add_argument("--baseline", default=None)
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    sys.exit(asyncio.run(main(parser.parse_args())))
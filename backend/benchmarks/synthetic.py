@@ -0,0 +1,65 @@
+import random
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List
+
+# Realistic-looking job documents for the benchmarks, shaped like what post_job stores
+
+TITLES = [
+    "Python Developer", "React Engineer", "Data Analyst", "DevOps Engineer", "Graphic Designer",
+    "Product Manager", "QA Engineer", "Android Developer", "Accountant", "Sales Executive",
+    "Content Writer", "Machine Learning Engineer", "UI/UX Designer", "Java Developer", "HR Manager",
+]
+CATEGORIES = [
+    "Software Development", "Web Development", "Data Science", "Graphics & Design",
+    "Finance", "Marketing", "Sales", "Human Resources", "Quality Assurance",
+]
+PLACES = [
+    ("India", "Pune"), ("India", "Bengaluru"), ("India", "Mumbai"), ("USA", "Austin"),
+    ("USA", "Seattle"), ("Germany", "Berlin"), ("UK", "London"), ("Canada", "Toronto"),
+]
+SKILLS = [
+    "python", "fastapi", "django", "react", "javascript", "typescript", "mongodb", "postgresql",
+    "docker", "kubernetes", "aws", "azure", "figma", "photoshop", "excel", "tableau", "pandas",
+    "spark", "java", "spring", "kotlin", "selenium", "seo", "negotiation", "recruiting", "tax",
+]
+
+
+def make_job(rng: random.Random, posted_on: datetime, posted_by: str) -> Dict:
+    title = rng.choice(TITLES)
+    country, city = rng.choice(PLACES)
+    skills = rng.sample(SKILLS, 5)
+    job = {
+        "id": str(uuid.UUID(int=rng.getrandbits(128))),
+        "title": title,
+        "description": (
+            f"We are hiring a {title.lower()} experienced with {', '.join(skills[:-1])} and {skills[-1]}. "
+            "You will work with a small, friendly team on products used by thousands of people."
+        )[:500],
+        "category": rng.choice(CATEGORIES),
+        "country": country,
+        "city": city,
+        "location": f"{rng.randint(1, 400)} Main Street, {city}, {country}",
+        "fixed_salary": None,
+        "salary_from": None,
+        "salary_to": None,
+        "expired": False,
+        "job_posted_on": posted_on,
+        "posted_by": posted_by,
+    }
+    if rng.random() < 0.5:
+        job["fixed_salary"] = rng.randrange(20000, 200000, 1000)
+    else:
+        job["salary_from"] = rng.randrange(20000, 150000, 1000)
+        job["salary_to"] = job["salary_from"] + rng.randrange(5000, 50000, 1000)
+    return job
+
+
+def make_jobs(count: int, seed: int = 42, employers: int = 50) -> List[Dict]:
+    rng = random.Random(seed)
+    employer_ids = [str(uuid.UUID(int=rng.getrandbits(128))) for _ in range(employers)]
+    start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    return [
+        make_job(rng, start + timedelta(minutes=i), rng.choice(employer_ids))
+        for i in range(count)
+    ]
@@ -0,0 +1,217 @@
+import codecs
+import csv
+import json
+import time
+from typing import AsyncIterator, Callable, Dict, List, Optional, Tuple
+
+from pydantic import ValidationError
+from pymongo.errors import BulkWriteError
+from starlette.responses import StreamingResponse
+
+# A parsed row: (row number, fields, parse error). Exactly one of fields and error is set.
+Row = Tuple[int, Optional[Dict], Optional[str]]
+
+
+# Longest line (NDJSON) or record (CSV, quoted line breaks included) accepted, in
+# characters; anything longer is reported as an invalid row without being held in memory
+MAX_LINE_CHARS = 64 * 1024
+
+
+async def iter_lines(chunks: AsyncIterator[bytes], max_chars: int = MAX_LINE_CHARS) -> AsyncIterator[Optional[str]]:
+    # UTF-8 lines of a streamed body, without their line endings. Each chunk is split
+    # once; a line longer than max_chars is dropped up to its end and yielded as None,
+    # so at most one line plus one chunk is held whatever the input.
+    decoder = codecs.getincrementaldecoder("utf-8-sig")(errors="replace")
+    parts: List[str] = []
+    size = 0
+    overlong = False
+
+    def feed(text: str) -> List[Optional[str]]:
+        nonlocal parts, size, overlong
+        done = []
+        pieces = text.split("\n")
+        for index, piece in enumerate(pieces):
+            if not overlong:
+                size += len(piece)
+                if size > max_chars:
+                    overlong = True
+                    parts = []
+                else:
+                    parts.append(piece)
+            if index < len(pieces) - 1:
+                done.append(None if overlong else "".join(parts).rstrip("\r"))
+                parts, size, overlong = [], 0, False
+        return done
+
+    async for chunk in chunks:
+        for line in feed(decoder.decode(chunk)):
+            yield line
+    for line in feed(decoder.decode(b"", final=True)):
+        yield line
+    if overlong:
+        yield None
+    elif any(parts):
+        yield "".join(parts).rstrip("\r")
+
+
+async def ndjson_rows(lines: AsyncIterator[Optional[str]]) -> AsyncIterator[Row]:
+    row = 0
+    async for line in lines:
+        if line is None:
+            row += 1
+            yield row, None, f"Line is longer than {MAX_LINE_CHARS} characters"
+            continue
+        if not line.strip():
+            continue
+        row += 1
+        try:
+            fields = json.loads(line)
+        except ValueError as e:
+            yield row, None, f"Invalid JSON: {e}"
+            continue
+        if not isinstance(fields, dict):
+            yield row, None, "Each line must be a JSON object"
+            continue
+        yield row, fields, None
+
+
+async def csv_rows(lines: AsyncIterator[Optional[str]], max_chars: int = MAX_LINE_CHARS) -> AsyncIterator[Row]:
+    # The first record is the header. A record ends at a line break outside quotes,
+    # so quoted fields may span lines; empty cells are treated as missing. A record
+    # past max_chars is most likely an unterminated quote swallowing the rest of the
+    # file, and there is no telling where the next record starts: the import stops there.
+    header = None
+    row = 0
+    record: List[str] = []
+    size = 0
+    quotes = 0
+    async for line in lines:
+        if line is None or size + len(line) > max_chars:
+            if not record and line is None and header is not None:
+                row += 1
+                yield row, None, f"Line is longer than {max_chars} characters"
+                continue
+            yield row + 1, None, f"Record is longer than {max_chars} characters (unterminated quote?); import stopped"
+            return
+        record.append(line)
+        size += len(line) + 1
+        quotes += line.count('"')
+        if quotes % 2:
+            continue
+        text = "\n".join(record)
+        record, size, quotes = [], 0, 0
+        values = next(csv.reader([text])) if text.strip() else []
+        if not values:
+            continue
+        if header is None:
+            header = [name.strip() for name in values]
+            continue
+        row += 1
+        if len(values) != len(header):
+            yield row, None, f"Expected {len(header)} columns, got {len(values)}"
+            continue
+        yield row, {name: value for name, value in zip(header, values) if value != ""}, None
+    if record:
+        yield row + 1, None, "Unterminated quoted field"
+
+
+def validation_errors(error: ValidationError) -> List[Dict]:
+    return [
+        {"field": ".".join(str(part) for part in item["loc"]), "message": item["msg"]}
+        for item in error.errors()
+    ]
+
+
+class BulkJobImporter:
+    # Turns a stream of rows into job documents and inserts them batch_size at a time
+    # with unordered insert_many, yielding one report entry per row as each batch
+    # lands and a summary at the end. Nothing beyond the current batch is held in
+    # memory, whatever the size of the upload.
+
+    def __init__(self, collection, batch_size: int = 500, max_rows: int = 100000):
+        self.collection = collection
+        self.batch_size = batch_size
+        self.max_rows = max_rows
+
+        self.imports = 0
+        self.rows = 0
+        self.created = 0
+        self.rejected = 0
+        self.import_seconds_total = 0.0
+
+    async def run(self, rows: AsyncIterator[Row], make_job: Callable[[Dict], Dict]) -> AsyncIterator[Dict]:
+        # make_job validates a row and returns the document to insert, raising ValidationError
+        started = time.perf_counter()
+        summary = {"rows": 0, "created": 0, "invalid": 0, "failed": 0}
+        batch: List[Tuple[int, Dict]] = []
+        self.imports += 1
+        try:
+            async for row, fields, error in rows:
+                if row > self.max_rows:
+                    summary["invalid"] += 1
+                    yield {"row": row, "status": "invalid", "errors": [{"field": "", "message": f"More than {self.max_rows} rows; the rest were not imported"}]}
+                    break
+                summary["rows"] += 1
+                errors = [{"field": "", "message": error}] if error else None
+                if fields is not None:
+                    try:
+                        batch.append((row, make_job(fields)))
+                    except ValidationError as e:
+                        errors = validation_errors(e)
+                if errors:
+                    summary["invalid"] += 1
+                    yield {"row": row, "status": "invalid", "errors": errors}
+                if len(batch) >= self.batch_size:
+                    for entry in await self._insert(batch, summary):
+                        yield entry
+                    batch = []
+            if batch:
+                for entry in await self._insert(batch, summary):
+                    yield entry
+        finally:
+            elapsed = time.perf_counter() - started
+            self.rows += summary["rows"]
+            self.created += summary["created"]
+            self.rejected += summary["invalid"] + summary["failed"]
+            self.import_seconds_total += elapsed
+        yield {"summary": {**summary, "seconds": round(elapsed, 3)}}
+
+    async def _insert(self, batch: List[Tuple[int, Dict]], summary: Dict) -> List[Dict]:
+        failed: Dict[int, str] = {}
+        try:
+            await self.collection.insert_many([job for _, job in batch], ordered=False)
+        except BulkWriteError as e:
+            # Unordered: everything except the reported documents was inserted
+            failed = {error["index"]: error.get("errmsg", "Insert failed") for error in e.details.get("writeErrors", [])}
+
+        report = []
+        for index, (row, job) in enumerate(batch):
+            if index in failed:
+                summary["failed"] += 1
+                report.append({"row": row, "status": "failed", "error": failed[index]})
+            else:
+                summary["created"] += 1
+                report.append({"row": row, "status": "created", "id": job["id"]})
+        return report
+
+    def stats(self) -> Dict:
+        return {
+            "batch_size": self.batch_size,
+            "max_rows": self.max_rows,
+            "imports": self.imports,
+            "rows": self.rows,
+            "created": self.created,
+            "rejected": self.rejected,
+            "import_seconds_total": self.import_seconds_total,
+        }
+
+
+class UploadStreamingResponse(StreamingResponse):
+    # StreamingResponse reads `receive` while streaming to notice a disconnect, which
+    # would swallow the request body chunks this response is still consuming. The
+    # body stream itself raises ClientDisconnect instead.
+
+    async def __call__(self, scope, receive, send) -> None:
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
@@ -0,0 +1,201 @@
+import asyncio
+import logging
+import os
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterator, List
+
+from bson import ObjectId
+from pymongo import ASCENDING, DESCENDING, TEXT, IndexModel
+from pymongo.errors import OperationFailure
+
+logger = logging.getLogger(__name__)
+
+# Every index the API relies on, per collection. create_indexes() is a no-op for
+# indexes that already exist with the same spec, so this is safe to run on every
+# startup.
+INDEXES: Dict[str, List[IndexModel]] = {
+    "users": [
+        IndexModel([("email", ASCENDING)], name="users_email_unique", unique=True),
+        IndexModel([("id", ASCENDING)], name="users_id_unique", unique=True),
+    ],
+    "jobs": [
+        IndexModel([("id", ASCENDING)], name="jobs_id_unique", unique=True),
+        # Keyset pagination on (job_posted_on, id), optionally narrowed by category or location.
+        # Partial: only active jobs are listed, so expired ones stay out of these indexes.
+        # The first also serves the expiry sweep. Replaces the jobs_expired_* indexes,
+        # which can be dropped once this version is deployed.
+        IndexModel(
+            [("job_posted_on", DESCENDING), ("id", DESCENDING)],
+            name="jobs_active_posted_on_id",
+            partialFilterExpression={"expired": False},
+        ),
+        IndexModel(
+            [("category", ASCENDING), ("job_posted_on", DESCENDING), ("id", DESCENDING)],
+            name="jobs_active_category_posted_on_id",
+            partialFilterExpression={"expired": False},
+        ),
+        IndexModel(
+            [("country", ASCENDING), ("city", ASCENDING), ("job_posted_on", DESCENDING), ("id", DESCENDING)],
+            name="jobs_active_location_posted_on_id",
+            partialFilterExpression={"expired": False},
+        ),
+        # Expired jobs due for the archive
+        IndexModel(
+            [("expired_at", ASCENDING)],
+            name="jobs_expired_at",
+            partialFilterExpression={"expired": True},
+        ),
+        IndexModel([("posted_by", ASCENDING)], name="jobs_posted_by"),
+        # Fallback for /api/job/search when the in-memory index is disabled
+        IndexModel(
+            [("title", TEXT), ("description", TEXT), ("category", TEXT), ("city", TEXT), ("country", TEXT)],
+            name="jobs_text",
+            weights={"title": 3, "category": 2},
+        ),
+    ],
+    "jobs_archive": [
+        IndexModel([("id", ASCENDING)], name="jobs_archive_id_unique", unique=True),
+    ],
+    "applications": [
+        IndexModel([("id", ASCENDING)], name="applications_id_unique", unique=True),
+        # Also serves the export's walk over one employer's applications in _id order
+        IndexModel([("employer_id.user", ASCENDING), ("_id", ASCENDING)], name="applications_employer_id"),
+        IndexModel([("applicant_id.user", ASCENDING)], name="applications_applicant"),
+        # job_stats.py rebuilds, per job and for the last 24 hours
+        IndexModel([("job_id", ASCENDING), ("created_at", ASCENDING)], name="applications_job_created_at"),
+        # Background resume uploads left pending by a worker that died
+        IndexModel(
+            [("created_at", ASCENDING)],
+            name="applications_resume_pending_created_at",
+            partialFilterExpression={"resume.status": "pending"},
+        ),
+    ],
+    "job_stats": [
+        IndexModel([("job_id", ASCENDING)], name="job_stats_job_id_unique", unique=True),
+    ],
+    "chat_sessions": [
+        IndexModel([("session_id", ASCENDING)], name="chat_sessions_session_id_unique", unique=True),
+        IndexModel([("user_id", ASCENDING)], name="chat_sessions_user_id"),
+    ],
+    "chat_messages": [
+        IndexModel([("session_id", ASCENDING), ("seq", ASCENDING)], name="chat_messages_session_seq_unique", unique=True),
+    ],
+    "resume_analyses": [
+        IndexModel([("expires_at", ASCENDING)], name="resume_analyses_ttl", expireAfterSeconds=0),
+        IndexModel([("created_at", ASCENDING)], name="resume_analyses_created_at"),
+    ],
+    "resume_tasks": [
+        IndexModel([("id", ASCENDING)], name="resume_tasks_id_unique", unique=True),
+        # Claiming: queued tasks that are due, and running tasks whose lease lapsed
+        IndexModel([("status", ASCENDING), ("available_at", ASCENDING)], name="resume_tasks_status_available_at"),
+        IndexModel([("status", ASCENDING), ("lease_expires_at", ASCENDING)], name="resume_tasks_status_lease"),
+        IndexModel([("expires_at", ASCENDING)], name="resume_tasks_ttl", expireAfterSeconds=0),
+    ],
+}
+
+SAMPLE_DATE = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+# The query shapes issued by the routes in server.py: (route, collection, filter, sort).
+# Values are placeholders, only the shape matters to the planner.
+QUERY_SHAPES = [
+    ("register/login", "users", {"email": "user@example.com"}, None),
+    ("get_current_user", "users", {"id": "user-id"}, None),
+    ("get_all_jobs", "jobs", {"expired": False}, [("job_posted_on", -1), ("id", -1)]),
+    ("get_all_jobs?category", "jobs", {"expired": False, "category": "IT"}, [("job_posted_on", -1), ("id", -1)]),
+    ("get_all_jobs?country&city", "jobs", {"expired": False, "country": "IN", "city": "Pune"},
+     [("job_posted_on", -1), ("id", -1)]),
+    ("get_all_jobs?cursor", "jobs",
+     {"expired": False, "$or": [
+         {"job_posted_on": {"$lt": SAMPLE_DATE}},
+         {"job_posted_on": SAMPLE_DATE, "id": {"$lt": "job-id"}},
+     ]},
+     [("job_posted_on", -1), ("id", -1)]),
+    ("job expiry", "jobs", {"expired": False, "job_posted_on": {"$lt": SAMPLE_DATE}}, [("job_posted_on", 1)]),
+    ("job archive", "jobs", {"expired": True, "expired_at": {"$lt": SAMPLE_DATE}}, None),
+    ("search_jobs (mongo)", "jobs", {"$text": {"$search": "python"}, "expired": False}, None),
+    ("get_my_jobs", "jobs", {"posted_by": "user-id"}, None),
+    ("get_single_job/update_job/delete_job", "jobs", {"id": "job-id"}, None),
+    ("delete_application", "applications", {"id": "application-id"}, None),
+    ("employer_get_all_applications", "applications", {"employer_id.user": "user-id"}, None),
+    ("employer_export_applications", "applications",
+     {"employer_id.user": "user-id", "_id": {"$gt": ObjectId.from_datetime(SAMPLE_DATE)}}, [("_id", 1)]),
+    ("post_application/delete_application counters", "job_stats", {"job_id": "job-id"}, None),
+    ("jobseeker_get_all_applications", "applications", {"applicant_id.user": "user-id"}, None),
+    ("pending resume upload sweep", "applications",
+     {"resume.status": "pending", "created_at": {"$lt": SAMPLE_DATE}}, None),
+    ("chat/paste_resume", "chat_sessions", {"session_id": "session-id"}, None),
+    ("get_chat_sessions", "chat_sessions", {"user_id": "user-id"}, None),
+    ("chat/get_chat_messages", "chat_messages", {"session_id": "session-id"}, [("seq", -1)]),
+    ("chat/get_resume_task", "resume_tasks", {"id": "task-id"}, None),
+    ("task_queue claim", "resume_tasks", {"status": "queued", "available_at": {"$lte": SAMPLE_DATE}}, None),
+    ("task_queue reclaim", "resume_tasks", {"status": "running", "lease_expires_at": {"$lt": SAMPLE_DATE}}, None),
+    ("task_queue abandoned sweep", "resume_tasks",
+     {"status": "running", "lease_expires_at": {"$lt": SAMPLE_DATE}, "attempts": {"$gte": 3}}, None),
+]
+
+
+async def ensure_indexes(db) -> None:
+    for collection, indexes in INDEXES.items():
+        try:
+            created = await db[collection].create_indexes(indexes)
+            logger.info(f"Indexes ready on {collection}: {', '.join(created)}")
+        except OperationFailure as e:
+            # Usually duplicate data blocking a unique index, or an existing index
+            # with the same name but different options. Keep serving, but say so.
+            logger.error(f"Failed to create indexes on {collection}: {e}")
+
+
+def _plan_stages(plan: Any) -> Iterator[str]:
+    if isinstance(plan, dict):
+        if "stage" in plan:
+            yield plan["stage"]
+        for value in plan.values():
+            yield from _plan_stages(value)
+    elif isinstance(plan, list):
+        for item in plan:
+            yield from _plan_stages(item)
+
+
+async def verify_query_plans(db) -> None:
+    failures = []
+    for route, collection, query, sort in QUERY_SHAPES:
+        cursor = db[collection].find(query)
+        if sort:
+            cursor = cursor.sort(sort)
+        explain = await cursor.explain()
+        stages = set(_plan_stages(explain["queryPlanner"]["winningPlan"]))
+        if "COLLSCAN" in stages:
+            failures.append(f"{route}: {collection}.find({query}) -> COLLSCAN")
+        else:
+            logger.info(f"Query plan OK for {route}: {sorted(stages)}")
+
+    if failures:
+        raise RuntimeError("Queries without index support:\n" + "\n".join(failures))
+
+
+async def main(check: bool) -> None:
+    from dotenv import load_dotenv
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+    load_dotenv(Path(__file__).parent / '.env')
+    client = AsyncIOMotorClient(os.environ['MONGO_URL'])
+    db = client[os.environ['DB_NAME']]
+    try:
+        await ensure_indexes(db)
+        if check:
+            await verify_query_plans(db)
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    # python db_indexes.py           create missing indexes
+    # python db_indexes.py --check   also fail if any route query falls back to COLLSCAN
+    logging.basicConfig(level=logging.INFO)
+    try:
+        asyncio.run(main("--check" in sys.argv[1:]))
+    except RuntimeError as e:
+        logger.error(str(e))
+        sys.exit(1)
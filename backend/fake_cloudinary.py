@@ -0,0 +1,40 @@
+import threading
+import time
+import uuid
+from typing import Dict, Optional
+
+
+class FakeCloudinaryUploader:
+    # Drop-in stand-in for cloudinary.uploader in tests and benchmarks: keeps
+    # uploads in memory and sleeps latency_seconds per call to mimic the network
+
+    def __init__(self, latency_seconds: float = 0.0):
+        self.latency_seconds = latency_seconds
+        self.files: Dict[str, bytes] = {}
+        self._lock = threading.Lock()
+
+    def upload(self, file, folder: Optional[str] = None, **options) -> Dict:
+        if hasattr(file, "read"):
+            data = file.read()
+        elif isinstance(file, str):
+            with open(file, "rb") as opened:
+                data = opened.read()
+        else:
+            data = bytes(file)
+
+        if self.latency_seconds:
+            time.sleep(self.latency_seconds)
+
+        public_id = f"{folder}/{uuid.uuid4().hex}" if folder else uuid.uuid4().hex
+        with self._lock:
+            self.files[public_id] = data
+        return {
+            "public_id": public_id,
+            "secure_url": f"https://res.cloudinary.invalid/raw/upload/{public_id}",
+            "bytes": len(data),
+        }
+
+    def destroy(self, public_id: str, **options) -> Dict:
+        with self._lock:
+            found = self.files.pop(public_id, None) is not None
+        return {"result": "ok" if found else "not found"}
@@ -0,0 +1,37 @@
+import json
+from datetime import datetime, timezone
+from typing import Any
+
+from starlette.responses import Response
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return value.isoformat().replace("+00:00", "Z")
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    # Datetimes come out as ISO 8601 in UTC with a Z suffix, like Pydantic writes them;
+    # naive ones (legacy documents) are taken to be UTC
+    if orjson is not None:
+        return orjson.dumps(content, option=orjson.OPT_UTC_Z | orjson.OPT_NAIVE_UTC)
+    return json.dumps(content, default=_default, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+class FastJSONResponse(Response):
+    # For read routes returning documents this app wrote itself: the content is
+    # encoded straight to bytes (with orjson when installed) with no Pydantic
+    # validation or jsonable_encoder pass. Only return plain dicts, lists, strings,
+    # numbers, booleans, None and datetimes.
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -0,0 +1,120 @@
+import gzip
+import hashlib
+from typing import Dict, Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.responses import Response
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Content codings in order of preference; br only when the brotli package is installed
+ENCODINGS = ("br", "gzip") if brotli is not None else ("gzip",)
+COMPRESSIBLE_TYPES = ("application/json", "text/plain", "text/csv", "text/html", "application/javascript")
+
+
+def etag_for(*parts) -> str:
+    # Strong ETag over everything the representation depends on
+    digest = hashlib.blake2b("\x1f".join(str(part) for part in parts).encode(), digest_size=16).hexdigest()
+    return f'"{digest}"'
+
+
+def if_none_match(header: Optional[str], etag: str) -> bool:
+    # True when the client already holds this representation. The compression middleware
+    # tags ETags with the coding it negotiated ("...-gzip"), so that suffix is ignored here.
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        for encoding in ("br", "gzip"):
+            if candidate.endswith(f'-{encoding}"'):
+                candidate = candidate[: -len(encoding) - 2] + '"'
+        if candidate == etag:
+            return True
+    return False
+
+
+def not_modified(headers: Dict[str, str]) -> Response:
+    return Response(status_code=304, headers=headers)
+
+
+def negotiate_encoding(accept_encoding: str) -> Optional[str]:
+    weights = {}
+    for item in accept_encoding.lower().split(","):
+        coding, _, params = item.strip().partition(";")
+        weight = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                weight = float(params[2:])
+            except ValueError:
+                weight = 0.0
+        weights[coding.strip()] = weight
+    for encoding in ENCODINGS:
+        if weights.get(encoding, weights.get("*", 0.0)) > 0:
+            return encoding
+    return None
+
+
+class CompressionMiddleware:
+    # Pure ASGI gzip/brotli for responses sent in one piece of at least minimum_size
+    # bytes; streamed responses (SSE, NDJSON exports) pass through as they are. The
+    # ETag of a response to a request that negotiated a coding gets that coding as a
+    # suffix, so the compressed and identity bodies never share a strong ETag.
+
+    def __init__(self, app, minimum_size: int = 1024, gzip_level: int = 6, brotli_quality: int = 4):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    def compress(self, encoding: str, body: bytes) -> bytes:
+        if encoding == "br":
+            return brotli.compress(body, quality=self.brotli_quality)
+        return gzip.compress(body, compresslevel=self.gzip_level, mtime=0)
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        start = None
+
+        async def send_wrapper(message) -> None:
+            nonlocal start
+            if message["type"] == "http.response.start":
+                start = message
+                return
+            if message["type"] == "http.response.body" and start is not None:
+                headers = MutableHeaders(scope=start)
+                compressible = headers.get("content-type", "").startswith(COMPRESSIBLE_TYPES)
+                etag = headers.get("etag")
+                if compressible or etag:
+                    headers.add_vary_header("Accept-Encoding")
+                # 304s included, so a revalidated cache entry keeps the ETag it was stored under
+                if encoding and etag and etag.startswith('"'):
+                    headers["etag"] = f'{etag[:-1]}-{encoding}"'
+                body = message.get("body", b"")
+                if (
+                    encoding
+                    and compressible
+                    and not message.get("more_body", False)
+                    and len(body) >= self.minimum_size
+                    and "content-encoding" not in headers
+                ):
+                    body = self.compress(encoding, body)
+                    headers["content-encoding"] = encoding
+                    headers["content-length"] = str(len(body))
+                    message = {**message, "body": body}
+                await send(start)
+                start = None
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
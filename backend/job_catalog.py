@@ -0,0 +1,222 @@
+import asyncio
+import bisect
+import hashlib
+import logging
+import time
+from typing import Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def job_key(job: Dict) -> Tuple:
+    return (job["job_posted_on"], job["id"])
+
+
+def job_digest(job: Dict) -> int:
+    return int.from_bytes(hashlib.blake2b(f"{job['id']}:{job.get('revision', 0)}".encode(), digest_size=16).digest(), "big")
+
+
+class JobCatalog:
+    # In-memory snapshot of every active job, shared by the listing and chatbot
+    # routes. Writes made by this worker are applied to the snapshot directly;
+    # writes from other workers are picked up by the TTL or the change stream.
+    # Subscribers (indexes built over the catalog) get the same upserts and
+    # removals, and a sync() with the full snapshot after every refresh.
+
+    def __init__(self, db, ttl_seconds: float = 60):
+        self.db = db
+        self.ttl_seconds = ttl_seconds
+        self.version = 0
+
+        # Snapshot sorted oldest first by (job_posted_on, id), with a parallel key list for bisect.
+        # Both are replaced, never mutated, so readers can keep iterating an old snapshot.
+        self._jobs: List[Dict] = []
+        self._keys: List[Tuple] = []
+        self._by_id: Dict[str, Dict] = {}
+        # XOR of the digests of the snapshot's (id, revision) pairs: equal in every worker
+        # holding the same jobs, unlike version, which counts this worker's snapshot swaps,
+        # and updated per job on writes
+        self._digest = 0
+        self.fingerprint = ""
+        self._loaded_at: Optional[float] = None
+        self._stale = True
+        self._refreshing = False
+        self._lock = asyncio.Lock()
+        self._watch_task: Optional[asyncio.Task] = None
+        self._subscribers = []
+
+        self.hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self.refresh_seconds_total = 0.0
+        self.last_refresh_seconds = 0.0
+
+    def subscribe(self, subscriber) -> None:
+        self._subscribers.append(subscriber)
+        subscriber.sync(self._jobs)
+
+    def _is_fresh(self) -> bool:
+        return (
+            not self._stale
+            and self._loaded_at is not None
+            and time.monotonic() - self._loaded_at < self.ttl_seconds
+        )
+
+    async def get_jobs(self) -> List[Dict]:
+        # Newest first, like the listing endpoints return them
+        await self._ensure_fresh()
+        return self._jobs[::-1]
+
+    async def get_job(self, job_id: str) -> Optional[Dict]:
+        await self._ensure_fresh()
+        return self._by_id.get(job_id)
+
+    async def get_fingerprint(self) -> str:
+        await self._ensure_fresh()
+        return self.fingerprint
+
+    async def ensure_fresh(self) -> None:
+        # For callers that only need the snapshot (and its subscribers) to be current
+        await self._ensure_fresh()
+
+    async def iter_jobs(self, after: Optional[Tuple] = None, newest_first: bool = True) -> Iterator[Dict]:
+        # Jobs in listing order, starting strictly after the (job_posted_on, id) key `after`
+        await self._ensure_fresh()
+        jobs, keys = self._jobs, self._keys
+        if newest_first:
+            start = bisect.bisect_left(keys, after) if after else len(jobs)
+            return (jobs[i] for i in range(start - 1, -1, -1))
+        start = bisect.bisect_right(keys, after) if after else 0
+        return (jobs[i] for i in range(start, len(jobs)))
+
+    async def _ensure_fresh(self) -> None:
+        if self._is_fresh():
+            self.hits += 1
+            return
+        self.misses += 1
+        async with self._lock:
+            # Another request may have refreshed the snapshot while we waited for the lock
+            if not self._is_fresh():
+                await self.refresh()
+
+    async def refresh(self) -> None:
+        # Clear the stale flag before reading so an invalidate() that lands
+        # mid-refresh forces another refresh instead of being lost
+        self._stale = False
+        started = time.perf_counter()
+        # Writes applied while the read is in flight may be missing from its result; they
+        # mark the catalog stale so the next read refreshes again
+        self._refreshing = True
+        try:
+            jobs = await self.db.jobs.find({"expired": False}, {"_id": 0}).to_list(None)
+        finally:
+            self._refreshing = False
+        self._set_snapshot(jobs)
+        self._loaded_at = time.monotonic()
+        for subscriber in self._subscribers:
+            subscriber.sync(self._jobs)
+
+        elapsed = time.perf_counter() - started
+        self.refreshes += 1
+        self.refresh_seconds_total += elapsed
+        self.last_refresh_seconds = elapsed
+        logger.info(f"Job catalog refreshed: {len(jobs)} jobs in {elapsed * 1000:.1f} ms (version {self.version})")
+
+    def _set_snapshot(self, jobs: List[Dict]) -> None:
+        jobs = sorted(jobs, key=job_key)
+        digest = 0
+        for job in jobs:
+            digest ^= job_digest(job)
+        self._jobs = jobs
+        self._keys = [job_key(job) for job in jobs]
+        self._by_id = {job["id"]: job for job in jobs}
+        self._set_digest(digest)
+
+    def _set_digest(self, digest: int) -> None:
+        self._digest = digest
+        self.fingerprint = f"{digest:032x}"
+        self.version += 1
+
+    def _without(self, jobs: List[Dict], keys: List[Tuple], job_id: str) -> int:
+        # Drops job_id from the (copied) lists and the id map; returns the digest change
+        old = self._by_id.pop(job_id, None)
+        if old is None:
+            return 0
+        index = bisect.bisect_left(keys, job_key(old))
+        del jobs[index], keys[index]
+        return job_digest(old)
+
+    def invalidate(self) -> None:
+        self._stale = True
+
+    def upsert(self, job: Dict) -> None:
+        # Write-through for a job this worker just inserted or updated
+        if job.get("expired"):
+            self.remove(job["id"])
+            return
+        job = {k: v for k, v in job.items() if k != "_id"}
+        if self._refreshing:
+            self._stale = True
+        # Copies, so iterators over the current snapshot are unaffected
+        jobs, keys = list(self._jobs), list(self._keys)
+        digest = self._digest ^ self._without(jobs, keys, job["id"])
+        key = job_key(job)
+        index = bisect.bisect_right(keys, key)
+        keys.insert(index, key)
+        jobs.insert(index, job)
+        self._jobs, self._keys = jobs, keys
+        self._by_id[job["id"]] = job
+        self._set_digest(digest ^ job_digest(job))
+        for subscriber in self._subscribers:
+            subscriber.upsert(job)
+
+    def remove(self, job_id: str) -> None:
+        if self._refreshing:
+            self._stale = True
+        if job_id in self._by_id:
+            jobs, keys = list(self._jobs), list(self._keys)
+            digest = self._digest ^ self._without(jobs, keys, job_id)
+            self._jobs, self._keys = jobs, keys
+            self._set_digest(digest)
+        for subscriber in self._subscribers:
+            subscriber.remove(job_id)
+
+    def start_change_stream(self) -> None:
+        self._watch_task = asyncio.create_task(self._watch())
+
+    async def stop_change_stream(self) -> None:
+        if self._watch_task:
+            self._watch_task.cancel()
+            try:
+                await self._watch_task
+            except asyncio.CancelledError:
+                pass
+            self._watch_task = None
+
+    async def _watch(self) -> None:
+        # Change streams need a replica set; on a standalone mongod we fall back to the TTL
+        try:
+            async with self.db.jobs.watch() as stream:
+                logger.info("Job catalog listening to the jobs change stream")
+                async for _ in stream:
+                    self.invalidate()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"Job catalog change stream stopped, relying on TTL: {e}")
+
+    def stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            "version": self.version,
+            "fingerprint": self.fingerprint,
+            "size": len(self._jobs),
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "refreshes": self.refreshes,
+            "refresh_seconds_total": self.refresh_seconds_total,
+            "last_refresh_seconds": self.last_refresh_seconds,
+            "change_stream": self._watch_task is not None and not self._watch_task.done(),
+        }
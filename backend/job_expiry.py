@@ -0,0 +1,155 @@
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, List, Optional
+
+from pymongo.errors import BulkWriteError
+
+logger = logging.getLogger(__name__)
+
+DUPLICATE_KEY = 11000
+
+
+class JobExpiryScheduler:
+    # Every interval_seconds, marks active jobs posted more than lifetime_days ago as
+    # expired, batch_size at a time with update_many, then moves jobs that have been
+    # expired for archive_after_days into the archive collection. Every worker runs
+    # one; the updates are idempotent, so overlapping sweeps only repeat work.
+    # on_expired is called with the ids expired by each batch.
+
+    def __init__(
+        self,
+        db,
+        lifetime_days: float = 30,
+        archive_after_days: float = 90,
+        interval_seconds: float = 300,
+        batch_size: int = 500,
+        archive_collection: str = "jobs_archive",
+        on_expired: Optional[Callable[[List[str]], None]] = None,
+    ):
+        self.db = db
+        self.lifetime_days = lifetime_days
+        self.archive_after_days = archive_after_days
+        self.interval_seconds = interval_seconds
+        self.batch_size = batch_size
+        self.archive_collection = archive_collection
+        self.on_expired = on_expired
+        self._task: Optional[asyncio.Task] = None
+
+        self.runs = 0
+        self.errors = 0
+        self.batches = 0
+        self.expired = 0
+        self.archived = 0
+        self.batch_seconds_total = 0.0
+        self.max_batch_seconds = 0.0
+        self.last_run_at: Optional[datetime] = None
+
+    def start(self) -> None:
+        if self.lifetime_days > 0:
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _loop(self) -> None:
+        while True:
+            try:
+                await self.run_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.errors += 1
+                logger.error(f"Job expiry sweep failed: {e}")
+            await asyncio.sleep(self.interval_seconds)
+
+    async def run_once(self, now: Optional[datetime] = None) -> Dict:
+        now = now or datetime.now(timezone.utc)
+        expired = archived = 0
+        # lifetime_days 0 turns expiry off; jobs already expired are still archived
+        while self.lifetime_days > 0:
+            count = await self._expire_batch(now)
+            expired += count
+            if count < self.batch_size:
+                break
+        if self.archive_after_days > 0:
+            while True:
+                count = await self._archive_batch(now)
+                archived += count
+                if count < self.batch_size:
+                    break
+        self.runs += 1
+        self.last_run_at = now
+        if expired or archived:
+            logger.info(f"Job expiry: expired {expired}, archived {archived}")
+        return {"expired": expired, "archived": archived}
+
+    def _record_batch(self, started: float) -> None:
+        elapsed = time.perf_counter() - started
+        self.batches += 1
+        self.batch_seconds_total += elapsed
+        self.max_batch_seconds = max(self.max_batch_seconds, elapsed)
+
+    async def _expire_batch(self, now: datetime) -> int:
+        # Oldest first through the active-jobs index; re-checking expired in the update
+        # keeps a job another worker got to first from being counted twice
+        started = time.perf_counter()
+        cutoff = now - timedelta(days=self.lifetime_days)
+        docs = await self.db.jobs.find(
+            {"expired": False, "job_posted_on": {"$lt": cutoff}}, {"_id": 0, "id": 1}
+        ).sort("job_posted_on", 1).limit(self.batch_size).to_list(self.batch_size)
+        if not docs:
+            return 0
+        ids = [doc["id"] for doc in docs]
+        result = await self.db.jobs.update_many(
+            {"id": {"$in": ids}, "expired": False},
+            {"$set": {"expired": True, "expired_at": now}},
+        )
+        self._record_batch(started)
+        self.expired += result.modified_count
+        if result.modified_count and self.on_expired is not None:
+            self.on_expired(ids)
+        # The batch's size, not modified_count, decides whether to go round again
+        return len(docs)
+
+    async def _archive_batch(self, now: datetime) -> int:
+        # Copy, then delete. A crash in between leaves jobs in both collections and the
+        # next sweep copies them again; the archive's unique id index turns that into
+        # duplicate-key errors, which are expected here.
+        started = time.perf_counter()
+        cutoff = now - timedelta(days=self.archive_after_days)
+        docs = await self.db.jobs.find(
+            {"expired": True, "expired_at": {"$lt": cutoff}}
+        ).limit(self.batch_size).to_list(self.batch_size)
+        if not docs:
+            return 0
+        try:
+            await self.db[self.archive_collection].insert_many(docs, ordered=False)
+        except BulkWriteError as e:
+            if any(error["code"] != DUPLICATE_KEY for error in e.details.get("writeErrors", [])):
+                raise
+        result = await self.db.jobs.delete_many({"_id": {"$in": [doc["_id"] for doc in docs]}})
+        self._record_batch(started)
+        self.archived += result.deleted_count
+        return len(docs)
+
+    def stats(self) -> Dict:
+        return {
+            "lifetime_days": self.lifetime_days,
+            "archive_after_days": self.archive_after_days,
+            "interval_seconds": self.interval_seconds,
+            "batch_size": self.batch_size,
+            "running": self._task is not None,
+            "runs": self.runs,
+            "errors": self.errors,
+            "batches": self.batches,
+            "expired": self.expired,
+            "archived": self.archived,
+            "batch_seconds_total": self.batch_seconds_total,
+            "max_batch_seconds": self.max_batch_seconds,
+            "last_run_at": self.last_run_at.isoformat() if self.last_run_at else None,
+        }
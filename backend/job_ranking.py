@@ -0,0 +1,236 @@
+import bisect
+import hashlib
+import math
+import re
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#]*(?:\.[a-z0-9]+)*")
+
+STOPWORDS = frozenset("""
+a about above after all also am an and any are as at be been being but by can could did do does doing
+for from had has have having he her here hers him his how i if in into is it its itself just me more
+most my no nor not of off on once only or other our ours out over own same she should so some such
+than that the their them then there these they this those through to too under until up very was we
+were what when where which while who whom why will with would you your yours
+""".split())
+
+# Terms in a job's title count three times, category twice, everything else once
+FIELD_WEIGHTS = {
+    "title": 3.0,
+    "category": 2.0,
+    "description": 1.0,
+    "city": 1.0,
+    "country": 1.0,
+    "location": 1.0,
+}
+
+
+# Typeahead: the last, possibly unfinished, word of a search matches up to this many
+# indexed terms that start with it, each weighted below an exact match
+PREFIX_EXPANSION_LIMIT = 50
+PREFIX_WEIGHT = 0.5
+
+
+def tokenize(text: str) -> List[str]:
+    return [token for token in TOKEN_RE.findall(text.lower()) if token not in STOPWORDS]
+
+
+def job_terms(job: Dict) -> Dict[str, float]:
+    terms: Dict[str, float] = {}
+    for field, weight in FIELD_WEIGHTS.items():
+        for token in tokenize(str(job.get(field) or "")):
+            terms[token] = terms.get(token, 0.0) + weight
+    return terms
+
+
+def job_fingerprint(job: Dict) -> str:
+    text = "\x1f".join(str(job.get(field) or "") for field in FIELD_WEIGHTS)
+    return hashlib.sha1(text.encode()).hexdigest()
+
+
+class JobIndex:
+    # Incrementally maintained BM25 index over the active jobs. Each job occupies a
+    # slot; postings map a term to the slots containing it. Scoring concatenates
+    # the postings of every query term and accumulates them over all slots in one
+    # vectorized pass, so a resume is ranked against the whole catalog at once.
+    # The same index serves keyword search, with prefix matching on the sorted
+    # vocabulary for typeahead.
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+
+        self._slot_by_id: Dict[str, int] = {}
+        self._free_slots: List[int] = []
+        self._jobs: List[Optional[Dict]] = []
+        self._doc_terms: List[Dict[str, float]] = []
+        self._fingerprints: Dict[str, str] = {}
+        self._doc_len = np.zeros(0, dtype=np.float64)
+        self._total_len = 0.0
+
+        self._postings: Dict[str, Dict[int, float]] = {}
+        # Per-term numpy views of the postings, rebuilt lazily after a change
+        self._arrays: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        # Sorted vocabulary for prefix lookups, rebuilt lazily when terms come or go
+        self._vocabulary: List[str] = []
+        self._vocabulary_stale = False
+
+    def __len__(self) -> int:
+        return len(self._slot_by_id)
+
+    def upsert(self, job: Dict) -> None:
+        fingerprint = job_fingerprint(job)
+        if job["id"] in self._slot_by_id:
+            if self._fingerprints[job["id"]] == fingerprint:
+                # Same searchable text; just keep the newest copy of the document
+                self._jobs[self._slot_by_id[job["id"]]] = job
+                return
+            self.remove(job["id"])
+
+        slot = self._allocate_slot()
+        terms = job_terms(job)
+        self._slot_by_id[job["id"]] = slot
+        self._jobs[slot] = job
+        self._doc_terms[slot] = terms
+        self._fingerprints[job["id"]] = fingerprint
+
+        length = sum(terms.values())
+        self._doc_len[slot] = length
+        self._total_len += length
+        for term, tf in terms.items():
+            if term not in self._postings:
+                self._postings[term] = {}
+                self._vocabulary_stale = True
+            self._postings[term][slot] = tf
+            self._arrays.pop(term, None)
+
+    def remove(self, job_id: str) -> None:
+        slot = self._slot_by_id.pop(job_id, None)
+        if slot is None:
+            return
+        for term in self._doc_terms[slot]:
+            postings = self._postings[term]
+            del postings[slot]
+            if not postings:
+                del self._postings[term]
+                self._vocabulary_stale = True
+            self._arrays.pop(term, None)
+
+        self._total_len -= self._doc_len[slot]
+        self._doc_len[slot] = 0.0
+        self._jobs[slot] = None
+        self._doc_terms[slot] = {}
+        del self._fingerprints[job_id]
+        self._free_slots.append(slot)
+
+    def sync(self, jobs: Iterable[Dict]) -> None:
+        # Bring the index in line with a full catalog snapshot, touching only what changed
+        seen = set()
+        for job in jobs:
+            seen.add(job["id"])
+            self.upsert(job)
+        for job_id in [job_id for job_id in self._slot_by_id if job_id not in seen]:
+            self.remove(job_id)
+
+    def _allocate_slot(self) -> int:
+        if self._free_slots:
+            return self._free_slots.pop()
+        slot = len(self._jobs)
+        self._jobs.append(None)
+        self._doc_terms.append({})
+        if slot >= len(self._doc_len):
+            grown = np.zeros(max(16, 2 * len(self._doc_len)), dtype=np.float64)
+            grown[:len(self._doc_len)] = self._doc_len
+            self._doc_len = grown
+        return slot
+
+    def _term_arrays(self, term: str) -> Tuple[np.ndarray, np.ndarray]:
+        arrays = self._arrays.get(term)
+        if arrays is None:
+            postings = self._postings[term]
+            arrays = (
+                np.fromiter(postings.keys(), dtype=np.int64, count=len(postings)),
+                np.fromiter(postings.values(), dtype=np.float64, count=len(postings)),
+            )
+            self._arrays[term] = arrays
+        return arrays
+
+    def score_terms(self, query_terms: Dict[str, float]) -> np.ndarray:
+        # BM25 score of every slot for weighted query terms; empty slots score 0
+        scores = np.zeros(len(self._jobs), dtype=np.float64)
+        terms = [term for term in query_terms if term in self._postings]
+        if not terms or not self._slot_by_id:
+            return scores
+
+        doc_count = len(self._slot_by_id)
+        avg_len = self._total_len / doc_count if self._total_len else 1.0
+        arrays = [self._term_arrays(term) for term in terms]
+        slots = np.concatenate([a[0] for a in arrays])
+        tf = np.concatenate([a[1] for a in arrays])
+
+        df = np.array([len(a[0]) for a in arrays], dtype=np.float64)
+        idf = np.log1p((doc_count - df + 0.5) / (df + 0.5))
+        weights = np.array([query_terms[term] for term in terms], dtype=np.float64)
+        term_weight = np.repeat(idf * weights, [len(a[0]) for a in arrays])
+
+        norm = self.k1 * (1 - self.b + self.b * self._doc_len[slots] / avg_len)
+        contributions = term_weight * tf * (self.k1 + 1) / (tf + norm)
+        scores += np.bincount(slots, weights=contributions, minlength=len(self._jobs))
+        return scores
+
+    def _top(self, scores: np.ndarray, k: int) -> Tuple[np.ndarray, int]:
+        # Slots of the k best positive scores, best first, and how many slots matched at all
+        matched = np.flatnonzero(scores > 0)
+        total = len(matched)
+        if total > k:
+            # Jobs tied at the cut are kept in slot order, like ties everywhere else
+            kth = np.partition(scores[matched], total - k)[total - k]
+            better = matched[scores[matched] > kth]
+            tied = matched[scores[matched] == kth][:k - len(better)]
+            matched = np.concatenate([better, tied])
+        return matched[np.argsort(-scores[matched], kind="stable")], total
+
+    def rank(self, text: str, k: int) -> List[Tuple[Dict, float]]:
+        # Top k jobs for free text, best first; only jobs sharing at least one term are returned
+        counts = Counter(tokenize(text))
+        # Damp repeated words so a long resume is not dominated by its most frequent term
+        query_terms = {term: 1.0 + math.log(count) for term, count in counts.items()}
+        scores = self.score_terms(query_terms)
+        order, _ = self._top(scores, k)
+        return [(self._jobs[slot], float(scores[slot])) for slot in order]
+
+    def expand_prefix(self, prefix: str) -> List[str]:
+        if self._vocabulary_stale:
+            self._vocabulary = sorted(self._postings)
+            self._vocabulary_stale = False
+        start = bisect.bisect_left(self._vocabulary, prefix)
+        terms = []
+        for term in self._vocabulary[start:start + PREFIX_EXPANSION_LIMIT]:
+            if not term.startswith(prefix):
+                break
+            terms.append(term)
+        return terms
+
+    def search(self, query: str, limit: int, offset: int = 0) -> Tuple[List[Dict], int]:
+        # Ranked keyword search; returns one page of jobs and the total number of matches.
+        # Unless the query ends with a space, its last word is also matched as a prefix.
+        tokens = tokenize(query)
+        if not tokens or limit <= 0:
+            return [], 0
+        query_terms = {token: 1.0 for token in tokens}
+        if not query[-1].isspace():
+            for term in self.expand_prefix(tokens[-1]):
+                query_terms.setdefault(term, PREFIX_WEIGHT)
+
+        order, total = self._top(self.score_terms(query_terms), offset + limit)
+        return [self._jobs[slot] for slot in order[offset:]], total
+
+    def stats(self) -> Dict:
+        return {
+            "jobs": len(self._slot_by_id),
+            "terms": len(self._postings),
+            "slots": len(self._jobs),
+        }
@@ -0,0 +1,193 @@
+import asyncio
+import logging
+import os
+import sys
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from pymongo import ReplaceOne
+from pymongo.errors import DuplicateKeyError
+
+logger = logging.getLogger(__name__)
+
+# Per-job application counters, one job_stats document per job:
+#
+#   {job_id, employer_id, total, by_status: {status: n}, hourly: {"HH": {"h": hour, "n": n}}}
+#
+# hourly is a ring of 24 buckets keyed by hour of day; "h" is the bucket's hour since
+# the epoch, so a bucket last written a day or more ago is stale and gets reset by the
+# next application in that hour of day. The document never grows past 24 buckets.
+
+RECENT_HOURS = 24
+BATCH_SIZE = 1000
+
+
+def hour_of(moment: datetime) -> int:
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return int(moment.timestamp() // 3600)
+
+
+def bucket_key(hour: int) -> str:
+    return f"{hour % 24:02d}"
+
+
+def recent_count(stats: Dict, now: datetime) -> int:
+    current = hour_of(now)
+    return sum(
+        bucket.get("n", 0)
+        for bucket in (stats.get("hourly") or {}).values()
+        if current - RECENT_HOURS < bucket.get("h", 0) <= current
+    )
+
+
+async def record_application(db, application: Dict, delta: int = 1) -> None:
+    # Adds (delta=1, on apply) or removes (delta=-1, on delete) one application from its
+    # job's counters, in a single atomic update.
+    job_id = application.get("job_id")
+    if not job_id:
+        return
+    hour = hour_of(application["created_at"])
+    key = f"hourly.{bucket_key(hour)}"
+    counters = {"total": delta, f"by_status.{application.get('status', 'pending')}": delta}
+
+    # Common case: the application's hour bucket is current
+    result = await db.job_stats.update_one(
+        {"job_id": job_id, f"{key}.h": hour},
+        {"$inc": {**counters, f"{key}.n": delta}},
+    )
+    if result.matched_count or delta < 0:
+        if not result.matched_count:
+            # Removing an application whose bucket has already rolled over
+            await db.job_stats.update_one({"job_id": job_id}, {"$inc": counters})
+        return
+
+    # First application in this hour: claim the bucket from whichever day it last held.
+    # A concurrent claim makes the filter miss and the upsert collide; go round again.
+    for _ in range(3):
+        try:
+            await db.job_stats.update_one(
+                {"job_id": job_id, f"{key}.h": {"$ne": hour}},
+                {
+                    "$inc": counters,
+                    "$set": {key: {"h": hour, "n": 1}},
+                    "$setOnInsert": {"employer_id": application["employer_id"]["user"]},
+                },
+                upsert=True,
+            )
+            return
+        except DuplicateKeyError:
+            result = await db.job_stats.update_one(
+                {"job_id": job_id, f"{key}.h": hour},
+                {"$inc": {**counters, f"{key}.n": delta}},
+            )
+            if result.matched_count:
+                return
+    logger.warning(f"Could not update application counters for job {job_id}; run job_stats.py to repair")
+
+
+async def employer_dashboard(db, employer_id: str, now: datetime) -> List[Dict]:
+    # Every job the employer posted with its counters, newest first, in one aggregation
+    # over jobs (posted_by index) joined to job_stats (job_id index)
+    rows = await db.jobs.aggregate([
+        {"$match": {"posted_by": employer_id}},
+        {"$sort": {"job_posted_on": -1}},
+        {"$lookup": {"from": "job_stats", "localField": "id", "foreignField": "job_id", "as": "stats"}},
+        {"$project": {"_id": 0, "id": 1, "title": 1, "expired": 1, "job_posted_on": 1, "stats": 1}},
+    ]).to_list(None)
+
+    dashboard = []
+    for row in rows:
+        stats = (row.pop("stats", None) or [{}])[0]
+        dashboard.append({
+            **row,
+            "applications": {
+                "total": stats.get("total", 0),
+                "last_24h": recent_count(stats, now),
+                "by_status": stats.get("by_status", {}),
+            },
+        })
+    return dashboard
+
+
+async def rebuild_job_stats(db, job_id: Optional[str] = None, now: Optional[datetime] = None) -> int:
+    # Recomputes job_stats from the applications with $group and replaces what is
+    # there; for backfilling, or repairing counters after a crash between writes.
+    # Applications arriving while it runs may be counted twice or not at all, so run
+    # it again (or for that job) if the two overlapped.
+    now = now or datetime.now(timezone.utc)
+    match: Dict = {"job_id": {"$type": "string"}}
+    if job_id:
+        match = {"job_id": job_id}
+
+    stats: Dict[str, Dict] = {}
+    async for group in db.applications.aggregate([
+        {"$match": match},
+        {"$group": {
+            "_id": {"job_id": "$job_id", "status": "$status"},
+            "n": {"$sum": 1},
+            "employer_id": {"$first": "$employer_id.user"},
+        }},
+    ]):
+        doc = stats.setdefault(group["_id"]["job_id"], {
+            "job_id": group["_id"]["job_id"],
+            "employer_id": group["employer_id"],
+            "total": 0,
+            "by_status": {},
+            "hourly": {},
+        })
+        doc["total"] += group["n"]
+        status = group["_id"]["status"] or "pending"
+        doc["by_status"][status] = doc["by_status"].get(status, 0) + group["n"]
+
+    cutoff = now - timedelta(hours=RECENT_HOURS)
+    async for group in db.applications.aggregate([
+        {"$match": {**match, "created_at": {"$gt": cutoff}}},
+        {"$group": {
+            "_id": {
+                "job_id": "$job_id",
+                "hour": {"$dateToString": {"format": "%Y-%m-%dT%H", "date": "$created_at"}},
+            },
+            "n": {"$sum": 1},
+        }},
+    ]):
+        hour = hour_of(datetime.strptime(group["_id"]["hour"], "%Y-%m-%dT%H"))
+        stats[group["_id"]["job_id"]]["hourly"][bucket_key(hour)] = {"h": hour, "n": group["n"]}
+
+    batch = []
+    for doc in stats.values():
+        batch.append(ReplaceOne({"job_id": doc["job_id"]}, doc, upsert=True))
+        if len(batch) >= BATCH_SIZE:
+            await db.job_stats.bulk_write(batch, ordered=False)
+            batch = []
+    if batch:
+        await db.job_stats.bulk_write(batch, ordered=False)
+
+    # Jobs whose applications are all gone
+    if job_id is None:
+        await db.job_stats.delete_many({"job_id": {"$nin": list(stats)}})
+    elif job_id not in stats:
+        await db.job_stats.delete_one({"job_id": job_id})
+    return len(stats)
+
+
+async def main(job_id: Optional[str]) -> None:
+    from dotenv import load_dotenv
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+    load_dotenv(Path(__file__).parent / '.env')
+    client = AsyncIOMotorClient(os.environ['MONGO_URL'], tz_aware=True)
+    db = client[os.environ['DB_NAME']]
+    try:
+        rebuilt = await rebuild_job_stats(db, job_id)
+        logger.info(f"Rebuilt application counters for {rebuilt} jobs")
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    # python job_stats.py              rebuild every job's application counters
+    # python job_stats.py JOB_ID       rebuild one job's
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main(sys.argv[1] if len(sys.argv) > 1 else None))
@@ -0,0 +1,52 @@
+import json
+from typing import TYPE_CHECKING, AsyncIterator, Callable, Dict, Optional
+
+import httpx
+
+if TYPE_CHECKING:
+    from openai import AsyncOpenAI
+
+
+def create_llm_client(
+    api_key: Optional[str],
+    base_url: str,
+    timeout_seconds: float = 60,
+    max_connections: int = 100,
+    max_retries: int = 2,
+) -> "AsyncOpenAI":
+    # One pooled HTTP client per worker; keep-alive connections are reused across requests.
+    # The SDK is imported here, the first time a worker needs the LLM.
+    from openai import AsyncOpenAI
+
+    http_client = httpx.AsyncClient(
+        limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+        timeout=httpx.Timeout(timeout_seconds, connect=10.0),
+    )
+    return AsyncOpenAI(
+        api_key=api_key,
+        base_url=base_url,
+        http_client=http_client,
+        timeout=timeout_seconds,
+        max_retries=max_retries,
+    )
+
+
+async def stream_completion(
+    client: "AsyncOpenAI", on_usage: Optional[Callable] = None, **kwargs
+) -> AsyncIterator[str]:
+    # Yields the content deltas of a chat completion as they arrive. With on_usage, asks
+    # for the token usage, which arrives in a final chunk without choices, and passes it on.
+    if on_usage is not None:
+        kwargs["stream_options"] = {"include_usage": True}
+    stream = await client.chat.completions.create(stream=True, **kwargs)
+    async with stream:
+        async for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+            if on_usage is not None and getattr(chunk, "usage", None):
+                on_usage(chunk.usage)
+
+
+def sse_event(data: Dict, event: Optional[str] = None) -> str:
+    message = f"event: {event}\n" if event else ""
+    return message + f"data: {json.dumps(data, default=str)}\n\n"
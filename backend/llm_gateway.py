@@ -0,0 +1,267 @@
+import asyncio
+import contextlib
+import hashlib
+import json
+import logging
+import math
+import sys
+import time
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional
+
+from fastapi import HTTPException
+
+from llm import stream_completion
+from metrics import LLM_REQUEST_SECONDS, LLM_TOKENS, record_phase
+from prompt_builder import count_tokens
+
+logger = logging.getLogger(__name__)
+
+
+def record_usage(model: str, usage) -> None:
+    LLM_TOKENS.inc(usage.prompt_tokens, model=model, type="prompt")
+    LLM_TOKENS.inc(usage.completion_tokens, model=model, type="completion")
+
+
+def record_call(model: str, mode: str, started: float) -> None:
+    elapsed = time.perf_counter() - started
+    LLM_REQUEST_SECONDS.observe(elapsed, model=model, mode=mode)
+    record_phase("llm", elapsed)
+
+
+def is_rate_limit_error(error: Exception) -> bool:
+    # The SDK is loaded along with the client, so any error from a call finds it here
+    openai = sys.modules.get("openai")
+    return openai is not None and isinstance(error, openai.RateLimitError)
+
+
+def estimate_cost(messages: List[Dict], max_tokens: int) -> int:
+    # Upper bound on the tokens a completion can consume: the prompt plus its output limit
+    return sum(count_tokens(message["content"]) for message in messages) + max_tokens
+
+
+class LLMGateway:
+    # Every chat completion goes through here. A call is admitted once the user has
+    # a free per-user slot, the token bucket can cover its estimated cost and a
+    # global concurrency slot opens up. Callers wait in a bounded queue for at most
+    # queue_timeout_seconds; past that, or with the queue full, they get 503 (or
+    # 429 for per-user and budget limits) with Retry-After. Identical non-streaming
+    # requests in flight at the same time share one upstream call.
+
+    def __init__(
+        self,
+        client_factory: Callable[[], Any],
+        max_concurrency: int = 32,
+        user_concurrency: int = 2,
+        max_queue: int = 200,
+        queue_timeout_seconds: float = 10,
+        tokens_per_minute: int = 0,
+    ):
+        # The client is built on first use, so workers that never call the LLM never
+        # import the SDK; assigning `client` directly replaces it (tests, benchmarks)
+        self._client_factory = client_factory
+        self._client = None
+        self.max_concurrency = max_concurrency
+        self.user_concurrency = user_concurrency
+        self.max_queue = max_queue
+        self.queue_timeout_seconds = queue_timeout_seconds
+        # 0 disables the token bucket; otherwise it holds at most one minute's budget
+        self.tokens_per_minute = tokens_per_minute
+
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._user_in_flight: Dict[str, int] = {}
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._tokens = float(tokens_per_minute)
+        self._tokens_updated = time.monotonic()
+        self._in_flight = 0
+        self._queued = 0
+        self._call_seconds = 1.0
+
+        self.admitted = 0
+        self.coalesced = 0
+        self.rejected_queue_full = 0
+        self.rejected_timeout = 0
+        self.rejected_user = 0
+        self.rejected_budget = 0
+        self.upstream_rate_limited = 0
+        self.wait_seconds_total = 0.0
+        self.max_wait_seconds = 0.0
+
+    @property
+    def client(self):
+        if self._client is None:
+            self._client = self._client_factory()
+        return self._client
+
+    @client.setter
+    def client(self, client) -> None:
+        self._client = client
+
+    async def close(self) -> None:
+        # Closes the pooled HTTP connections, if the client was ever built
+        if self._client is not None:
+            await self._client.close()
+            self._client = None
+
+    def _retry_after(self, seconds: Optional[float] = None) -> Dict[str, str]:
+        # Without a better estimate, suggest roughly how long a call takes
+        return {"Retry-After": str(max(1, math.ceil(seconds if seconds is not None else self._call_seconds)))}
+
+    def _reserve_tokens(self, cost: int) -> float:
+        # Takes cost from the bucket, possibly into debt; returns how long to wait for the debt to clear
+        if not self.tokens_per_minute:
+            return 0.0
+        now = time.monotonic()
+        rate = self.tokens_per_minute / 60
+        self._tokens = min(self.tokens_per_minute, self._tokens + (now - self._tokens_updated) * rate)
+        self._tokens_updated = now
+        self._tokens -= cost
+        return max(0.0, -self._tokens / rate)
+
+    def _refund_tokens(self, tokens: int) -> None:
+        if self.tokens_per_minute:
+            self._tokens = min(self.tokens_per_minute, self._tokens + tokens)
+
+    @contextlib.asynccontextmanager
+    async def admit(self, user_id: Optional[str], cost: int):
+        if user_id is not None and self._user_in_flight.get(user_id, 0) >= self.user_concurrency:
+            self.rejected_user += 1
+            raise HTTPException(
+                status_code=429,
+                detail="You already have requests in progress, please wait for them to finish",
+                headers=self._retry_after(),
+            )
+        if self._queued >= self.max_queue:
+            self.rejected_queue_full += 1
+            raise HTTPException(status_code=503, detail="AI assistant is busy, please try again shortly", headers=self._retry_after())
+
+        budget_wait = self._reserve_tokens(cost)
+        if budget_wait > self.queue_timeout_seconds:
+            self._refund_tokens(cost)
+            self.rejected_budget += 1
+            raise HTTPException(status_code=429, detail="AI usage limit reached, please try again later", headers=self._retry_after(budget_wait))
+
+        if user_id is not None:
+            self._user_in_flight[user_id] = self._user_in_flight.get(user_id, 0) + 1
+        started = time.monotonic()
+        if budget_wait or self._semaphore.locked():
+            self._queued += 1
+            try:
+                await asyncio.sleep(budget_wait)
+                await asyncio.wait_for(self._semaphore.acquire(), self.queue_timeout_seconds - budget_wait)
+            except BaseException as e:
+                self._refund_tokens(cost)
+                self._release_user(user_id)
+                if not isinstance(e, asyncio.TimeoutError):
+                    raise
+                self.rejected_timeout += 1
+                raise HTTPException(status_code=503, detail="AI assistant is busy, please try again shortly", headers=self._retry_after())
+            finally:
+                self._queued -= 1
+        else:
+            await self._semaphore.acquire()
+
+        waited = time.monotonic() - started
+        self._in_flight += 1
+        self.admitted += 1
+        self.wait_seconds_total += waited
+        self.max_wait_seconds = max(self.max_wait_seconds, waited)
+        try:
+            call_started = time.monotonic()
+            yield
+            # Moving average of call duration, used for Retry-After
+            self._call_seconds = 0.8 * self._call_seconds + 0.2 * (time.monotonic() - call_started)
+        except Exception as e:
+            if not is_rate_limit_error(e):
+                raise
+            self.upstream_rate_limited += 1
+            logger.warning(f"LLM provider rate limited the request: {e}")
+            retry_after = e.response.headers.get("retry-after") if e.response is not None else None
+            raise HTTPException(
+                status_code=429,
+                detail="AI assistant is busy, please try again shortly",
+                headers={"Retry-After": retry_after} if retry_after else self._retry_after(),
+            )
+        finally:
+            self._in_flight -= 1
+            self._semaphore.release()
+            self._release_user(user_id)
+
+    def _release_user(self, user_id: Optional[str]) -> None:
+        if user_id is None:
+            return
+        remaining = self._user_in_flight.get(user_id, 1) - 1
+        if remaining:
+            self._user_in_flight[user_id] = remaining
+        else:
+            self._user_in_flight.pop(user_id, None)
+
+    async def complete(self, user_id: Optional[str], **kwargs) -> str:
+        # Content of a chat completion; pass user_id=None for background work that
+        # should not count against a user's limit
+        key = hashlib.sha256(json.dumps(kwargs, sort_keys=True, default=str).encode()).hexdigest()
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            task = asyncio.ensure_future(self._complete(user_id, kwargs))
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._inflight.pop(key) if self._inflight.get(key) is done else None)
+        # Shielded so one caller disconnecting does not cancel the call for the others
+        return await asyncio.shield(task)
+
+    async def _complete(self, user_id: Optional[str], kwargs: Dict) -> str:
+        cost = estimate_cost(kwargs["messages"], kwargs.get("max_tokens", 0))
+        async with self.admit(user_id, cost):
+            started = time.perf_counter()
+            try:
+                response = await self.client.chat.completions.create(**kwargs)
+            finally:
+                record_call(kwargs.get("model", ""), "complete", started)
+        if response.usage:
+            record_usage(kwargs.get("model", ""), response.usage)
+            self._refund_tokens(cost - response.usage.total_tokens)
+        return response.choices[0].message.content
+
+    async def open_stream(self, user_id: Optional[str], **kwargs) -> AsyncIterator[str]:
+        # Waits for admission, so overload surfaces as an HTTP error before the
+        # response starts, then returns an iterator over the content deltas
+        deltas = self._stream(user_id, kwargs)
+        await deltas.__anext__()
+        return deltas
+
+    async def _stream(self, user_id: Optional[str], kwargs: Dict) -> AsyncIterator[str]:
+        cost = estimate_cost(kwargs["messages"], kwargs.get("max_tokens", 0))
+        async with self.admit(user_id, cost):
+            yield ""
+            model = kwargs.get("model", "")
+            started = time.perf_counter()
+            try:
+                async for delta in stream_completion(
+                    self.client, on_usage=lambda usage: record_usage(model, usage), **kwargs
+                ):
+                    yield delta
+            finally:
+                record_call(model, "stream", started)
+
+    def stats(self) -> Dict:
+        return {
+            "max_concurrency": self.max_concurrency,
+            "user_concurrency": self.user_concurrency,
+            "max_queue": self.max_queue,
+            "in_flight": self._in_flight,
+            "queued": self._queued,
+            "coalescing": len(self._inflight),
+            "admitted": self.admitted,
+            "coalesced": self.coalesced,
+            "rejected_queue_full": self.rejected_queue_full,
+            "rejected_timeout": self.rejected_timeout,
+            "rejected_user": self.rejected_user,
+            "rejected_budget": self.rejected_budget,
+            "upstream_rate_limited": self.upstream_rate_limited,
+            "wait_seconds_total": self.wait_seconds_total,
+            "avg_wait_seconds": self.wait_seconds_total / self.admitted if self.admitted else 0.0,
+            "max_wait_seconds": self.max_wait_seconds,
+            "tokens_per_minute": self.tokens_per_minute,
+            "tokens_available": self._tokens if self.tokens_per_minute else None,
+            "client_loaded": self._client is not None,
+        }
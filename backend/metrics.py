@@ -0,0 +1,358 @@
+import bisect
+import threading
+import time
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from pymongo import monitoring
+from starlette.datastructures import MutableHeaders
+
+# Counters and histograms in the Prometheus text format, served by /api/metrics. Values
+# are per worker process; Prometheus sums them across workers when scraping each one.
+# Observations may come from Motor's executor threads, so every metric has a lock.
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(value)
+
+
+class Counter:
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(tuple(str(labels[name]) for name in self.labelnames), 0)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}")
+        return lines
+
+
+class Gauge:
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def set(self, value: float, **labels) -> None:
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        with self._lock:
+            self._values[key] = value
+
+    def value(self, **labels) -> float:
+        return self._values.get(tuple(str(labels[name]) for name in self.labelnames), 0)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} gauge"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Label values -> [count per bucket (+Inf last), sum]
+        self._values: Dict[Tuple, list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels) -> None:
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            entry[0][index] += 1
+            entry[1] += value
+
+    def count(self, **labels) -> int:
+        entry = self._values.get(tuple(str(labels[name]) for name in self.labelnames))
+        return sum(entry[0]) if entry else 0
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = sorted((key, (list(counts), total)) for key, (counts, total) in self._values.items())
+        for key, (counts, total) in items:
+            cumulative = 0
+            for bound, count in zip([*self.buckets, "+Inf"], counts):
+                cumulative += count
+                le = 'le="+Inf"' if bound == "+Inf" else f'le="{bound}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: List = []
+
+    def counter(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Counter:
+        metric = Counter(name, help, labelnames)
+        self._metrics.append(metric)
+        return metric
+
+    def gauge(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Gauge:
+        metric = Gauge(name, help, labelnames)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        metric = Histogram(name, help, labelnames, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+HTTP_REQUESTS = REGISTRY.counter(
+    "http_requests_total", "HTTP requests by route template and status code", ["method", "route", "status"])
+HTTP_REQUEST_SECONDS = REGISTRY.histogram(
+    "http_request_duration_seconds", "Time until the response body was sent", ["method", "route"])
+MONGO_COMMAND_SECONDS = REGISTRY.histogram(
+    "mongo_command_duration_seconds", "MongoDB command round trips", ["command", "collection"])
+MONGO_COMMAND_FAILURES = REGISTRY.counter(
+    "mongo_command_failures_total", "MongoDB commands that returned an error", ["command", "collection"])
+MONGO_POOL_CONNECTIONS = REGISTRY.gauge(
+    "mongo_pool_connections", "Open connections in each server's pool", ["address", "state"])
+MONGO_POOL_WAITING = REGISTRY.gauge(
+    "mongo_pool_waiting", "Operations waiting to check out a connection", ["address"])
+MONGO_POOL_CHECKOUT_SECONDS = REGISTRY.histogram(
+    "mongo_pool_checkout_duration_seconds", "Time to check out a connection, queueing included", ["address"])
+MONGO_POOL_CHECKOUT_FAILURES = REGISTRY.counter(
+    "mongo_pool_checkout_failures_total", "Check-outs that gave up (timeout, pool closed, connection error)", ["address", "reason"])
+LLM_REQUEST_SECONDS = REGISTRY.histogram(
+    "llm_request_duration_seconds", "Chat completion calls, until the last token for streams", ["model", "mode"])
+LLM_TOKENS = REGISTRY.counter(
+    "llm_tokens_total", "Tokens reported by the provider", ["model", "type"])
+CLOUDINARY_UPLOAD_SECONDS = REGISTRY.histogram(
+    "cloudinary_upload_duration_seconds", "Resume uploads to Cloudinary")
+RESUME_EXTRACTION_SECONDS = REGISTRY.histogram(
+    "resume_extraction_duration_seconds", "Resume text extraction in the process pool", ["kind"])
+
+
+class RequestTimings:
+    # Time spent per phase while handling one request, for the Server-Timing header.
+    # Shared by reference with the copies of the request's context that Motor's
+    # executor threads run in, hence the lock.
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self._phases: Dict[str, List[float]] = {}
+        self._lock = threading.Lock()
+
+    def add(self, phase: str, seconds: float) -> None:
+        with self._lock:
+            entry = self._phases.setdefault(phase, [0.0, 0])
+            entry[0] += seconds
+            entry[1] += 1
+
+    def header(self) -> str:
+        with self._lock:
+            phases = sorted(self._phases.items())
+        parts = [f'{phase};dur={total * 1000:.1f};desc="{count}x"' for phase, (total, count) in phases]
+        parts.append(f"total;dur={(time.perf_counter() - self.started) * 1000:.1f}")
+        return ", ".join(parts)
+
+
+_request_timings: ContextVar[Optional[RequestTimings]] = ContextVar("request_timings", default=None)
+
+
+def record_phase(phase: str, seconds: float) -> None:
+    # Attributes time to the current request, if there is one
+    timings = _request_timings.get()
+    if timings is not None:
+        timings.add(phase, seconds)
+
+
+class MongoCommandMetrics(monitoring.CommandListener):
+    # Registered on the Motor client; pymongo calls it around every command
+
+    def __init__(self):
+        self._pending: Dict[Tuple, Tuple[str, str]] = {}
+        self._lock = threading.Lock()
+
+    def started(self, event) -> None:
+        collection = event.command.get(event.command_name)
+        if not isinstance(collection, str):
+            collection = ""
+        with self._lock:
+            self._pending[(event.connection_id, event.request_id)] = (event.command_name, collection)
+
+    def _finished(self, event, failed: bool) -> None:
+        with self._lock:
+            command, collection = self._pending.pop((event.connection_id, event.request_id), (event.command_name, ""))
+        seconds = event.duration_micros / 1e6
+        MONGO_COMMAND_SECONDS.observe(seconds, command=command, collection=collection)
+        if failed:
+            MONGO_COMMAND_FAILURES.inc(command=command, collection=collection)
+        record_phase("mongo", seconds)
+
+    def succeeded(self, event) -> None:
+        self._finished(event, failed=False)
+
+    def failed(self, event) -> None:
+        self._finished(event, failed=True)
+
+
+class MongoPoolMonitor(monitoring.ConnectionPoolListener):
+    # Registered on the Motor client; follows each server's connection pool (connections
+    # open and checked out, operations queued for one) for the readiness probe and
+    # /api/metrics. A check-out starts and ends on the same executor thread, so its
+    # queueing time is kept thread-local.
+
+    def __init__(self, max_pool_size: int):
+        self.max_pool_size = max_pool_size
+        self._pools: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def _update(self, address, **deltas) -> None:
+        key = f"{address[0]}:{address[1]}"
+        with self._lock:
+            pool = self._pools.setdefault(key, {"open": 0, "in_use": 0, "waiting": 0, "checkout_failures": 0})
+            for field, delta in deltas.items():
+                pool[field] += delta
+            MONGO_POOL_CONNECTIONS.set(pool["in_use"], address=key, state="in_use")
+            MONGO_POOL_CONNECTIONS.set(max(0, pool["open"] - pool["in_use"]), address=key, state="idle")
+            MONGO_POOL_WAITING.set(pool["waiting"], address=key)
+
+    def _checkout_seconds(self) -> float:
+        started = getattr(self._local, "started", None)
+        self._local.started = None
+        return time.perf_counter() - started if started is not None else 0.0
+
+    def pool_created(self, event) -> None:
+        self._update(event.address)
+
+    def pool_ready(self, event) -> None:
+        pass
+
+    def pool_cleared(self, event) -> None:
+        pass
+
+    def pool_closed(self, event) -> None:
+        pass
+
+    def connection_created(self, event) -> None:
+        self._update(event.address, open=1)
+
+    def connection_ready(self, event) -> None:
+        pass
+
+    def connection_closed(self, event) -> None:
+        self._update(event.address, open=-1)
+
+    def connection_check_out_started(self, event) -> None:
+        self._local.started = time.perf_counter()
+        self._update(event.address, waiting=1)
+
+    def connection_check_out_failed(self, event) -> None:
+        self._checkout_seconds()
+        MONGO_POOL_CHECKOUT_FAILURES.inc(address=f"{event.address[0]}:{event.address[1]}", reason=event.reason)
+        self._update(event.address, waiting=-1, checkout_failures=1)
+
+    def connection_checked_out(self, event) -> None:
+        seconds = self._checkout_seconds()
+        MONGO_POOL_CHECKOUT_SECONDS.observe(seconds, address=f"{event.address[0]}:{event.address[1]}")
+        record_phase("mongo_pool", seconds)
+        self._update(event.address, waiting=-1, in_use=1)
+
+    def connection_checked_in(self, event) -> None:
+        self._update(event.address, in_use=-1)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            pools = {address: dict(pool) for address, pool in self._pools.items()}
+        # Busiest pool: (checked out + queued) / maxPoolSize, so above 1 means operations are queueing
+        saturation = max(
+            ((pool["in_use"] + pool["waiting"]) / self.max_pool_size for pool in pools.values()),
+            default=0.0,
+        ) if self.max_pool_size else 0.0
+        return {
+            "max_pool_size": self.max_pool_size,
+            "in_use": sum(pool["in_use"] for pool in pools.values()),
+            "waiting": sum(pool["waiting"] for pool in pools.values()),
+            "saturation": saturation,
+            "pools": pools,
+        }
+
+
+class MetricsMiddleware:
+    # Pure ASGI, so streamed responses are timed to their last byte and nothing is
+    # buffered. Routes are labelled by their path template; requests that match no
+    # route share one label to keep the series count bounded. With server_timing,
+    # responses carry a Server-Timing header with the time spent so far in Mongo,
+    # the LLM, Cloudinary and resume extraction.
+
+    def __init__(self, app, server_timing: bool = False):
+        self.app = app
+        self.server_timing = server_timing
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings = RequestTimings()
+        token = _request_timings.set(timings)
+        status_code = 500
+
+        async def send_wrapper(message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if self.server_timing:
+                    MutableHeaders(scope=message).append("Server-Timing", timings.header())
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            route = getattr(route, "path", None) or "unmatched"
+            HTTP_REQUESTS.inc(method=scope["method"], route=route, status=status_code)
+            HTTP_REQUEST_SECONDS.observe(time.perf_counter() - timings.started, method=scope["method"], route=route)
+            _request_timings.reset(token)
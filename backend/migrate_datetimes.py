@@ -0,0 +1,98 @@
+import asyncio
+import logging
+import os
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+
+from pymongo import UpdateOne
+
+logger = logging.getLogger(__name__)
+
+# Timestamps that older versions stored as ISO 8601 strings: (collection, field)
+DATETIME_FIELDS = [
+    ("jobs", "job_posted_on"),
+    ("users", "created_at"),
+    ("chat_sessions", "created_at"),
+    ("chat_messages", "created_at"),
+]
+
+BATCH_SIZE = 1000
+
+# Recorded in the migrations collection once a startup run has finished, so later
+# boots skip the collection scans; the command line always scans
+MIGRATION_ID = "datetimes-v1"
+
+
+def parse_timestamp(value: str) -> datetime:
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed
+
+
+async def migrate_field(db, collection: str, field: str, dry_run: bool = False) -> int:
+    # Rewrites string values of `field` as BSON dates, BATCH_SIZE documents at a time.
+    # Each update matches the original string, so a value changed meanwhile is left
+    # alone, and running the migration again only touches what is still a string.
+    converted = 0
+    batch = []
+    cursor = db[collection].find({field: {"$type": "string"}}, {"_id": 1, field: 1})
+    async for doc in cursor:
+        try:
+            value = parse_timestamp(doc[field])
+        except ValueError:
+            logger.warning(f"{collection}.{field}: unparseable value {doc[field]!r} on {doc['_id']}, skipped")
+            continue
+        batch.append(UpdateOne({"_id": doc["_id"], field: doc[field]}, {"$set": {field: value}}))
+        if len(batch) >= BATCH_SIZE:
+            converted += await _apply(db, collection, batch, dry_run)
+            batch = []
+    if batch:
+        converted += await _apply(db, collection, batch, dry_run)
+    return converted
+
+
+async def _apply(db, collection: str, batch, dry_run: bool) -> int:
+    if dry_run:
+        return len(batch)
+    result = await db[collection].bulk_write(batch, ordered=False)
+    return result.modified_count
+
+
+async def migrate_datetimes(db, dry_run: bool = False, force: bool = False) -> None:
+    if not force and await db.migrations.find_one({"_id": MIGRATION_ID}):
+        return
+    total = 0
+    for collection, field in DATETIME_FIELDS:
+        converted = await migrate_field(db, collection, field, dry_run)
+        total += converted
+        if converted:
+            action = "would convert" if dry_run else "converted"
+            logger.info(f"{collection}.{field}: {action} {converted} string timestamps to dates")
+    if not dry_run:
+        await db.migrations.update_one(
+            {"_id": MIGRATION_ID},
+            {"$set": {"completed_at": datetime.now(timezone.utc), "converted": total}},
+            upsert=True,
+        )
+
+
+async def main(dry_run: bool) -> None:
+    from dotenv import load_dotenv
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+    load_dotenv(Path(__file__).parent / '.env')
+    client = AsyncIOMotorClient(os.environ['MONGO_URL'], tz_aware=True)
+    db = client[os.environ['DB_NAME']]
+    try:
+        await migrate_datetimes(db, dry_run, force=True)
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    # python migrate_datetimes.py             convert string timestamps to BSON dates
+    # python migrate_datetimes.py --dry-run   only count what would be converted
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main("--dry-run" in sys.argv[1:]))
@@ -0,0 +1,111 @@
+import functools
+import re
+from typing import Dict, Iterable, List, Optional
+
+# Token counting uses tiktoken when it is installed and its encoding can be loaded,
+# otherwise a local approximation that errs on the high side: roughly one token
+# per four characters of each word, plus one per punctuation mark.
+
+WORD_RE = re.compile(r"\w+|[^\w\s]", re.UNICODE)
+
+# Per-item allowance for separators and per-message framing
+ITEM_OVERHEAD_TOKENS = 1
+MESSAGE_OVERHEAD_TOKENS = 4
+
+
+@functools.lru_cache(maxsize=1)
+def _encoding():
+    try:
+        import tiktoken
+        return tiktoken.get_encoding("o200k_base")
+    except Exception:
+        return None
+
+
+def _approx_token_cost(piece: str) -> int:
+    return max(1, (len(piece) + 3) // 4)
+
+
+def count_tokens(text: str) -> int:
+    encoding = _encoding()
+    if encoding is not None:
+        return len(encoding.encode(text))
+    return sum(_approx_token_cost(piece) for piece in WORD_RE.findall(text))
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    if max_tokens <= 0:
+        return ""
+    encoding = _encoding()
+    if encoding is not None:
+        tokens = encoding.encode(text)
+        return text if len(tokens) <= max_tokens else encoding.decode(tokens[:max_tokens])
+
+    spent = 0
+    for match in WORD_RE.finditer(text):
+        spent += _approx_token_cost(match.group())
+        if spent > max_tokens:
+            return text[:match.start()].rstrip()
+    return text
+
+
+def resume_highlights(resume_text: str) -> List[str]:
+    # Non-empty, de-duplicated resume lines in their original order; resumes lead
+    # with the summary and skills, which are what a budget should keep first
+    seen = set()
+    lines = []
+    for line in resume_text.splitlines():
+        line = " ".join(line.split())
+        if len(line) < 3 or line.lower() in seen:
+            continue
+        seen.add(line.lower())
+        lines.append(line)
+    return lines
+
+
+class PromptBuilder:
+    # Fills a token budget section by section. Call reserve() for text that must be
+    # sent whatever it costs, then add() sections in priority order: each takes
+    # whole items until its own cap or the remaining budget runs out.
+
+    def __init__(self, budget_tokens: int):
+        self.budget_tokens = budget_tokens
+        self.used_tokens = 0
+        self.sections: Dict[str, int] = {}
+
+    @property
+    def remaining_tokens(self) -> int:
+        return max(0, self.budget_tokens - self.used_tokens)
+
+    def reserve(self, name: str, text: str, overhead: int = MESSAGE_OVERHEAD_TOKENS) -> None:
+        cost = count_tokens(text) + overhead
+        self.used_tokens += cost
+        self.sections[name] = self.sections.get(name, 0) + cost
+
+    def add(
+        self,
+        name: str,
+        items: Iterable[str],
+        max_tokens: Optional[int] = None,
+        truncate_last: bool = False,
+        overhead: int = ITEM_OVERHEAD_TOKENS,
+    ) -> List[str]:
+        # truncate_last cuts the first item that does not fit down to the space left,
+        # instead of stopping before it
+        allowance = self.remaining_tokens if max_tokens is None else min(max_tokens, self.remaining_tokens)
+        chosen = []
+        spent = 0
+        for item in items:
+            cost = count_tokens(item) + overhead
+            if spent + cost > allowance:
+                space = allowance - spent - overhead
+                if truncate_last and space > 0:
+                    chosen.append(truncate_to_tokens(item, space))
+                    spent += count_tokens(chosen[-1]) + overhead
+                break
+            chosen.append(item)
+            spent += cost
+
+        self.used_tokens += spent
+        self.sections[name] = self.sections.get(name, 0) + spent
+        return chosen
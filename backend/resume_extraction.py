@@ -0,0 +1,164 @@
+import asyncio
+import io
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Optional
+
+from metrics import RESUME_EXTRACTION_SECONDS, record_phase
+
+
+class ExtractionTimeout(Exception):
+    pass
+
+
+# The extract_* functions run inside the pool's worker processes. They stop as soon
+# as max_chars of text are gathered, never read past max_pages, and give up once
+# timeout_seconds have passed between pages. PyPDF2 and python-docx are imported
+# there, on first use, so the API workers never load them.
+
+def extract_text_from_pdf(content: bytes, max_pages: int, max_chars: int, timeout_seconds: float) -> str:
+    import PyPDF2
+
+    deadline = time.monotonic() + timeout_seconds
+    reader = PyPDF2.PdfReader(io.BytesIO(content))
+    parts = []
+    length = 0
+    for page in reader.pages[:max_pages]:
+        text = page.extract_text() or ""
+        parts.append(text)
+        length += len(text)
+        if length >= max_chars:
+            break
+        if time.monotonic() > deadline:
+            raise ExtractionTimeout(f"PDF extraction exceeded {timeout_seconds}s")
+    return "\n".join(parts)[:max_chars]
+
+
+def extract_text_from_docx(content: bytes, max_pages: int, max_chars: int, timeout_seconds: float) -> str:
+    # DOCX has no pages; max_pages does not apply
+    import docx
+
+    deadline = time.monotonic() + timeout_seconds
+    document = docx.Document(io.BytesIO(content))
+    parts = []
+    length = 0
+    for paragraph in document.paragraphs:
+        parts.append(paragraph.text)
+        length += len(paragraph.text) + 1
+        if length >= max_chars:
+            break
+        if time.monotonic() > deadline:
+            raise ExtractionTimeout(f"DOCX extraction exceeded {timeout_seconds}s")
+    return "\n".join(parts)[:max_chars]
+
+
+EXTRACTORS = {
+    "pdf": extract_text_from_pdf,
+    "docx": extract_text_from_docx,
+}
+
+
+class ResumeExtractor:
+    # Reusable process pool for CPU-bound resume parsing, so a large PDF never
+    # pins the event loop. The pool is started on first use and rebuilt if a
+    # worker dies or has to be killed. Jobs wait for a free worker before they
+    # are submitted, so the time limit only covers the parse itself.
+
+    def __init__(
+        self,
+        max_workers: int = 2,
+        max_pages: int = 10,
+        max_chars: int = 2000,
+        timeout_seconds: float = 10,
+        grace_seconds: float = 5,
+    ):
+        self.max_workers = max_workers
+        self.max_pages = max_pages
+        self.max_chars = max_chars
+        self.timeout_seconds = timeout_seconds
+        # Workers check their deadline between pages; past timeout_seconds + grace_seconds
+        # a worker is taken to be stuck in one page and the pool is killed
+        self.grace_seconds = grace_seconds
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._slots = asyncio.Semaphore(max_workers)
+
+        self.extractions = 0
+        self.failures = 0
+        self.timeouts = 0
+        self.pool_restarts = 0
+        self.extract_seconds_total = 0.0
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._pool
+
+    def _discard_pool(self, pool: ProcessPoolExecutor, terminate: bool) -> None:
+        if self._pool is pool:
+            self._pool = None
+            self.pool_restarts += 1
+        if terminate:
+            # A parse stuck inside one page cannot be interrupted, only killed. Jobs running
+            # in the other workers fail with BrokenProcessPool and are retried in the new pool.
+            for process in list((pool._processes or {}).values()):
+                process.terminate()
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    async def _run(self, extractor, content: bytes, retry: bool = True) -> str:
+        pool = self._get_pool()
+        loop = asyncio.get_running_loop()
+        try:
+            future = loop.run_in_executor(pool, extractor, content, self.max_pages, self.max_chars, self.timeout_seconds)
+            return await asyncio.wait_for(future, timeout=self.timeout_seconds + self.grace_seconds)
+        except asyncio.TimeoutError:
+            self._discard_pool(pool, terminate=True)
+            raise
+        except BrokenProcessPool:
+            # Killed over another job's timeout (the pool has been replaced already): run again
+            if retry and self._pool is not pool:
+                return await self._run(extractor, content, retry=False)
+            self._discard_pool(pool, terminate=False)
+            raise
+
+    async def extract(self, kind: str, content: bytes) -> str:
+        extractor = EXTRACTORS[kind]
+        started = time.perf_counter()
+        try:
+            async with self._slots:
+                text = await self._run(extractor, content)
+        except (ExtractionTimeout, asyncio.TimeoutError):
+            self.timeouts += 1
+            raise ExtractionTimeout(f"Resume extraction exceeded {self.timeout_seconds}s")
+        except Exception:
+            self.failures += 1
+            raise
+        finally:
+            elapsed = time.perf_counter() - started
+            self.extract_seconds_total += elapsed
+            RESUME_EXTRACTION_SECONDS.observe(elapsed, kind=kind)
+            record_phase("extraction", elapsed)
+        self.extractions += 1
+        return text
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def stats(self) -> Dict:
+        return {
+            "workers": self.max_workers,
+            "max_pages": self.max_pages,
+            "max_chars": self.max_chars,
+            "timeout_seconds": self.timeout_seconds,
+            "extractions": self.extractions,
+            "failures": self.failures,
+            "timeouts": self.timeouts,
+            "pool_restarts": self.pool_restarts,
+            "extract_seconds_total": self.extract_seconds_total,
+        }
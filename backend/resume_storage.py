@@ -0,0 +1,188 @@
+import asyncio
+import logging
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, Optional
+
+from starlette.concurrency import run_in_threadpool
+from starlette.exceptions import HTTPException
+
+from metrics import CLOUDINARY_UPLOAD_SECONDS, record_phase
+
+logger = logging.getLogger(__name__)
+
+
+class CloudinaryUploader:
+    # cloudinary.uploader behind the same upload() interface, imported and configured
+    # on the first upload so workers that never receive a resume don't load the SDK
+
+    def __init__(self, cloud_name: Optional[str], api_key: Optional[str], api_secret: Optional[str]):
+        self.config = {"cloud_name": cloud_name, "api_key": api_key, "api_secret": api_secret}
+        self._uploader = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        # Uploads run on worker threads; the lock keeps the first few from configuring twice
+        with self._lock:
+            if self._uploader is None:
+                import cloudinary
+                import cloudinary.uploader
+
+                cloudinary.config(**self.config)
+                self._uploader = cloudinary.uploader
+        return self._uploader
+
+    def upload(self, file, **options) -> Dict:
+        return (self._uploader or self._load()).upload(file, **options)
+
+
+class ResumeUploader:
+    # Runs the (blocking) Cloudinary upload on a worker thread, at most
+    # max_concurrency at a time, reading straight from the request's spooled
+    # temp file or a path instead of a bytes copy held on the event loop
+
+    def __init__(self, backend, max_concurrency: int = 8, folder: str = "job_portal_resumes"):
+        self.backend = backend
+        self.folder = folder
+        self.max_concurrency = max_concurrency
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+
+        self.in_flight = 0
+        self.uploads = 0
+        self.failures = 0
+        self.upload_seconds_total = 0.0
+
+    async def upload(self, file, filename: str = None) -> Dict:
+        async with self._semaphore:
+            self.in_flight += 1
+            started = time.perf_counter()
+            try:
+                result = await run_in_threadpool(
+                    self.backend.upload,
+                    file,
+                    folder=self.folder,
+                    resource_type="auto",
+                    filename=filename,
+                )
+            except Exception:
+                self.failures += 1
+                raise
+            finally:
+                elapsed = time.perf_counter() - started
+                self.in_flight -= 1
+                self.upload_seconds_total += elapsed
+                CLOUDINARY_UPLOAD_SECONDS.observe(elapsed)
+                record_phase("cloudinary", elapsed)
+            self.uploads += 1
+            return result
+
+    def stats(self) -> Dict:
+        return {
+            "max_concurrency": self.max_concurrency,
+            "in_flight": self.in_flight,
+            "uploads": self.uploads,
+            "failures": self.failures,
+            "upload_seconds_total": self.upload_seconds_total,
+        }
+
+
+class PendingUploadSweeper:
+    # A background upload (RESUME_UPLOAD_MODE=background) runs in the process that took
+    # the application, from a temp file only that process has; if it dies first, the
+    # resume would stay "pending" for good. Every interval_seconds, applications whose
+    # resume has been pending for more than stale_seconds are marked failed. Every
+    # worker runs one; the update is idempotent.
+
+    def __init__(self, db, stale_seconds: float = 900, interval_seconds: float = 300):
+        self.db = db
+        self.stale_seconds = stale_seconds
+        self.interval_seconds = interval_seconds
+        self._task: Optional[asyncio.Task] = None
+
+        self.runs = 0
+        self.errors = 0
+        self.failed = 0
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._loop())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _loop(self) -> None:
+        while True:
+            try:
+                await self.run_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.errors += 1
+                logger.error(f"Pending resume upload sweep failed: {e}")
+            await asyncio.sleep(self.interval_seconds)
+
+    async def run_once(self, now: Optional[datetime] = None) -> int:
+        now = now or datetime.now(timezone.utc)
+        result = await self.db.applications.update_many(
+            {"resume.status": "pending", "created_at": {"$lt": now - timedelta(seconds=self.stale_seconds)}},
+            {"$set": {"resume.status": "failed"}},
+        )
+        self.runs += 1
+        self.failed += result.modified_count
+        if result.modified_count:
+            logger.warning(f"Marked {result.modified_count} stale pending resume uploads failed")
+        return result.modified_count
+
+    def stats(self) -> Dict:
+        return {
+            "stale_seconds": self.stale_seconds,
+            "interval_seconds": self.interval_seconds,
+            "running": self._task is not None,
+            "runs": self.runs,
+            "errors": self.errors,
+            "failed": self.failed,
+        }
+
+
+class RequestSizeLimitMiddleware:
+    # Rejects uploads over the limit with 413 before the multipart body is spooled:
+    # up front when the declared Content-Length is too big, otherwise (chunked or
+    # understated bodies) as soon as the bytes actually received pass the limit
+
+    def __init__(self, app, max_bytes: int, paths: Iterable[str]):
+        self.app = app
+        self.max_bytes = max_bytes
+        self.paths = set(paths)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] not in self.paths:
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope["headers"])
+        content_length = headers.get(b"content-length")
+        if content_length and content_length.isdigit() and int(content_length) > self.max_bytes:
+            await send({
+                "type": "http.response.start",
+                "status": 413,
+                "headers": [(b"content-type", b"application/json")],
+            })
+            await send({"type": "http.response.body", "body": b'{"detail":"Uploaded file is too large"}'})
+            return
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_bytes:
+                    # FastAPI re-raises HTTPExceptions from body parsing, so this becomes the response
+                    raise HTTPException(status_code=413, detail="Uploaded file is too large")
+            return message
+
+        await self.app(scope, limited_receive, send)
@@ -0,0 +1,62 @@
+import os
+from pathlib import Path
+
+import uvicorn
+from dotenv import load_dotenv
+
+ROOT_DIR = Path(__file__).parent
+# .env first, so its values win over the per-worker defaults worked out below
+load_dotenv(ROOT_DIR / '.env')
+
+# Number of uvicorn worker processes. Each imports server.py on its own and opens its
+# own Mongo pool, LLM client, password hashing threads and extraction processes in the
+# lifespan, so the per-process sizes below are a share of the host's budget.
+WEB_CONCURRENCY = int(os.environ.get('WEB_CONCURRENCY', str(min(4, os.cpu_count() or 1))))
+HOST = os.environ.get('HOST', '0.0.0.0')
+PORT = int(os.environ.get('PORT', '8001'))
+# On SIGTERM a worker stops accepting connections, waits this long for in-flight requests
+# (SSE streams included), then runs the lifespan shutdown: resume tasks are requeued,
+# the change stream and expiry loop stop, and the pools close
+GRACEFUL_SHUTDOWN_SECONDS = int(os.environ.get('GRACEFUL_SHUTDOWN_SECONDS', '30'))
+# Idle keep-alive connections are closed after this; keep it above the load balancer's
+UVICORN_KEEP_ALIVE_SECONDS = int(os.environ.get('UVICORN_KEEP_ALIVE_SECONDS', '75'))
+LOG_LEVEL = os.environ.get('LOG_LEVEL', 'info')
+
+# Mongo connections across all workers (the server's own limit, less headroom for
+# scripts and monitoring), divided evenly; each worker keeps a few warm
+MONGO_POOL_BUDGET = int(os.environ.get('MONGO_POOL_BUDGET', '200'))
+
+
+def worker_defaults(workers: int) -> dict:
+    cpus = os.cpu_count() or 1
+    max_pool = max(10, MONGO_POOL_BUDGET // workers)
+    return {
+        'MONGO_MAX_POOL_SIZE': str(max_pool),
+        'MONGO_MIN_POOL_SIZE': str(min(5, max_pool)),
+        # bcrypt holds a core per hash; spread the cores over the workers
+        'PASSWORD_HASH_WORKERS': str(max(1, cpus // workers)),
+        'RESUME_EXTRACT_WORKERS': str(max(1, cpus // (2 * workers))),
+    }
+
+
+def main() -> None:
+    # Workers inherit the environment; anything set explicitly is left alone
+    for name, value in worker_defaults(WEB_CONCURRENCY).items():
+        os.environ.setdefault(name, value)
+    uvicorn.run(
+        "server:app",
+        app_dir=str(ROOT_DIR),
+        host=HOST,
+        port=PORT,
+        workers=WEB_CONCURRENCY,
+        timeout_graceful_shutdown=GRACEFUL_SHUTDOWN_SECONDS,
+        timeout_keep_alive=UVICORN_KEEP_ALIVE_SECONDS,
+        log_level=LOG_LEVEL,
+        proxy_headers=True,
+    )
+
+
+if __name__ == "__main__":
+    # python serve.py                        WEB_CONCURRENCY workers on HOST:PORT
+    # WEB_CONCURRENCY=8 MONGO_POOL_BUDGET=400 python serve.py
+    main()
@@ -1,59 +1,356 @@
-from fastapi import FastAPI, HTTPException, Depends, UploadFile, File, Form, status
+from fastapi import FastAPI, HTTPException, Depends, UploadFile, File, Form, Query, BackgroundTasks, Request, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse, Response
 from starlette.middleware.cors import CORSMiddleware
+from starlette.concurrency import run_in_threadpool
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ReturnDocument
+from pymongo.errors import ExecutionTimeout, NetworkTimeout, ServerSelectionTimeoutError, WaitQueueTimeoutError
+from pymongo.read_preferences import SecondaryPreferred
+from bson import ObjectId
 from pydantic import BaseModel, Field, ConfigDict, EmailStr
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
 from datetime import datetime, timedelta, timezone
 from passlib.context import CryptContext
 import jwt
 import os
+import json
+import base64
+import binascii
+import itertools
 import uuid
 import logging
+import contextlib
+import asyncio
+import time
 from pathlib import Path
 from dotenv import load_dotenv
-import cloudinary
-import cloudinary.uploader
-import io
-import PyPDF2
-import docx
-from openai import OpenAI
+import shutil
+import tempfile
+from llm import create_llm_client, sse_event
+from llm_gateway import LLMGateway
+from task_queue import TaskQueue
+from fast_json import FastJSONResponse, dumps as json_bytes
+from bulk_import import BulkJobImporter, UploadStreamingResponse, csv_rows, iter_lines, ndjson_rows
+from bulk_export import StreamingExporter, decode_export_cursor
+from migrate_datetimes import migrate_datetimes
+from job_stats import employer_dashboard, record_application
+from job_expiry import JobExpiryScheduler
+from metrics import REGISTRY, MetricsMiddleware, MongoCommandMetrics, MongoPoolMonitor
+from http_caching import CompressionMiddleware, etag_for, if_none_match, not_modified
+from db_indexes import ensure_indexes, verify_query_plans
+from job_catalog import JobCatalog
+from job_ranking import JobIndex
+from user_cache import UserCache
+from password_hashing import PasswordHasher
+from resume_storage import CloudinaryUploader, PendingUploadSweeper, ResumeUploader, RequestSizeLimitMiddleware
+from fake_cloudinary import FakeCloudinaryUploader
+from resume_extraction import ResumeExtractor, ExtractionTimeout
+from analysis_cache import ResumeAnalysisCache
+from prompt_builder import PromptBuilder, MESSAGE_OVERHEAD_TOKENS, resume_highlights, truncate_to_tokens
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
-# MongoDB connection
-mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
-db = client[os.environ['DB_NAME']]
+# MongoDB connection, opened by the lifespan (connect_database) in each worker rather than
+# at import, so importing this module needs no MONGO_URL and no server
+client: Optional[AsyncIOMotorClient] = None
+db = None
+# Handle for the read-only routes that tolerate slightly stale data (job listing and
+# search straight from Mongo, single jobs, session listing); the same as db unless
+# MONGO_READ_SECONDARY=true
+read_db = None
+# Connections per worker process; serve.py divides MONGO_POOL_BUDGET among the workers.
+# minPoolSize keeps that many warm so the first requests after a deploy skip the handshake.
+MONGO_MAX_POOL_SIZE = int(os.environ.get('MONGO_MAX_POOL_SIZE', '100'))
+MONGO_MIN_POOL_SIZE = int(os.environ.get('MONGO_MIN_POOL_SIZE', '0'))
+# How long an operation may queue for a connection once the pool is exhausted, and how
+# long to look for a usable server, before failing with 503 instead of piling up
+MONGO_WAIT_QUEUE_TIMEOUT_MS = int(os.environ.get('MONGO_WAIT_QUEUE_TIMEOUT_MS', '2000'))
+MONGO_SERVER_SELECTION_TIMEOUT_MS = int(os.environ.get('MONGO_SERVER_SELECTION_TIMEOUT_MS', '5000'))
+# Limit on each operation (timeoutMS, covering queueing, selection and the round trip);
+# 0 leaves operations unbounded. When set it takes precedence over the wait-queue timeout.
+MONGO_TIMEOUT_MS = int(os.environ.get('MONGO_TIMEOUT_MS', '0'))
+# Wire compression offered to the server, e.g. "zstd,zlib" (zstd needs the zstandard
+# package, snappy python-snappy); empty sends uncompressed
+MONGO_COMPRESSORS = os.environ.get('MONGO_COMPRESSORS', '')
+# MONGO_READ_SECONDARY=true sends read_db's reads to a secondary no more than
+# MONGO_MAX_STALENESS_SECONDS behind (90 at least), falling back to the primary.
+# Writes and read-your-own-write paths always use the primary.
+MONGO_READ_SECONDARY = os.environ.get('MONGO_READ_SECONDARY', 'false').lower() == 'true'
+MONGO_MAX_STALENESS_SECONDS = int(os.environ.get('MONGO_MAX_STALENESS_SECONDS', '90'))
+# Pool usage per server, for /api/health/ready and /api/metrics
+mongo_pool_monitor = MongoPoolMonitor(MONGO_MAX_POOL_SIZE)
+
+# /api/health/ready answers 503 (so the load balancer stops routing to this worker) when
+# a ping takes longer than HEALTH_PING_TIMEOUT_SECONDS or fails, or when checked-out plus
+# queued connections reach HEALTH_POOL_SATURATION_MAX times maxPoolSize
+HEALTH_PING_TIMEOUT_SECONDS = float(os.environ.get('HEALTH_PING_TIMEOUT_SECONDS', '1'))
+HEALTH_POOL_SATURATION_MAX = float(os.environ.get('HEALTH_POOL_SATURATION_MAX', '1.0'))
+
+# Job listing page size
+JOB_PAGE_SIZE_DEFAULT = 20
+JOB_PAGE_SIZE_MAX = 100
+
+# Shared snapshot of active jobs. The TTL bounds how stale another worker's writes can be;
+# JOB_CATALOG_CHANGE_STREAM=true picks them up immediately (needs a replica set).
+JOB_CATALOG_ENABLED = os.environ.get('JOB_CATALOG_ENABLED', 'true').lower() == 'true'
+JOB_CATALOG_TTL_SECONDS = float(os.environ.get('JOB_CATALOG_TTL_SECONDS', '60'))
+JOB_CATALOG_CHANGE_STREAM = os.environ.get('JOB_CATALOG_CHANGE_STREAM', 'false').lower() == 'true'
+job_catalog = JobCatalog(None, ttl_seconds=JOB_CATALOG_TTL_SECONDS)
+
+# BM25 ranking over the catalog, kept in step with it, used to pick jobs for a resume
+job_index = JobIndex()
+job_catalog.subscribe(job_index)
+
+# Job reads carry strong ETags (from the catalog fingerprint, or the job's revision) and
+# answer If-None-Match with 304. The listing may be cached by a CDN for a few seconds;
+# single jobs need a login, so only the browser keeps them, revalidating every time.
+JOB_LIST_CACHE_CONTROL = os.environ.get('JOB_LIST_CACHE_CONTROL', 'public, max-age=0, s-maxage=10, stale-while-revalidate=30')
+JOB_DETAIL_CACHE_CONTROL = os.environ.get('JOB_DETAIL_CACHE_CONTROL', 'private, no-cache')
+# Bumped whenever the job JSON changes shape, so cached copies from older code never match
+JOB_ETAG_SCHEME = "jobs-v1"
+
+# gzip (or brotli, when the brotli package is installed) for JSON responses of at least this size
+HTTP_COMPRESSION_MIN_BYTES = int(os.environ.get('HTTP_COMPRESSION_MIN_BYTES', '1024'))
+
+# /api/job/search is served from the in-memory job index; 'mongo' uses the jobs text index instead
+JOB_SEARCH_BACKEND = os.environ.get('JOB_SEARCH_BACKEND', 'index')
+
+# Jobs expire JOB_LIFETIME_DAYS after posting, checked every JOB_EXPIRY_INTERVAL_SECONDS,
+# and move to jobs_archive JOB_ARCHIVE_AFTER_DAYS after that. Off (0) unless set: turned
+# on against an existing database, the first sweep expires every older posting at once
+job_expiry = JobExpiryScheduler(
+    None,
+    lifetime_days=float(os.environ.get('JOB_LIFETIME_DAYS', '0')),
+    archive_after_days=float(os.environ.get('JOB_ARCHIVE_AFTER_DAYS', '90')),
+    interval_seconds=float(os.environ.get('JOB_EXPIRY_INTERVAL_SECONDS', '300')),
+    batch_size=int(os.environ.get('JOB_EXPIRY_BATCH_SIZE', '500')),
+    on_expired=lambda job_ids: job_catalog.invalidate(),
+)
+
+# /api/job/bulk inserts JOB_BULK_BATCH_SIZE jobs per insert_many, up to JOB_BULK_MAX_ROWS per upload
+job_importer = BulkJobImporter(
+    None,
+    batch_size=int(os.environ.get('JOB_BULK_BATCH_SIZE', '500')),
+    max_rows=int(os.environ.get('JOB_BULK_MAX_ROWS', '100000')),
+)
+JOB_BULK_FORMATS = {
+    "application/x-ndjson": ndjson_rows,
+    "application/jsonl": ndjson_rows,
+    "text/csv": csv_rows,
+}
+
+# /api/application/employer/export streams applications in _id order. Rows newer than
+# APPLICATION_EXPORT_SETTLE_SECONDS are held back: ObjectIds come from each writer's clock,
+# so a row still being written elsewhere could otherwise land behind a cursor already handed out.
+APPLICATION_EXPORT_SETTLE_SECONDS = float(os.environ.get('APPLICATION_EXPORT_SETTLE_SECONDS', '5'))
+APPLICATION_EXPORT_BATCH_SIZE = int(os.environ.get('APPLICATION_EXPORT_BATCH_SIZE', '1000'))
+application_exporter = StreamingExporter(chunk_bytes=int(os.environ.get('APPLICATION_EXPORT_CHUNK_BYTES', str(64 * 1024))))
+# Exportable fields: output name -> document path
+APPLICATION_EXPORT_FIELDS = {
+    "id": "id",
+    "name": "name",
+    "email": "email",
+    "phone": "phone",
+    "address": "address",
+    "cover_letter": "cover_letter",
+    "applicant_id": "applicant_id.user",
+    "resume_url": "resume.url",
+    "resume_status": "resume.status",
+    "created_at": "created_at",
+}
+
+# Route latency and status counts, Mongo, LLM, Cloudinary and extraction timings are served
+# on /api/metrics. METRICS_SERVER_TIMING=true also breaks each response's time down in a
+# Server-Timing header (visible in the browser's network panel).
+METRICS_SERVER_TIMING = os.environ.get('METRICS_SERVER_TIMING', 'false').lower() == 'true'
+
+# Set MONGO_INDEX_CHECK=true to refuse to start if a route query would scan a whole collection
+MONGO_INDEX_CHECK = os.environ.get('MONGO_INDEX_CHECK', 'false').lower() == 'true'
+# Convert timestamps stored as ISO strings by older versions to BSON dates at startup.
+# Only the first boot scans: completion is recorded in the migrations collection and
+# later boots skip it (run migrate_datetimes.py to scan again). false skips even the check.
+MONGO_MIGRATE_DATETIMES = os.environ.get('MONGO_MIGRATE_DATETIMES', 'true').lower() == 'true'
+
+# Resume uploads. RESUME_UPLOAD_MODE=background saves the application right away with a
+# pending resume and uploads it after the response; CLOUDINARY_FAKE=true keeps files in memory.
+RESUME_MAX_BYTES = int(os.environ.get('RESUME_MAX_BYTES', str(5 * 1024 * 1024)))
+RESUME_UPLOAD_MODE = os.environ.get('RESUME_UPLOAD_MODE', 'sync')
+RESUME_UPLOAD_CONCURRENCY = int(os.environ.get('RESUME_UPLOAD_CONCURRENCY', '8'))
+if os.environ.get('CLOUDINARY_FAKE', 'false').lower() == 'true':
+    cloudinary_backend = FakeCloudinaryUploader(
+        latency_seconds=float(os.environ.get('CLOUDINARY_FAKE_LATENCY_MS', '0')) / 1000
+    )
+else:
+    # The Cloudinary SDK is imported and configured on the first upload
+    cloudinary_backend = CloudinaryUploader(
+        cloud_name=os.environ.get('CLOUDINARY_CLOUD_NAME'),
+        api_key=os.environ.get('CLOUDINARY_API_KEY'),
+        api_secret=os.environ.get('CLOUDINARY_API_SECRET'),
+    )
+resume_uploader = ResumeUploader(cloudinary_backend, max_concurrency=RESUME_UPLOAD_CONCURRENCY)
+# Background uploads still pending after RESUME_UPLOAD_STALE_SECONDS were lost with their
+# process and are marked failed; checked every RESUME_UPLOAD_SWEEP_INTERVAL_SECONDS
+pending_uploads = PendingUploadSweeper(
+    None,
+    stale_seconds=float(os.environ.get('RESUME_UPLOAD_STALE_SECONDS', '900')),
+    interval_seconds=float(os.environ.get('RESUME_UPLOAD_SWEEP_INTERVAL_SECONDS', '300')),
+)
+
+# Resume text extraction runs in a process pool and stops after RESUME_TEXT_MAX_CHARS
+# characters; the prompt builder then keeps what fits the prompt's token budget.
+RESUME_TEXT_MAX_CHARS = int(os.environ.get('RESUME_TEXT_MAX_CHARS', '4000'))
+resume_extractor = ResumeExtractor(
+    max_workers=int(os.environ.get('RESUME_EXTRACT_WORKERS', '2')),
+    max_pages=int(os.environ.get('RESUME_EXTRACT_MAX_PAGES', '10')),
+    max_chars=RESUME_TEXT_MAX_CHARS,
+    timeout_seconds=float(os.environ.get('RESUME_EXTRACT_TIMEOUT_SECONDS', '10')),
+)
 
-# Cloudinary configuration
-cloudinary.config(
-    cloud_name=os.environ.get('CLOUDINARY_CLOUD_NAME'),
-    api_key=os.environ.get('CLOUDINARY_API_KEY'),
-    api_secret=os.environ.get('CLOUDINARY_API_SECRET')
+# Resume analyses are cached by resume content and the jobs offered to the model.
+# Set RESUME_ANALYSIS_CACHE_MAX_ENTRIES=0 to disable.
+RESUME_MATCH_CANDIDATES = 20
+RESUME_RECOMMENDED_JOBS = 5
+RESUME_ANALYSIS_UNAVAILABLE = (
+    "AI analysis is temporarily unavailable. "
+    "Here are the jobs that best match your resume in the meantime."
+)
+analysis_cache = ResumeAnalysisCache(
+    None,
+    ttl_seconds=float(os.environ.get('RESUME_ANALYSIS_CACHE_TTL_SECONDS', str(7 * 24 * 3600))),
+    max_entries=int(os.environ.get('RESUME_ANALYSIS_CACHE_MAX_ENTRIES', '50000')),
 )
 
+# Uploaded resumes are extracted and analyzed by RESUME_WORKERS workers in each process,
+# fed from the resume_tasks collection so interrupted work resumes after a restart
+RESUME_WORKERS = int(os.environ.get('RESUME_WORKERS', '2'))
+RESUME_TASK_MAX_ATTEMPTS = int(os.environ.get('RESUME_TASK_MAX_ATTEMPTS', '3'))
+RESUME_TASK_LEASE_SECONDS = float(os.environ.get('RESUME_TASK_LEASE_SECONDS', '60'))
+RESUME_TASK_RETRY_BASE_SECONDS = float(os.environ.get('RESUME_TASK_RETRY_BASE_SECONDS', '2'))
+
+# Prompts are assembled within an input token budget, filled in priority order:
+# instructions, ranked jobs, resume highlights, conversation summary, recent turns
+RESUME_PROMPT_TOKEN_BUDGET = int(os.environ.get('RESUME_PROMPT_TOKEN_BUDGET', '2500'))
+CHAT_PROMPT_TOKEN_BUDGET = int(os.environ.get('CHAT_PROMPT_TOKEN_BUDGET', '3000'))
+PROMPT_JOBS_MAX_TOKENS = int(os.environ.get('PROMPT_JOBS_MAX_TOKENS', '1200'))
+PROMPT_RESUME_MAX_TOKENS = int(os.environ.get('PROMPT_RESUME_MAX_TOKENS', '800'))
+PROMPT_JOB_DESCRIPTION_TOKENS = 40
+CHAT_CONTEXT_JOBS = 10
+
+# Chat sends up to CHAT_HISTORY_MESSAGES recent messages verbatim. Once more than that
+# have piled up since the last summary, all but the newest half are folded into a
+# rolling summary stored on the session.
+CHAT_HISTORY_MESSAGES = int(os.environ.get('CHAT_HISTORY_MESSAGES', '12'))
+CHAT_SUMMARY_MAX_TOKENS = int(os.environ.get('CHAT_SUMMARY_MAX_TOKENS', '300'))
+
 # JWT configuration
 JWT_SECRET_KEY = os.environ.get('JWT_SECRET_KEY', 'your-secret-key-change-in-production')
 JWT_ALGORITHM = "HS256"
 JWT_EXPIRATION_DAYS = 7
-
-# Password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Put name and role in the token so routes that only need those skip the users lookup.
+# Role changes then only take effect once the user's current token expires.
+JWT_EMBED_CLAIMS = os.environ.get('JWT_EMBED_CLAIMS', 'false').lower() == 'true'
+
+# Authenticated user profiles, keyed by user id and token
+USER_CACHE_SIZE = int(os.environ.get('USER_CACHE_SIZE', '10000'))
+USER_CACHE_TTL_SECONDS = float(os.environ.get('USER_CACHE_TTL_SECONDS', '300'))
+user_cache = UserCache(max_size=USER_CACHE_SIZE, ttl_seconds=USER_CACHE_TTL_SECONDS)
+
+# Password hashing. Changing BCRYPT_ROUNDS rehashes each user's password on their next login.
+BCRYPT_ROUNDS = int(os.environ.get('BCRYPT_ROUNDS', '12'))
+PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', str(min(4, os.cpu_count() or 1))))
+PASSWORD_HASH_MAX_PENDING = int(os.environ.get('PASSWORD_HASH_MAX_PENDING', '64'))
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=BCRYPT_ROUNDS)
+password_hasher = PasswordHasher(
+    pwd_context,
+    max_workers=PASSWORD_HASH_WORKERS,
+    max_pending=PASSWORD_HASH_MAX_PENDING,
+)
 
 # Security
 security = HTTPBearer()
 
-# OpenAI client with Emergent LLM key
-client_openai = OpenAI(
-    api_key=os.environ.get('EMERGENT_LLM_KEY'),
-    base_url="https://llm.emergentagi.com/v1"
+# Async OpenAI client with Emergent LLM key, pooled connections and per-call timeouts.
+# Built (and the SDK imported) by the gateway on the first LLM call in each worker.
+LLM_MODEL = os.environ.get('LLM_MODEL', 'gpt-4o')
+LLM_BASE_URL = os.environ.get('LLM_BASE_URL', 'https://llm.emergentagi.com/v1')
+LLM_TIMEOUT_SECONDS = float(os.environ.get('LLM_TIMEOUT_SECONDS', '60'))
+LLM_MAX_CONNECTIONS = int(os.environ.get('LLM_MAX_CONNECTIONS', '100'))
+
+def create_openai_client():
+    return create_llm_client(
+        api_key=os.environ.get('EMERGENT_LLM_KEY'),
+        base_url=LLM_BASE_URL,
+        timeout_seconds=LLM_TIMEOUT_SECONDS,
+        max_connections=LLM_MAX_CONNECTIONS,
+    )
+
+# Admission control for LLM calls: concurrent calls overall and per user, a wait queue
+# bounded in length and time, and an optional tokens-per-minute budget (0 = unlimited)
+llm_gateway = LLMGateway(
+    create_openai_client,
+    max_concurrency=int(os.environ.get('LLM_MAX_CONCURRENCY', '32')),
+    user_concurrency=int(os.environ.get('LLM_USER_CONCURRENCY', '2')),
+    max_queue=int(os.environ.get('LLM_MAX_QUEUE', '200')),
+    queue_timeout_seconds=float(os.environ.get('LLM_QUEUE_TIMEOUT_SECONDS', '10')),
+    tokens_per_minute=int(os.environ.get('LLM_TOKENS_PER_MINUTE', '0')),
 )
 
+def bind_database(database, read_database=None) -> None:
+    # Points the module and every subsystem holding a collection at database
+    global db, read_db
+    db = database
+    read_db = read_database if read_database is not None else database
+    job_catalog.db = database
+    job_expiry.db = database
+    pending_uploads.db = database
+    analysis_cache.db = database
+    job_importer.collection = database.jobs
+    resume_tasks.collection = database.resume_tasks
+
+
+def mongo_client_options() -> Dict[str, Any]:
+    # Dates come back timezone-aware (UTC), matching what the app writes; every command
+    # and pool event is recorded for /api/metrics
+    options = {
+        "tz_aware": True,
+        "event_listeners": [MongoCommandMetrics(), mongo_pool_monitor],
+        "maxPoolSize": MONGO_MAX_POOL_SIZE,
+        "minPoolSize": MONGO_MIN_POOL_SIZE,
+        "serverSelectionTimeoutMS": MONGO_SERVER_SELECTION_TIMEOUT_MS,
+    }
+    if MONGO_WAIT_QUEUE_TIMEOUT_MS:
+        options["waitQueueTimeoutMS"] = MONGO_WAIT_QUEUE_TIMEOUT_MS
+    if MONGO_TIMEOUT_MS:
+        options["timeoutMS"] = MONGO_TIMEOUT_MS
+    if MONGO_COMPRESSORS:
+        options["compressors"] = MONGO_COMPRESSORS
+    return options
+
+
+def connect_database() -> None:
+    global client
+    client = AsyncIOMotorClient(os.environ['MONGO_URL'], **mongo_client_options())
+    database = client[os.environ['DB_NAME']]
+    read_database = None
+    if MONGO_READ_SECONDARY:
+        read_database = database.with_options(
+            read_preference=SecondaryPreferred(max_staleness=MONGO_MAX_STALENESS_SECONDS)
+        )
+    bind_database(database, read_database)
+
+
+@contextlib.asynccontextmanager
+async def lifespan(app: FastAPI):
+    await startup()
+    try:
+        yield
+    finally:
+        await shutdown()
+
 # Create the main app
-app = FastAPI(title="Job Portal API")
+app = FastAPI(title="Job Portal API", lifespan=lifespan)
 
 # Logging
 logging.basicConfig(level=logging.INFO)
@@ -108,6 +405,15 @@ class JobResponse(JobBase):
     job_posted_on: datetime
     posted_by: str
 
+class JobPage(BaseModel):
+    jobs: List[JobResponse]
+    next_cursor: Optional[str] = None
+
+class JobSearchPage(BaseModel):
+    jobs: List[JobResponse]
+    total: int
+    next_offset: Optional[int] = None
+
 class ApplicationBase(BaseModel):
     name: str = Field(..., min_length=3, max_length=30)
     email: EmailStr
@@ -119,12 +425,15 @@ class ApplicationCreate(ApplicationBase):
     pass
 
 class ResumeInfo(BaseModel):
-    public_id: str
-    url: str
+    public_id: Optional[str] = None
+    url: Optional[str] = None
+    status: str = "uploaded"
 
 class ApplicationResponse(ApplicationBase):
     model_config = ConfigDict(extra="ignore")
     id: str
+    job_id: Optional[str] = None
+    status: str = "pending"
     resume: ResumeInfo
     applicant_id: Dict[str, Any]
     employer_id: Dict[str, Any]
@@ -139,74 +448,182 @@ class ResumeText(BaseModel):
 
 # ==================== HELPER FUNCTIONS ====================
 
-def hash_password(password: str) -> str:
-    return pwd_context.hash(password)
+async def hash_password(password: str) -> str:
+    return await password_hasher.hash(password)
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+async def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    return await password_hasher.verify_and_update(plain_password, hashed_password)
 
-def create_jwt_token(user_id: str) -> str:
+def create_jwt_token(user: Dict) -> str:
     expiration = datetime.now(timezone.utc) + timedelta(days=JWT_EXPIRATION_DAYS)
     payload = {
-        "id": user_id,
+        "id": user["id"],
         "exp": expiration
     }
+    if JWT_EMBED_CLAIMS:
+        payload["name"] = user["name"]
+        payload["role"] = user["role"]
     return jwt.encode(payload, JWT_SECRET_KEY, algorithm=JWT_ALGORITHM)
 
-async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)) -> Dict:
+def decode_jwt_token(token: str) -> Dict:
     try:
-        token = credentials.credentials
         payload = jwt.decode(token, JWT_SECRET_KEY, algorithms=[JWT_ALGORITHM])
-        user_id = payload.get("id")
-        if user_id is None:
-            raise HTTPException(status_code=401, detail="Invalid authentication credentials")
-        
-        user = await db.users.find_one({"id": user_id}, {"_id": 0, "password": 0})
-        if user is None:
-            raise HTTPException(status_code=401, detail="User not found")
-        
-        return user
     except jwt.ExpiredSignatureError:
         raise HTTPException(status_code=401, detail="Token has expired")
-    except jwt.JWTError:
+    except jwt.InvalidTokenError:
         raise HTTPException(status_code=401, detail="Invalid token")
 
-def extract_text_from_pdf(file_content: bytes) -> str:
-    try:
-        pdf_file = io.BytesIO(file_content)
-        pdf_reader = PyPDF2.PdfReader(pdf_file)
-        text = ""
-        for page in pdf_reader.pages:
-            text += page.extract_text()
-        return text
-    except Exception as e:
-        logger.error(f"Error extracting PDF: {e}")
-        raise HTTPException(status_code=400, detail="Failed to extract text from PDF")
+    if payload.get("id") is None:
+        raise HTTPException(status_code=401, detail="Invalid authentication credentials")
+    return payload
+
+async def load_user(user_id: str, token: str) -> Dict:
+    user = user_cache.get(user_id, token)
+    if user is None:
+        user = await db.users.find_one({"id": user_id}, {"_id": 0, "password": 0})
+        if user is None:
+            raise HTTPException(status_code=401, detail="User not found")
+        user_cache.put(user_id, token, user)
+    return user
 
-def extract_text_from_docx(file_content: bytes) -> str:
+async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)) -> Dict:
+    # Enough for routes that only check id and role; use get_current_user_profile for the full user
+    token = credentials.credentials
+    payload = decode_jwt_token(token)
+    if JWT_EMBED_CLAIMS and "name" in payload and "role" in payload:
+        return {"id": payload["id"], "name": payload["name"], "role": payload["role"]}
+    return await load_user(payload["id"], token)
+
+async def get_current_user_profile(credentials: HTTPAuthorizationCredentials = Depends(security)) -> Dict:
+    token = credentials.credentials
+    payload = decode_jwt_token(token)
+    return await load_user(payload["id"], token)
+
+def utc_now() -> datetime:
+    # BSON dates hold milliseconds; truncate so in-memory copies match what Mongo returns
+    now = datetime.now(timezone.utc)
+    return now.replace(microsecond=now.microsecond // 1000 * 1000)
+
+# Fields of a job returned by the read routes, which skip response_model validation
+JOB_PROJECTION = {"_id": 0, **{field: 1 for field in JobResponse.model_fields}}
+
+def job_public(job: Dict) -> Dict:
+    return {field: job.get(field) for field in JobResponse.model_fields}
+
+def encode_job_cursor(job: Dict) -> str:
+    raw = json.dumps([job["job_posted_on"].isoformat(), job["id"]]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_job_cursor(cursor: str) -> tuple:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        posted_on, job_id = json.loads(raw)
+        if not isinstance(posted_on, str) or not isinstance(job_id, str):
+            raise ValueError("malformed cursor")
+        posted_on = datetime.fromisoformat(posted_on)
+        if posted_on.tzinfo is None:
+            posted_on = posted_on.replace(tzinfo=timezone.utc)
+        return posted_on, job_id
+    except (ValueError, binascii.Error):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def build_job_filter(
+    category: Optional[str] = None,
+    country: Optional[str] = None,
+    city: Optional[str] = None,
+    salary_min: Optional[int] = None,
+    salary_max: Optional[int] = None,
+) -> Dict:
+    query = {"expired": False}
+    if category:
+        query["category"] = category
+    if country:
+        query["country"] = country
+    if city:
+        query["city"] = city
+
+    # A job matches a salary range if its fixed salary, or its own from/to range, overlaps it
+    salary_conditions = []
+    if salary_min is not None:
+        salary_conditions.append({"$or": [
+            {"fixed_salary": {"$gte": salary_min}},
+            {"salary_to": {"$gte": salary_min}},
+        ]})
+    if salary_max is not None:
+        salary_conditions.append({"$or": [
+            {"fixed_salary": {"$lte": salary_max}},
+            {"salary_from": {"$lte": salary_max}},
+        ]})
+    if salary_conditions:
+        query["$and"] = salary_conditions
+    return query
+
+def job_matches(
+    job: Dict,
+    category: Optional[str] = None,
+    country: Optional[str] = None,
+    city: Optional[str] = None,
+    salary_min: Optional[int] = None,
+    salary_max: Optional[int] = None,
+) -> bool:
+    # In-memory equivalent of build_job_filter, for jobs served from the catalog snapshot
+    if category and job.get("category") != category:
+        return False
+    if country and job.get("country") != country:
+        return False
+    if city and job.get("city") != city:
+        return False
+    if salary_min is not None and not any(
+        job.get(field) is not None and job[field] >= salary_min for field in ("fixed_salary", "salary_to")
+    ):
+        return False
+    if salary_max is not None and not any(
+        job.get(field) is not None and job[field] <= salary_max for field in ("fixed_salary", "salary_from")
+    ):
+        return False
+    return True
+
+def apply_job_cursor(query: Dict, cursor: str, sort: str) -> Dict:
+    # Keyset pagination on (job_posted_on, id): resume strictly after the last job returned
+    posted_on, job_id = decode_job_cursor(cursor)
+    op = "$lt" if sort == "newest" else "$gt"
+    keyset = {"$or": [
+        {"job_posted_on": {op: posted_on}},
+        {"job_posted_on": posted_on, "id": {op: job_id}},
+    ]}
+    return {**query, "$and": query.get("$and", []) + [keyset]}
+
+def job_sort(sort: str) -> List:
+    direction = -1 if sort == "newest" else 1
+    return [("job_posted_on", direction), ("id", direction)]
+
+def resume_kind(filename: str) -> str:
+    filename = filename.lower()
+    if filename.endswith('.pdf'):
+        return "pdf"
+    if filename.endswith('.docx'):
+        return "docx"
+    raise HTTPException(status_code=400, detail="Only PDF and DOCX files are supported")
+
+async def extract_resume_text(filename: str, content: bytes) -> str:
+    kind = resume_kind(filename)
     try:
-        doc_file = io.BytesIO(file_content)
-        doc = docx.Document(doc_file)
-        text = "\n".join([paragraph.text for paragraph in doc.paragraphs])
-        return text
+        return await resume_extractor.extract(kind, content)
+    except ExtractionTimeout as e:
+        logger.error(f"Error extracting {kind.upper()}: {e}")
+        raise HTTPException(status_code=400, detail="Resume took too long to process")
     except Exception as e:
-        logger.error(f"Error extracting DOCX: {e}")
-        raise HTTPException(status_code=400, detail="Failed to extract text from DOCX")
+        logger.error(f"Error extracting {kind.upper()}: {e}")
+        raise HTTPException(status_code=400, detail=f"Failed to extract text from {kind.upper()}")
 
-async def analyze_resume_with_ai(resume_text: str, jobs: List[Dict]) -> Dict:
-    try:
-        jobs_summary = "\n".join([
-            f"- {job['title']} ({job['category']}) in {job['city']}, {job['country']}: {job['description'][:100]}..."
-            for job in jobs[:20]  # Limit to 20 jobs to avoid token limits
-        ])
-        
-        prompt = f"""Analyze this resume and recommend the most suitable jobs from the list below.
+RESUME_ANALYSIS_SYSTEM_PROMPT = "You are a helpful career advisor and job matching expert."
+RESUME_ANALYSIS_PROMPT = """Analyze this resume and recommend the most suitable jobs from the list below.
 
 Resume:
-{resume_text[:2000]}
+{resume}
 
 Available Jobs:
-{jobs_summary}
+{jobs}
 
 Please provide:
 1. Top 3-5 recommended jobs with reasons
@@ -216,23 +633,129 @@ Please provide:
 
 Format your response in a clear, friendly manner."""
 
-        response = client_openai.chat.completions.create(
-            model="gpt-4o",
-            messages=[
-                {"role": "system", "content": "You are a helpful career advisor and job matching expert."},
-                {"role": "user", "content": prompt}
-            ],
+def format_job_line(job: Dict, description_tokens: int = 0) -> str:
+    line = f"- {job['title']} ({job['category']}) in {job['city']}, {job['country']}"
+    if description_tokens:
+        line += f": {truncate_to_tokens(job['description'], description_tokens)}"
+    return line
+
+def build_resume_analysis_messages(resume_text: str, jobs: List[Dict]) -> List[Dict]:
+    # Jobs arrive best match first, so a tight budget drops the weakest candidates;
+    # the resume gets whatever is left, cut mid-line if it has to be
+    builder = PromptBuilder(RESUME_PROMPT_TOKEN_BUDGET)
+    builder.reserve("system", RESUME_ANALYSIS_SYSTEM_PROMPT)
+    builder.reserve("instructions", RESUME_ANALYSIS_PROMPT.format(resume="", jobs=""))
+    job_lines = builder.add(
+        "jobs",
+        [format_job_line(job, PROMPT_JOB_DESCRIPTION_TOKENS) for job in jobs],
+        max_tokens=PROMPT_JOBS_MAX_TOKENS
+    )
+    highlights = builder.add("resume", resume_highlights(resume_text), truncate_last=True)
+    
+    prompt = RESUME_ANALYSIS_PROMPT.format(resume="\n".join(highlights), jobs="\n".join(job_lines))
+    return [
+        {"role": "system", "content": RESUME_ANALYSIS_SYSTEM_PROMPT},
+        {"role": "user", "content": prompt}
+    ]
+
+def resume_match_candidates(resume_text: str, jobs: List[Dict]) -> List[Dict]:
+    # The best-ranked jobs for this resume across the whole catalog, topped up with
+    # the newest jobs when few share any terms with it. Limited to avoid token limits.
+    candidates = [job for job, _ in job_index.rank(resume_text, RESUME_MATCH_CANDIDATES)]
+    if len(candidates) < RESUME_MATCH_CANDIDATES:
+        ranked_ids = {job["id"] for job in candidates}
+        candidates += [job for job in jobs if job["id"] not in ranked_ids][:RESUME_MATCH_CANDIDATES - len(candidates)]
+    return candidates
+
+def cached_recommendations(cached: Dict, candidates: List[Dict]) -> List[Dict]:
+    jobs_by_id = {job["id"]: job for job in candidates}
+    return [jobs_by_id[job_id] for job_id in cached["recommended_job_ids"] if job_id in jobs_by_id]
+
+async def analyze_resume_with_ai(user_id: str, resume_text: str, jobs: List[Dict]) -> Dict:
+    candidates = resume_match_candidates(resume_text, jobs)
+    recommended_jobs = candidates[:RESUME_RECOMMENDED_JOBS]
+    cache_key = analysis_cache.key(resume_text, candidates)
+    
+    cached = await analysis_cache.get(cache_key)
+    if cached:
+        return {
+            "analysis": cached["analysis"],
+            "recommended_jobs": cached_recommendations(cached, candidates)
+        }
+    
+    try:
+        analysis = await llm_gateway.complete(
+            user_id,
+            model=LLM_MODEL,
+            messages=build_resume_analysis_messages(resume_text, candidates),
             temperature=0.7,
             max_tokens=1000
         )
-        
-        return {
-            "analysis": response.choices[0].message.content,
-            "recommended_jobs": jobs[:5]  # Return top 5 jobs
-        }
+    except HTTPException:
+        # Overloaded: let the client retry rather than caching a degraded answer
+        raise
     except Exception as e:
+        # The ranked jobs are still worth returning without the write-up
         logger.error(f"Error in AI analysis: {e}")
-        raise HTTPException(status_code=500, detail="Failed to analyze resume")
+        return {
+            "analysis": RESUME_ANALYSIS_UNAVAILABLE,
+            "recommended_jobs": recommended_jobs
+        }
+    
+    await analysis_cache.put(cache_key, analysis, [job["id"] for job in recommended_jobs])
+    return {
+        "analysis": analysis,
+        "recommended_jobs": recommended_jobs
+    }
+
+def event_stream_response(events) -> StreamingResponse:
+    return StreamingResponse(
+        events,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+async def stream_resume_analysis(user_id: str, session_id: str, resume_text: str, jobs: List[Dict]) -> StreamingResponse:
+    # Server-Sent Events: "meta" with the session and recommended jobs, then "delta"
+    # events carrying the analysis as it is generated, then "done" (or "error").
+    # A cached analysis arrives as a single delta.
+    candidates = resume_match_candidates(resume_text, jobs)
+    recommended_jobs = candidates[:RESUME_RECOMMENDED_JOBS]
+    cache_key = analysis_cache.key(resume_text, candidates)
+    
+    cached = await analysis_cache.get(cache_key)
+    if cached:
+        async def cached_events():
+            yield sse_event({"session_id": session_id, "recommended_jobs": cached_recommendations(cached, candidates)}, "meta")
+            yield sse_event({"content": cached["analysis"]}, "delta")
+            yield sse_event({"session_id": session_id}, "done")
+        return event_stream_response(cached_events())
+    
+    # Admission happens here, so an overloaded gateway answers 429/503 instead of a stream
+    deltas = await llm_gateway.open_stream(
+        user_id,
+        model=LLM_MODEL,
+        messages=build_resume_analysis_messages(resume_text, candidates),
+        temperature=0.7,
+        max_tokens=1000
+    )
+    
+    async def events():
+        yield sse_event({"session_id": session_id, "recommended_jobs": recommended_jobs}, "meta")
+        chunks = []
+        try:
+            async for delta in deltas:
+                chunks.append(delta)
+                yield sse_event({"content": delta}, "delta")
+        except Exception as e:
+            logger.error(f"Error in AI analysis stream: {e}")
+            yield sse_event({"detail": "Failed to analyze resume"}, "error")
+            return
+        
+        await analysis_cache.put(cache_key, "".join(chunks), [job["id"] for job in recommended_jobs])
+        yield sse_event({"session_id": session_id}, "done")
+
+    return event_stream_response(events())
 
 # ==================== USER ROUTES ====================
 
@@ -245,26 +768,16 @@ async def register(user: UserRegister):
     
     # Create new user
     user_dict = user.model_dump()
-    user_dict["password"] = hash_password(user_dict["password"])
+    user_dict["password"] = await hash_password(user_dict["password"])
     user_dict["id"] = str(uuid.uuid4())
-    user_dict["created_at"] = datetime.now(timezone.utc).isoformat()
+    user_dict["created_at"] = utc_now()
     
     await db.users.insert_one(user_dict)
     
     # Generate token
-    token = create_jwt_token(user_dict["id"])
-    
-    # Prepare response
-    user_response = UserResponse(
-        id=user_dict["id"],
-        name=user_dict["name"],
-        email=user_dict["email"],
-        phone=user_dict["phone"],
-        role=user_dict["role"],
-        created_at=datetime.fromisoformat(user_dict["created_at"])
-    )
+    token = create_jwt_token(user_dict)
     
-    return TokenResponse(token=token, user=user_response)
+    return TokenResponse(token=token, user=UserResponse.model_validate(user_dict))
 
 @app.post("/api/user/login", response_model=TokenResponse)
 async def login(user: UserLogin):
@@ -274,48 +787,96 @@ async def login(user: UserLogin):
         raise HTTPException(status_code=401, detail="Invalid email or password")
     
     # Verify password
-    if not verify_password(user.password, db_user["password"]):
+    valid, new_hash = await verify_and_update_password(user.password, db_user["password"])
+    if not valid:
         raise HTTPException(status_code=401, detail="Invalid email or password")
+    if new_hash:
+        await db.users.update_one({"id": db_user["id"]}, {"$set": {"password": new_hash}})
     
     # Generate token
-    token = create_jwt_token(db_user["id"])
-    
-    # Prepare response
-    user_response = UserResponse(
-        id=db_user["id"],
-        name=db_user["name"],
-        email=db_user["email"],
-        phone=db_user["phone"],
-        role=db_user["role"],
-        created_at=datetime.fromisoformat(db_user["created_at"])
-    )
+    token = create_jwt_token(db_user)
     
-    return TokenResponse(token=token, user=user_response)
+    return TokenResponse(token=token, user=UserResponse.model_validate(db_user))
 
 @app.get("/api/user/logout")
-async def logout(current_user: Dict = Depends(get_current_user)):
+async def logout(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    current_user: Dict = Depends(get_current_user)
+):
+    user_cache.invalidate_token(current_user["id"], credentials.credentials)
     return {"message": "Logged out successfully"}
 
 @app.get("/api/user/getuser", response_model=UserResponse)
-async def get_user(current_user: Dict = Depends(get_current_user)):
-    return UserResponse(
-        id=current_user["id"],
-        name=current_user["name"],
-        email=current_user["email"],
-        phone=current_user["phone"],
-        role=current_user["role"],
-        created_at=datetime.fromisoformat(current_user["created_at"])
-    )
+async def get_user(current_user: Dict = Depends(get_current_user_profile)):
+    return UserResponse.model_validate(current_user)
 
 # ==================== JOB ROUTES ====================
 
-@app.get("/api/job/getall", response_model=List[JobResponse])
-async def get_all_jobs():
-    jobs = await db.jobs.find({"expired": False}, {"_id": 0}).to_list(1000)
-    for job in jobs:
-        if isinstance(job.get('job_posted_on'), str):
-            job['job_posted_on'] = datetime.fromisoformat(job['job_posted_on'])
-    return jobs
+@app.get("/api/job/getall", response_model=JobPage)
+async def get_all_jobs(
+    request: Request,
+    cursor: Optional[str] = None,
+    limit: int = Query(JOB_PAGE_SIZE_DEFAULT, ge=1, le=JOB_PAGE_SIZE_MAX),
+    category: Optional[str] = None,
+    country: Optional[str] = None,
+    city: Optional[str] = None,
+    salary_min: Optional[int] = Query(None, ge=0),
+    salary_max: Optional[int] = Query(None, ge=0),
+    sort: str = Query("newest", pattern="^(newest|oldest)$"),
+):
+    # Fetch one extra job to know whether there is a next page
+    if JOB_CATALOG_ENABLED:
+        # The page is a function of the catalog and the query, so a matching ETag is
+        # answered before any of the work below
+        etag = etag_for(
+            JOB_ETAG_SCHEME, await job_catalog.get_fingerprint(),
+            cursor, limit, category, country, city, salary_min, salary_max, sort,
+        )
+        cache_headers = {"ETag": etag, "Cache-Control": JOB_LIST_CACHE_CONTROL}
+        if if_none_match(request.headers.get("if-none-match"), etag):
+            return not_modified(cache_headers)
+        after = decode_job_cursor(cursor) if cursor else None
+        catalog_jobs = await job_catalog.iter_jobs(after, newest_first=(sort == "newest"))
+        matches = (
+            job for job in catalog_jobs
+            if job_matches(job, category, country, city, salary_min, salary_max)
+        )
+        jobs = list(itertools.islice(matches, limit + 1))
+    else:
+        query = build_job_filter(category, country, city, salary_min, salary_max)
+        if cursor:
+            query = apply_job_cursor(query, cursor, sort)
+        jobs = await read_db.jobs.find(query, JOB_PROJECTION).sort(job_sort(sort)).limit(limit + 1).to_list(limit + 1)
+
+    next_cursor = encode_job_cursor(jobs[limit - 1]) if len(jobs) > limit else None
+    response = FastJSONResponse({"jobs": [job_public(job) for job in jobs[:limit]], "next_cursor": next_cursor})
+    if not JOB_CATALOG_ENABLED:
+        # Straight from Mongo there is nothing cheaper to key on than the body itself
+        cache_headers = {"ETag": etag_for(JOB_ETAG_SCHEME, response.body), "Cache-Control": JOB_LIST_CACHE_CONTROL}
+        if if_none_match(request.headers.get("if-none-match"), cache_headers["ETag"]):
+            return not_modified(cache_headers)
+    response.headers.update(cache_headers)
+    return response
+
+@app.get("/api/job/search", response_model=JobSearchPage)
+async def search_jobs(
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(JOB_PAGE_SIZE_DEFAULT, ge=1, le=JOB_PAGE_SIZE_MAX),
+    offset: int = Query(0, ge=0, le=1000),
+):
+    if JOB_SEARCH_BACKEND == "index" and JOB_CATALOG_ENABLED:
+        # Make sure the index reflects the current catalog before searching it (no copy of the snapshot)
+        await job_catalog.ensure_fresh()
+        jobs, total = job_index.search(q, limit, offset)
+    else:
+        query = {"$text": {"$search": q}, "expired": False}
+        jobs = await read_db.jobs.find(
+            query, {**JOB_PROJECTION, "score": {"$meta": "textScore"}}
+        ).sort([("score", {"$meta": "textScore"})]).skip(offset).limit(limit).to_list(limit)
+        total = await read_db.jobs.count_documents(query)
+    
+    next_offset = offset + limit if offset + limit < total else None
+    return FastJSONResponse({"jobs": [job_public(job) for job in jobs], "total": total, "next_offset": next_offset})
 
 @app.post("/api/job/post", response_model=JobResponse)
 async def post_job(job: JobCreate, current_user: Dict = Depends(get_current_user)):
@@ -325,23 +886,51 @@ async def post_job(job: JobCreate, current_user: Dict = Depends(get_current_user
     job_dict = job.model_dump()
     job_dict["id"] = str(uuid.uuid4())
     job_dict["expired"] = False
-    job_dict["job_posted_on"] = datetime.now(timezone.utc).isoformat()
+    job_dict["job_posted_on"] = utc_now()
     job_dict["posted_by"] = current_user["id"]
+    job_dict["revision"] = 1
     
     await db.jobs.insert_one(job_dict)
+    job_catalog.upsert(job_dict)
     
-    return JobResponse(
-        **{k: v for k, v in job_dict.items() if k != "_id"},
-        job_posted_on=datetime.fromisoformat(job_dict["job_posted_on"])
-    )
+    return JobResponse(**{k: v for k, v in job_dict.items() if k != "_id"})
+
+@app.post("/api/job/bulk")
+async def bulk_import_jobs(request: Request, current_user: Dict = Depends(get_current_user)):
+    # Body: NDJSON (one JobCreate object per line) or CSV with a header row, streamed.
+    # Answers with an NDJSON report, also streamed: one line per row with its status
+    # ("created" with the job id, "invalid" with errors, or "failed"), then a summary.
+    if current_user["role"] != UserRole.EMPLOYER:
+        raise HTTPException(status_code=403, detail="Only employers can post jobs")
+    
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    parse_rows = JOB_BULK_FORMATS.get(content_type)
+    if parse_rows is None:
+        raise HTTPException(status_code=415, detail="Send application/x-ndjson or text/csv")
+    
+    def make_job(fields: Dict) -> Dict:
+        job_dict = JobCreate.model_validate(fields).model_dump()
+        job_dict["id"] = str(uuid.uuid4())
+        job_dict["expired"] = False
+        job_dict["job_posted_on"] = utc_now()
+        job_dict["posted_by"] = current_user["id"]
+        job_dict["revision"] = 1
+        return job_dict
+    
+    async def report():
+        try:
+            async for entry in job_importer.run(parse_rows(iter_lines(request.stream())), make_job):
+                yield json_bytes(entry) + b"\n"
+        finally:
+            # One reload instead of re-sorting the snapshot for every inserted job
+            job_catalog.invalidate()
+    
+    return UploadStreamingResponse(report(), media_type="application/x-ndjson")
 
 @app.get("/api/job/getmyjobs", response_model=List[JobResponse])
 async def get_my_jobs(current_user: Dict = Depends(get_current_user)):
-    jobs = await db.jobs.find({"posted_by": current_user["id"]}, {"_id": 0}).to_list(1000)
-    for job in jobs:
-        if isinstance(job.get('job_posted_on'), str):
-            job['job_posted_on'] = datetime.fromisoformat(job['job_posted_on'])
-    return jobs
+    jobs = await db.jobs.find({"posted_by": current_user["id"]}, JOB_PROJECTION).to_list(1000)
+    return FastJSONResponse(jobs)
 
 @app.put("/api/job/update/{job_id}", response_model=JobResponse)
 async def update_job(job_id: str, job_update: JobCreate, current_user: Dict = Depends(get_current_user)):
@@ -353,11 +942,10 @@ async def update_job(job_id: str, job_update: JobCreate, current_user: Dict = De
         raise HTTPException(status_code=403, detail="Not authorized to update this job")
     
     update_dict = job_update.model_dump()
-    await db.jobs.update_one({"id": job_id}, {"$set": update_dict})
+    await db.jobs.update_one({"id": job_id}, {"$set": update_dict, "$inc": {"revision": 1}})
     
     updated_job = await db.jobs.find_one({"id": job_id}, {"_id": 0})
-    if isinstance(updated_job.get('job_posted_on'), str):
-        updated_job['job_posted_on'] = datetime.fromisoformat(updated_job['job_posted_on'])
+    job_catalog.upsert(updated_job)
     
     return JobResponse(**updated_job)
 
@@ -371,23 +959,32 @@ async def delete_job(job_id: str, current_user: Dict = Depends(get_current_user)
         raise HTTPException(status_code=403, detail="Not authorized to delete this job")
     
     await db.jobs.delete_one({"id": job_id})
+    await db.job_stats.delete_one({"job_id": job_id})
+    job_catalog.remove(job_id)
     return {"message": "Job deleted successfully"}
 
 @app.get("/api/job/{job_id}", response_model=JobResponse)
-async def get_single_job(job_id: str, current_user: Dict = Depends(get_current_user)):
-    job = await db.jobs.find_one({"id": job_id}, {"_id": 0})
+async def get_single_job(job_id: str, request: Request, current_user: Dict = Depends(get_current_user)):
+    # Active jobs come from the catalog; expired ones (or all, without it) from Mongo
+    job = await job_catalog.get_job(job_id) if JOB_CATALOG_ENABLED else None
+    if job is None:
+        job = await read_db.jobs.find_one({"id": job_id}, {**JOB_PROJECTION, "revision": 1})
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
     
-    if isinstance(job.get('job_posted_on'), str):
-        job['job_posted_on'] = datetime.fromisoformat(job['job_posted_on'])
-    
-    return JobResponse(**job)
+    cache_headers = {
+        "ETag": etag_for(JOB_ETAG_SCHEME, job_id, job.get("revision", 0), job.get("expired")),
+        "Cache-Control": JOB_DETAIL_CACHE_CONTROL,
+    }
+    if if_none_match(request.headers.get("if-none-match"), cache_headers["ETag"]):
+        return not_modified(cache_headers)
+    return FastJSONResponse(job_public(job), headers=cache_headers)
 
 # ==================== APPLICATION ROUTES ====================
 
 @app.post("/api/application/post")
 async def post_application(
+    background_tasks: BackgroundTasks,
     name: str = Form(...),
     email: str = Form(...),
     cover_letter: str = Form(...),
@@ -395,47 +992,100 @@ async def post_application(
     address: str = Form(...),
     employer_id: str = Form(...),
     resume: UploadFile = File(...),
+    job_id: Optional[str] = Form(None),
     current_user: Dict = Depends(get_current_user)
 ):
     if current_user["role"] != UserRole.JOB_SEEKER:
         raise HTTPException(status_code=403, detail="Only job seekers can apply")
     
-    # Upload resume to Cloudinary
-    try:
-        resume_content = await resume.read()
-        upload_result = cloudinary.uploader.upload(
-            resume_content,
-            folder="job_portal_resumes",
-            resource_type="auto"
-        )
-        
-        application_dict = {
-            "id": str(uuid.uuid4()),
-            "name": name,
-            "email": email,
-            "cover_letter": cover_letter,
-            "phone": phone,
-            "address": address,
-            "resume": {
-                "public_id": upload_result["public_id"],
-                "url": upload_result["secure_url"]
-            },
-            "applicant_id": {
-                "user": current_user["id"],
-                "role": current_user["role"]
-            },
-            "employer_id": {
-                "user": employer_id,
-                "role": UserRole.EMPLOYER
-            }
+    if resume.size is not None and resume.size > RESUME_MAX_BYTES:
+        raise HTTPException(status_code=413, detail="Uploaded file is too large")
+    
+    if job_id is not None:
+        job = await db.jobs.find_one({"id": job_id}, {"_id": 0, "posted_by": 1})
+        if not job:
+            raise HTTPException(status_code=404, detail="Job not found")
+        if job["posted_by"] != employer_id:
+            raise HTTPException(status_code=400, detail="Job was not posted by this employer")
+    
+    application_dict = {
+        "id": str(uuid.uuid4()),
+        "name": name,
+        "email": email,
+        "cover_letter": cover_letter,
+        "phone": phone,
+        "address": address,
+        "applicant_id": {
+            "user": current_user["id"],
+            "role": current_user["role"]
+        },
+        "employer_id": {
+            "user": employer_id,
+            "role": UserRole.EMPLOYER
+        },
+        "job_id": job_id,
+        "status": "pending",
+        "created_at": utc_now()
+    }
+    
+    if RESUME_UPLOAD_MODE == "background":
+        # The request's temp file is closed once the response is sent, so hand the
+        # background upload its own copy on disk
+        resume_path = await run_in_threadpool(spool_upload_to_disk, resume)
+        application_dict["resume"] = {"public_id": None, "url": None, "status": "pending"}
+        try:
+            await db.applications.insert_one(application_dict)
+            await record_application(db, application_dict)
+        except Exception:
+            # The background upload only runs after a successful response, so it won't remove the copy
+            os.remove(resume_path)
+            raise
+        background_tasks.add_task(upload_pending_resume, application_dict["id"], resume_path, resume.filename)
+        return {
+            "message": "Application submitted successfully",
+            "application_id": application_dict["id"],
+            "resume_status": "pending"
         }
-        
-        await db.applications.insert_one(application_dict)
-        
-        return {"message": "Application submitted successfully", "application_id": application_dict["id"]}
+    
+    # Upload resume to Cloudinary, streaming from the spooled temp file
+    try:
+        await resume.seek(0)
+        upload_result = await resume_uploader.upload(resume.file, filename=resume.filename)
     except Exception as e:
         logger.error(f"Error uploading resume: {e}")
         raise HTTPException(status_code=500, detail="Failed to upload resume")
+    
+    application_dict["resume"] = {
+        "public_id": upload_result["public_id"],
+        "url": upload_result["secure_url"],
+        "status": "uploaded"
+    }
+    await db.applications.insert_one(application_dict)
+    await record_application(db, application_dict)
+    
+    return {"message": "Application submitted successfully", "application_id": application_dict["id"]}
+
+def spool_upload_to_disk(upload: UploadFile) -> str:
+    upload.file.seek(0)
+    with tempfile.NamedTemporaryFile(prefix="resume-", delete=False) as copy:
+        shutil.copyfileobj(upload.file, copy)
+        return copy.name
+
+async def upload_pending_resume(application_id: str, resume_path: str, filename: str):
+    try:
+        upload_result = await resume_uploader.upload(resume_path, filename=filename)
+        resume_info = {
+            "public_id": upload_result["public_id"],
+            "url": upload_result["secure_url"],
+            "status": "uploaded"
+        }
+    except Exception as e:
+        logger.error(f"Error uploading resume for application {application_id}: {e}")
+        resume_info = {"public_id": None, "url": None, "status": "failed"}
+    finally:
+        os.remove(resume_path)
+    
+    await db.applications.update_one({"id": application_id}, {"$set": {"resume": resume_info}})
 
 @app.get("/api/application/employer/getall")
 async def employer_get_all_applications(current_user: Dict = Depends(get_current_user)):
@@ -449,6 +1099,64 @@ async def employer_get_all_applications(current_user: Dict = Depends(get_current
     
     return applications
 
+@app.get("/api/application/employer/dashboard")
+async def employer_application_dashboard(current_user: Dict = Depends(get_current_user)):
+    # Application counts per posted job (total, last 24 hours, per status) from the
+    # job_stats counters, without reading the applications themselves
+    if current_user["role"] != UserRole.EMPLOYER:
+        raise HTTPException(status_code=403, detail="Only employers can view applications")
+    
+    jobs = await employer_dashboard(db, current_user["id"], utc_now())
+    return FastJSONResponse({"jobs": jobs})
+
+@app.get("/api/application/employer/export")
+async def employer_export_applications(
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    since: Optional[datetime] = Query(None, description="Only applications submitted at or after this time"),
+    cursor: Optional[str] = Query(None, description="Resume after the row carrying this cursor"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to include; defaults to all"),
+    current_user: Dict = Depends(get_current_user),
+):
+    # Streams every application for the employer, oldest first, as NDJSON or CSV. Each
+    # row carries a `cursor`; pass the last one back to pick up only what came after it.
+    if current_user["role"] != UserRole.EMPLOYER:
+        raise HTTPException(status_code=403, detail="Only employers can view applications")
+    
+    if fields:
+        names = [name.strip() for name in fields.split(",") if name.strip()]
+        unknown = [name for name in names if name not in APPLICATION_EXPORT_FIELDS]
+        if unknown or not names:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Unknown fields: {', '.join(unknown)}. Choose from {', '.join(APPLICATION_EXPORT_FIELDS)}",
+            )
+        selected = {name: APPLICATION_EXPORT_FIELDS[name] for name in dict.fromkeys(names)}
+    else:
+        selected = APPLICATION_EXPORT_FIELDS
+    
+    id_range = {"$lt": ObjectId.from_datetime(utc_now() - timedelta(seconds=APPLICATION_EXPORT_SETTLE_SECONDS))}
+    if cursor:
+        try:
+            id_range["$gt"] = decode_export_cursor(cursor)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+    elif since:
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        id_range["$gte"] = ObjectId.from_datetime(since)
+    
+    docs = db.applications.find(
+        {"employer_id.user": current_user["id"], "_id": id_range},
+        {path: 1 for path in selected.values()},
+    ).sort("_id", 1).batch_size(APPLICATION_EXPORT_BATCH_SIZE)
+    
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    return StreamingResponse(
+        application_exporter.export(docs, selected, format),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="applications.{format}"'},
+    )
+
 @app.get("/api/application/jobseeker/getall")
 async def jobseeker_get_all_applications(current_user: Dict = Depends(get_current_user)):
     if current_user["role"] != UserRole.JOB_SEEKER:
@@ -470,65 +1178,132 @@ async def delete_application(application_id: str, current_user: Dict = Depends(g
     if application["applicant_id"]["user"] != current_user["id"]:
         raise HTTPException(status_code=403, detail="Not authorized to delete this application")
     
-    await db.applications.delete_one({"id": application_id})
+    result = await db.applications.delete_one({"id": application_id})
+    if result.deleted_count:
+        await record_application(db, application, delta=-1)
     return {"message": "Application deleted successfully"}
 
 # ==================== CHATBOT ROUTES ====================
 
-@app.post("/api/chatbot/upload-resume")
+# Pass ?stream=true to the resume and chat endpoints to get the reply as Server-Sent Events
+
+async def process_resume_task(task: Dict) -> Dict:
+    # Extraction and analysis of an uploaded resume, run by a resume_tasks worker
+    payload = task["payload"]
+    resume_text = await extract_resume_text(payload["filename"], payload["content"])
+    jobs = await job_catalog.get_jobs()
+    analysis = await analyze_resume_with_ai(task["user_id"], resume_text, jobs)
+    
+    # The session id is fixed when the task is queued, so a retried task reuses the same session
+    await db.chat_sessions.update_one(
+        {"session_id": task["session_id"]},
+        {
+            "$set": {"resume_text": resume_text},
+            "$setOnInsert": {
+                "user_id": task["user_id"],
+                "created_at": utc_now(),
+                "message_count": 0
+            }
+        },
+        upsert=True
+    )
+    return {
+        "session_id": task["session_id"],
+        "analysis": analysis["analysis"],
+        "recommended_jobs": analysis["recommended_jobs"]
+    }
+
+resume_tasks = TaskQueue(
+    None,
+    process_resume_task,
+    workers=RESUME_WORKERS,
+    max_attempts=RESUME_TASK_MAX_ATTEMPTS,
+    lease_seconds=RESUME_TASK_LEASE_SECONDS,
+    retry_base_seconds=RESUME_TASK_RETRY_BASE_SECONDS,
+)
+
+@app.post("/api/chatbot/upload-resume", status_code=202)
 async def upload_resume(
     resume: UploadFile = File(...),
+    stream: bool = False,
     current_user: Dict = Depends(get_current_user)
 ):
+    # Queues the resume and answers 202 with a task id; poll /api/chatbot/tasks/{task_id}
+    # or follow /api/chatbot/tasks/{task_id}/events for the analysis. With stream=true
+    # the analysis is instead extracted and streamed within this request.
+    if resume.size is not None and resume.size > RESUME_MAX_BYTES:
+        raise HTTPException(status_code=413, detail="Uploaded file is too large")
+    
     try:
+        resume_kind(resume.filename)
         resume_content = await resume.read()
-        filename = resume.filename.lower()
+        session_id = str(uuid.uuid4())
+        
+        if not stream:
+            task = await resume_tasks.submit({
+                "user_id": current_user["id"],
+                "session_id": session_id,
+                "payload": {"filename": resume.filename, "content": resume_content}
+            })
+            return {"task_id": task["id"], "session_id": session_id, "status": task["status"]}
         
         # Extract text based on file type
-        if filename.endswith('.pdf'):
-            resume_text = extract_text_from_pdf(resume_content)
-        elif filename.endswith('.docx'):
-            resume_text = extract_text_from_docx(resume_content)
-        else:
-            raise HTTPException(status_code=400, detail="Only PDF and DOCX files are supported")
+        resume_text = await extract_resume_text(resume.filename, resume_content)
         
         # Get all jobs
-        jobs = await db.jobs.find({"expired": False}, {"_id": 0}).to_list(1000)
-        
-        # Analyze resume with AI
-        analysis = await analyze_resume_with_ai(resume_text, jobs)
+        jobs = await job_catalog.get_jobs()
         
         # Create session
-        session_id = str(uuid.uuid4())
         session_data = {
             "session_id": session_id,
             "user_id": current_user["id"],
             "resume_text": resume_text,
-            "created_at": datetime.now(timezone.utc).isoformat(),
-            "conversation_history": []
+            "created_at": utc_now(),
+            "message_count": 0
         }
         await db.chat_sessions.insert_one(session_data)
         
-        return {
-            "session_id": session_id,
-            "analysis": analysis["analysis"],
-            "recommended_jobs": analysis["recommended_jobs"]
-        }
+        return await stream_resume_analysis(current_user["id"], session_id, resume_text, jobs)
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error processing resume: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+async def get_own_resume_task(task_id: str, user_id: str) -> Dict:
+    task = await resume_tasks.get(task_id)
+    if not task or task["user_id"] != user_id:
+        raise HTTPException(status_code=404, detail="Task not found")
+    return task
+
+@app.get("/api/chatbot/tasks/{task_id}")
+async def get_resume_task(task_id: str, current_user: Dict = Depends(get_current_user)):
+    return await get_own_resume_task(task_id, current_user["id"])
+
+@app.get("/api/chatbot/tasks/{task_id}/events")
+async def resume_task_events(task_id: str, current_user: Dict = Depends(get_current_user)):
+    # Server-Sent Events: a "status" event with the task on every status change,
+    # ending after it has succeeded or failed
+    await get_own_resume_task(task_id, current_user["id"])
+    
+    async def events():
+        async for task in resume_tasks.watch(task_id):
+            yield sse_event(task, "status")
+    
+    return event_stream_response(events())
+
 @app.post("/api/chatbot/paste-resume")
 async def paste_resume(
     resume_data: ResumeText,
+    stream: bool = False,
     current_user: Dict = Depends(get_current_user)
 ):
     try:
         # Get all jobs
-        jobs = await db.jobs.find({"expired": False}, {"_id": 0}).to_list(1000)
+        jobs = await job_catalog.get_jobs()
         
-        # Analyze resume with AI
-        analysis = await analyze_resume_with_ai(resume_data.resume_text, jobs)
+        # Analyze resume with AI, unless streaming, where the session must exist first
+        analysis = None if stream else await analyze_resume_with_ai(current_user["id"], resume_data.resume_text, jobs)
         
         # Create or update session
         session_id = resume_data.session_id or str(uuid.uuid4())
@@ -544,23 +1319,162 @@ async def paste_resume(
                 "session_id": session_id,
                 "user_id": current_user["id"],
                 "resume_text": resume_data.resume_text,
-                "created_at": datetime.now(timezone.utc).isoformat(),
-                "conversation_history": []
+                "created_at": utc_now(),
+                "message_count": 0
             }
             await db.chat_sessions.insert_one(session_data)
         
+        if stream:
+            return await stream_resume_analysis(current_user["id"], session_id, resume_data.resume_text, jobs)
+        
         return {
             "session_id": session_id,
             "analysis": analysis["analysis"],
             "recommended_jobs": analysis["recommended_jobs"]
         }
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error processing resume: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+# Chat turns are appended to chat_messages, numbered by a per-session counter, instead of
+# rewriting an array on the session. Sessions from before this keep their embedded
+# conversation_history, which is read as the start of the conversation.
+
+async def save_chat_turn(session_id: str, message: str, ai_response: str):
+    # Reserve two sequence numbers atomically so concurrent turns never overwrite each other
+    session = await db.chat_sessions.find_one_and_update(
+        {"session_id": session_id},
+        {"$inc": {"message_count": 2}},
+        projection={"_id": 0, "message_count": 1},
+        return_document=ReturnDocument.AFTER
+    )
+    seq = session["message_count"] - 2
+    now = utc_now()
+    await db.chat_messages.insert_many([
+        {"session_id": session_id, "seq": seq, "role": "user", "content": message, "created_at": now},
+        {"session_id": session_id, "seq": seq + 1, "role": "assistant", "content": ai_response, "created_at": now},
+    ])
+    return session["message_count"]
+
+async def load_recent_messages(session: Dict, limit: int) -> List[Dict]:
+    # Messages not yet folded into the session summary, oldest first
+    summary_seq = session.get("summary_seq", 0)
+    recent = await db.chat_messages.find(
+        {"session_id": session["session_id"], "seq": {"$gte": summary_seq}},
+        {"_id": 0, "role": 1, "content": 1}
+    ).sort("seq", -1).limit(limit).to_list(limit)
+    recent.reverse()
+    
+    missing = limit - len(recent)
+    if missing > 0 and not summary_seq and session.get("conversation_history"):
+        recent = session["conversation_history"][-missing:] + recent
+    return recent
+
+CHAT_SYSTEM_PROMPT = """You are a helpful career advisor and job search assistant. 
+You have access to the user's resume and can help with:
+1. Job recommendations based on their skills and experience
+2. Job search strategies and tips
+3. Interview preparation advice
+4. Career development guidance
+
+Be friendly, encouraging, and provide actionable advice."""
+
+CHAT_SUMMARY_PROMPT = (
+    "You keep a running summary of a conversation between a job seeker and a career advisor. "
+    "Keep the user's goals, skills, preferences and constraints, and the jobs and advice already "
+    "discussed. Reply with the updated summary only."
+)
+
+def build_chat_messages(session: Dict, history: List[Dict], jobs: List[Dict], message: str) -> List[Dict]:
+    builder = PromptBuilder(CHAT_PROMPT_TOKEN_BUDGET)
+    builder.reserve("system", CHAT_SYSTEM_PROMPT)
+    builder.reserve("message", message)
+    job_lines = builder.add("jobs", [format_job_line(job) for job in jobs], max_tokens=PROMPT_JOBS_MAX_TOKENS)
+    highlights = builder.add(
+        "resume",
+        resume_highlights(session.get("resume_text", "")),
+        max_tokens=PROMPT_RESUME_MAX_TOKENS,
+        truncate_last=True
+    )
+    summary = builder.add(
+        "summary",
+        [session["summary"]] if session.get("summary") else [],
+        max_tokens=CHAT_SUMMARY_MAX_TOKENS,
+        truncate_last=True
+    )
+    # Newest turns first, so the budget runs out on the oldest
+    turns = builder.add(
+        "history",
+        [msg["content"] for msg in reversed(history)],
+        overhead=MESSAGE_OVERHEAD_TOKENS
+    )
+    
+    system = CHAT_SYSTEM_PROMPT
+    if highlights:
+        system += "\n\nUser's Resume Highlights:\n" + "\n".join(highlights)
+    if job_lines:
+        system += "\n\nAvailable Jobs:\n" + "\n".join(job_lines)
+    if summary:
+        system += "\n\nSummary of the conversation so far:\n" + summary[0]
+    
+    messages = [{"role": "system", "content": system}]
+    for msg in history[len(history) - len(turns):]:
+        messages.append({"role": msg["role"], "content": msg["content"]})
+    messages.append({"role": "user", "content": message})
+    return messages
+
+async def summarize_older_turns(session_id: str, message_count: int):
+    # Fold everything but the newest CHAT_HISTORY_MESSAGES // 2 messages into the
+    # session summary. Runs after the response has been sent.
+    session = await db.chat_sessions.find_one(
+        {"session_id": session_id},
+        {"_id": 0, "summary": 1, "summary_seq": 1, "conversation_history": 1}
+    )
+    summary_seq = session.get("summary_seq", 0)
+    upto = message_count - CHAT_HISTORY_MESSAGES // 2
+    if message_count - summary_seq <= CHAT_HISTORY_MESSAGES:
+        return
+    
+    older = await db.chat_messages.find(
+        {"session_id": session_id, "seq": {"$gte": summary_seq, "$lt": upto}},
+        {"_id": 0, "role": 1, "content": 1}
+    ).sort("seq", 1).to_list(None)
+    if not summary_seq:
+        older = session.get("conversation_history", []) + older
+    transcript = "\n".join(
+        f"{msg['role']}: {truncate_to_tokens(msg['content'], CHAT_SUMMARY_MAX_TOKENS)}" for msg in older
+    )
+    
+    try:
+        # Not counted against the user's own limit; they may already be asking the next question
+        summary = await llm_gateway.complete(
+            None,
+            model=LLM_MODEL,
+            messages=[
+                {"role": "system", "content": CHAT_SUMMARY_PROMPT},
+                {"role": "user", "content": f"Current summary:\n{session.get('summary') or '(none)'}\n\nNew messages:\n{transcript}"}
+            ],
+            temperature=0.3,
+            max_tokens=CHAT_SUMMARY_MAX_TOKENS
+        )
+    except Exception as e:
+        # The messages stay unsummarized and are picked up after the next turn
+        logger.error(f"Error summarizing chat session {session_id}: {e}")
+        return
+    
+    # Never replace a summary that already reaches further
+    await db.chat_sessions.update_one(
+        {"session_id": session_id, "$or": [{"summary_seq": {"$exists": False}}, {"summary_seq": {"$lt": upto}}]},
+        {"$set": {"summary": summary, "summary_seq": upto}}
+    )
+
 @app.post("/api/chatbot/chat")
 async def chat(
     message_data: ChatMessage,
+    background_tasks: BackgroundTasks,
+    stream: bool = False,
     current_user: Dict = Depends(get_current_user)
 ):
     try:
@@ -568,82 +1482,119 @@ async def chat(
         if not session_id:
             raise HTTPException(status_code=400, detail="Session ID is required")
         
-        # Get session
-        session = await db.chat_sessions.find_one({"session_id": session_id})
+        # Get session, with only the tail of any legacy embedded history
+        session = await db.chat_sessions.find_one(
+            {"session_id": session_id},
+            {
+                "_id": 0, "session_id": 1, "resume_text": 1, "summary": 1, "summary_seq": 1,
+                "conversation_history": {"$slice": -CHAT_HISTORY_MESSAGES}
+            }
+        )
         if not session:
             raise HTTPException(status_code=404, detail="Session not found")
         
-        # Get conversation history
-        conversation_history = session.get("conversation_history", [])
-        resume_text = session.get("resume_text", "")
-        
-        # Get all jobs for context
-        jobs = await db.jobs.find({"expired": False}, {"_id": 0}).to_list(1000)
-        jobs_context = "\n".join([
-            f"- {job['title']} ({job['category']}) in {job['city']}, {job['country']}"
-            for job in jobs[:10]
-        ])
+        conversation_history = await load_recent_messages(session, CHAT_HISTORY_MESSAGES)
         
-        # Build messages for AI
-        messages = [
-            {"role": "system", "content": f"""You are a helpful career advisor and job search assistant. 
-You have access to the user's resume and can help with:
-1. Job recommendations based on their skills and experience
-2. Job search strategies and tips
-3. Interview preparation advice
-4. Career development guidance
-
-User's Resume Summary:
-{resume_text[:500]}...
-
-Available Jobs:
-{jobs_context}
-
-Be friendly, encouraging, and provide actionable advice."""},
-        ]
+        # Jobs that best match the resume and the question, topped up with the newest
+        jobs = resume_match_candidates(
+            f"{session.get('resume_text', '')} {message_data.message}",
+            await job_catalog.get_jobs()
+        )[:CHAT_CONTEXT_JOBS]
+        messages = build_chat_messages(session, conversation_history, jobs, message_data.message)
         
-        # Add conversation history
-        for msg in conversation_history[-6:]:  # Last 6 messages for context
-            messages.append({"role": msg["role"], "content": msg["content"]})
+        def schedule_summary(message_count: int):
+            if message_count - session.get("summary_seq", 0) > CHAT_HISTORY_MESSAGES:
+                background_tasks.add_task(summarize_older_turns, session_id, message_count)
         
-        # Add current message
-        messages.append({"role": "user", "content": message_data.message})
+        if stream:
+            deltas = await llm_gateway.open_stream(
+                current_user["id"],
+                model=LLM_MODEL,
+                messages=messages,
+                temperature=0.8,
+                max_tokens=800
+            )
+            
+            async def events():
+                chunks = []
+                try:
+                    async for delta in deltas:
+                        chunks.append(delta)
+                        yield sse_event({"content": delta}, "delta")
+                except Exception as e:
+                    logger.error(f"Error in chat stream: {e}")
+                    yield sse_event({"detail": "Failed to generate a response"}, "error")
+                    return
+                
+                schedule_summary(await save_chat_turn(session_id, message_data.message, "".join(chunks)))
+                yield sse_event({"session_id": session_id}, "done")
+            
+            return event_stream_response(events())
         
         # Get AI response
-        response = client_openai.chat.completions.create(
-            model="gpt-4o",
+        ai_response = await llm_gateway.complete(
+            current_user["id"],
+            model=LLM_MODEL,
             messages=messages,
             temperature=0.8,
             max_tokens=800
         )
         
-        ai_response = response.choices[0].message.content
-        
         # Update conversation history
-        conversation_history.append({"role": "user", "content": message_data.message})
-        conversation_history.append({"role": "assistant", "content": ai_response})
-        
-        await db.chat_sessions.update_one(
-            {"session_id": session_id},
-            {"$set": {"conversation_history": conversation_history}}
-        )
+        schedule_summary(await save_chat_turn(session_id, message_data.message, ai_response))
         
         return {
             "response": ai_response,
             "session_id": session_id
         }
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error in chat: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/chatbot/sessions")
 async def get_chat_sessions(current_user: Dict = Depends(get_current_user)):
-    sessions = await db.chat_sessions.find(
+    sessions = await read_db.chat_sessions.find(
         {"user_id": current_user["id"]},
-        {"_id": 0, "resume_text": 0}
+        {"_id": 0, "resume_text": 0, "conversation_history": 0}
     ).to_list(1000)
     return sessions
 
+@app.get("/api/chatbot/sessions/{session_id}/messages")
+async def get_chat_messages(
+    session_id: str,
+    before: Optional[int] = None,
+    limit: int = Query(50, ge=1, le=200),
+    current_user: Dict = Depends(get_current_user)
+):
+    # Newest messages first; pass the smallest seq returned as `before` to page further back
+    session = await db.chat_sessions.find_one(
+        {"session_id": session_id, "user_id": current_user["id"]},
+        {"_id": 0, "session_id": 1, "conversation_history": 1}
+    )
+    if not session:
+        raise HTTPException(status_code=404, detail="Session not found")
+    
+    query = {"session_id": session_id}
+    if before is not None:
+        query["seq"] = {"$lt": before}
+    messages = await db.chat_messages.find(query, {"_id": 0}).sort("seq", -1).limit(limit).to_list(limit)
+    
+    legacy = session.get("conversation_history") or []
+    if len(messages) < limit and legacy:
+        # The embedded turns of an older session come before seq 0; they are numbered
+        # back from -1, so paging with `before` carries on into them
+        start = len(legacy) if before is None else max(0, min(len(legacy), len(legacy) + before))
+        for index in range(start - 1, max(start - (limit - len(messages)), 0) - 1, -1):
+            messages.append({
+                "session_id": session_id,
+                "seq": index - len(legacy),
+                "role": legacy[index]["role"],
+                "content": legacy[index]["content"],
+            })
+    return {"messages": messages}
+
 # ==================== MIDDLEWARE ====================
 
 app.add_middleware(
@@ -654,11 +1605,115 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-@app.on_event("shutdown")
-async def shutdown_db_client():
-    client.close()
+# Refuse oversized uploads before their multipart body is buffered (64 KiB allowance for form fields)
+app.add_middleware(
+    RequestSizeLimitMiddleware,
+    max_bytes=RESUME_MAX_BYTES + 64 * 1024,
+    paths=["/api/application/post", "/api/chatbot/upload-resume"],
+)
+
+app.add_middleware(CompressionMiddleware, minimum_size=HTTP_COMPRESSION_MIN_BYTES)
+
+# Outermost, so the latency it records covers the other middleware too
+app.add_middleware(MetricsMiddleware, server_timing=METRICS_SERVER_TIMING)
+
+# ==================== LIFESPAN ====================
+
+async def startup():
+    # A database bound beforehand (bind_database, from a test or benchmark) is kept
+    if db is None:
+        connect_database()
+    if MONGO_MIGRATE_DATETIMES:
+        await migrate_datetimes(db)
+    await ensure_indexes(db)
+    if MONGO_INDEX_CHECK:
+        await verify_query_plans(db)
+    if JOB_CATALOG_CHANGE_STREAM:
+        job_catalog.start_change_stream()
+    resume_tasks.start()
+    job_expiry.start()
+    pending_uploads.start()
+
+async def shutdown():
+    # Runs after the server has stopped accepting connections and drained in-flight requests
+    await job_catalog.stop_change_stream()
+    await job_expiry.stop()
+    await pending_uploads.stop()
+    # Requeues any resume still being processed, for the next worker to pick up
+    await resume_tasks.stop()
+    password_hasher.shutdown()
+    resume_extractor.shutdown()
+    await llm_gateway.close()
+    if client is not None:
+        client.close()
+
+# Mongo unreachable, or too busy to hand out a connection in time: tell the client to retry
+async def mongo_unavailable(request: Request, exc: Exception):
+    logger.warning(f"MongoDB unavailable on {request.url.path}: {exc}")
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Service temporarily unavailable, please try again shortly"},
+        headers={"Retry-After": "1"},
+    )
+
+for mongo_timeout in (WaitQueueTimeoutError, ServerSelectionTimeoutError, ExecutionTimeout, NetworkTimeout):
+    app.add_exception_handler(mongo_timeout, mongo_unavailable)
 
 # Health check
 @app.get("/api/health")
 async def health_check():
     return {"status": "healthy", "message": "Job Portal API is running"}
+
+# Liveness: the process and its event loop are responsive. Touches nothing else, so a
+# database outage never gets workers restarted.
+@app.get("/api/health/live")
+async def liveness_check():
+    return {"status": "alive"}
+
+# Readiness: whether this worker should receive traffic now
+@app.get("/api/health/ready")
+async def readiness_check():
+    # Pool figures are read before the ping so they don't count its own connection
+    pool = mongo_pool_monitor.stats()
+    checks = {"mongo_pool": pool}
+    ready = pool["saturation"] < HEALTH_POOL_SATURATION_MAX
+    started = time.perf_counter()
+    try:
+        await asyncio.wait_for(db.command("ping"), HEALTH_PING_TIMEOUT_SECONDS)
+        checks["mongo_ping_ms"] = round((time.perf_counter() - started) * 1000, 2)
+    except Exception as e:
+        ready = False
+        checks["mongo_ping_ms"] = None
+        # Only the error type: this endpoint is unauthenticated
+        checks["mongo_error"] = type(e).__name__
+        logger.warning(f"Readiness ping failed: {e!r}")
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={"status": "ready" if ready else "unavailable", **checks},
+        headers={"Cache-Control": "no-store"},
+    )
+
+# Prometheus scrape endpoint
+@app.get("/api/metrics")
+async def get_metrics():
+    return Response(REGISTRY.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+# Cache statistics
+@app.get("/api/stats")
+async def get_stats():
+    return {
+        "job_catalog": job_catalog.stats(),
+        "mongo_pool": mongo_pool_monitor.stats(),
+        "user_cache": user_cache.stats(),
+        "password_hasher": password_hasher.stats(),
+        "resume_uploader": resume_uploader.stats(),
+        "pending_uploads": pending_uploads.stats(),
+        "resume_extractor": resume_extractor.stats(),
+        "analysis_cache": analysis_cache.stats(),
+        "job_index": job_index.stats(),
+        "llm_gateway": llm_gateway.stats(),
+        "resume_tasks": resume_tasks.stats(),
+        "job_importer": job_importer.stats(),
+        "application_exporter": application_exporter.stats(),
+        "job_expiry": job_expiry.stats(),
+    }
@@ -0,0 +1,285 @@
+import asyncio
+import logging
+import random
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable, Dict, List, Optional, Set
+
+from fastapi import HTTPException
+from pymongo import ReturnDocument
+
+logger = logging.getLogger(__name__)
+
+TERMINAL_STATUSES = ("succeeded", "failed")
+
+
+def is_retryable(error: Exception) -> bool:
+    # Client errors (a corrupt file, an unsupported type) fail for good; overload
+    # (429/503) and anything unexpected is worth another attempt
+    if isinstance(error, HTTPException):
+        return error.status_code == 429 or error.status_code >= 500
+    return True
+
+
+def error_message(error: Exception) -> str:
+    return error.detail if isinstance(error, HTTPException) else "Failed to process resume"
+
+
+class TaskQueue:
+    # Mongo-backed work queue drained by a pool of asyncio workers in each process.
+    # A worker claims a queued task by atomically marking it running with a lease,
+    # and renews the lease while the handler runs. Tasks whose lease lapses (the
+    # process died or was killed) are claimed again by any worker, so interrupted
+    # work resumes after a restart. Failures are retried with exponential backoff
+    # up to max_attempts; so are lapsed leases, and a task that keeps taking its
+    # worker down with it is marked failed by a sweep instead of being reclaimed
+    # forever. Finished tasks drop their payload and expire after
+    # retention_seconds through a TTL index on expires_at.
+
+    def __init__(
+        self,
+        collection,
+        handler: Callable[[Dict], Awaitable[Dict]],
+        workers: int = 2,
+        max_attempts: int = 3,
+        lease_seconds: float = 60,
+        retry_base_seconds: float = 2,
+        retention_seconds: float = 24 * 3600,
+        poll_seconds: float = 1,
+    ):
+        self.collection = collection
+        self.handler = handler
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.lease_seconds = lease_seconds
+        self.retry_base_seconds = retry_base_seconds
+        self.retention_seconds = retention_seconds
+        self.poll_seconds = poll_seconds
+        self.worker_id = uuid.uuid4().hex
+
+        self._tasks: List[asyncio.Task] = []
+        self._wakeup = asyncio.Event()
+        # Task id -> events set whenever this process changes the task's status
+        self._watchers: Dict[str, Set[asyncio.Event]] = {}
+        self._running = 0
+        self._swept_at: Optional[float] = None
+
+        self.submitted = 0
+        self.succeeded = 0
+        self.failed = 0
+        self.retried = 0
+        self.reclaimed = 0
+        self.abandoned = 0
+        self.run_seconds_total = 0.0
+
+    async def submit(self, task: Dict) -> Dict:
+        now = datetime.now(timezone.utc)
+        task = {
+            "id": str(uuid.uuid4()),
+            "status": "queued",
+            "attempts": 0,
+            "available_at": now,
+            "created_at": now,
+            "updated_at": now,
+            **task,
+        }
+        await self.collection.insert_one(task)
+        self.submitted += 1
+        self._wakeup.set()
+        return task
+
+    def start(self) -> None:
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _claim(self) -> Optional[Dict]:
+        now = datetime.now(timezone.utc)
+        lease_expires_at = now + timedelta(seconds=self.lease_seconds)
+        task = await self.collection.find_one_and_update(
+            {"$or": [
+                {"status": "queued", "available_at": {"$lte": now}},
+                {"status": "running", "lease_expires_at": {"$lt": now}, "attempts": {"$lt": self.max_attempts}},
+            ]},
+            {
+                "$set": {
+                    "status": "running",
+                    "worker_id": self.worker_id,
+                    "lease_expires_at": lease_expires_at,
+                    "updated_at": now,
+                },
+                "$inc": {"attempts": 1},
+            },
+            sort=[("available_at", 1)],
+            return_document=ReturnDocument.BEFORE,
+        )
+        if task is None:
+            return None
+        if task["status"] == "running":
+            # Picked up after another worker's lease ran out
+            self.reclaimed += 1
+        task.update(status="running", worker_id=self.worker_id, lease_expires_at=lease_expires_at, attempts=task["attempts"] + 1)
+        return task
+
+    async def _fail_abandoned(self) -> int:
+        # Tasks whose lease lapsed on their last attempt: every worker that ran them died
+        # or was killed (a resume that crashes or exhausts the process), so give up on them
+        update = self._terminal_update("failed", {"error": "Resume processing was interrupted too many times"})
+        update["$set"]["updated_at"] = datetime.now(timezone.utc)
+        result = await self.collection.update_many(
+            {
+                "status": "running",
+                "lease_expires_at": {"$lt": datetime.now(timezone.utc)},
+                "attempts": {"$gte": self.max_attempts},
+            },
+            update,
+        )
+        if result.modified_count:
+            logger.error(f"Marked {result.modified_count} abandoned tasks failed after {self.max_attempts} attempts")
+            self.abandoned += result.modified_count
+        return result.modified_count
+
+    async def _worker(self) -> None:
+        while True:
+            try:
+                task = await self._claim()
+                # Swept when idle, at most once per lease period in each worker
+                if task is None and (self._swept_at is None or time.monotonic() - self._swept_at >= self.lease_seconds):
+                    self._swept_at = time.monotonic()
+                    await self._fail_abandoned()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Task queue claim failed: {e}")
+                task = None
+
+            if task is None:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self.poll_seconds)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            await self._run(task)
+
+    async def _run(self, task: Dict) -> None:
+        self._running += 1
+        started = time.perf_counter()
+        heartbeat = asyncio.create_task(self._heartbeat(task))
+        try:
+            result = await self.handler(task)
+        except asyncio.CancelledError:
+            # Shutting down: hand the task back without spending an attempt
+            await self._finish(task, {
+                "$set": {"status": "queued", "available_at": datetime.now(timezone.utc)},
+                "$inc": {"attempts": -1},
+                "$unset": {"lease_expires_at": ""},
+            })
+            raise
+        except Exception as e:
+            await self._fail(task, e)
+        else:
+            self.succeeded += 1
+            await self._finish(task, self._terminal_update("succeeded", {"result": result, "error": None}))
+        finally:
+            heartbeat.cancel()
+            self._running -= 1
+            self.run_seconds_total += time.perf_counter() - started
+
+    async def _fail(self, task: Dict, error: Exception) -> None:
+        if is_retryable(error) and task["attempts"] < self.max_attempts:
+            delay = self.retry_base_seconds * 2 ** (task["attempts"] - 1) * random.uniform(0.8, 1.2)
+            logger.warning(f"Task {task['id']} attempt {task['attempts']} failed, retrying in {delay:.1f}s: {error}")
+            self.retried += 1
+            await self._finish(task, {
+                "$set": {
+                    "status": "queued",
+                    "available_at": datetime.now(timezone.utc) + timedelta(seconds=delay),
+                    "error": error_message(error),
+                },
+                "$unset": {"lease_expires_at": ""},
+            })
+            return
+
+        logger.error(f"Task {task['id']} failed after {task['attempts']} attempts: {error}")
+        self.failed += 1
+        await self._finish(task, self._terminal_update("failed", {"error": error_message(error)}))
+
+    def _terminal_update(self, status: str, fields: Dict) -> Dict:
+        now = datetime.now(timezone.utc)
+        return {
+            "$set": {"status": status, "finished_at": now, "expires_at": now + timedelta(seconds=self.retention_seconds), **fields},
+            "$unset": {"payload": "", "lease_expires_at": ""},
+        }
+
+    async def _finish(self, task: Dict, update: Dict) -> None:
+        # Only the current lease holder may record an outcome; a worker whose lease
+        # lapsed and was reclaimed elsewhere leaves the task alone
+        update["$set"]["updated_at"] = datetime.now(timezone.utc)
+        await self.collection.update_one(
+            {"id": task["id"], "worker_id": self.worker_id, "attempts": task["attempts"]},
+            update,
+        )
+        self._notify(task["id"])
+
+    async def _heartbeat(self, task: Dict) -> None:
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            await self.collection.update_one(
+                {"id": task["id"], "worker_id": self.worker_id, "attempts": task["attempts"], "status": "running"},
+                {"$set": {"lease_expires_at": datetime.now(timezone.utc) + timedelta(seconds=self.lease_seconds)}},
+            )
+
+    def _notify(self, task_id: str) -> None:
+        for event in self._watchers.get(task_id, ()):
+            event.set()
+
+    async def get(self, task_id: str) -> Optional[Dict]:
+        return await self.collection.find_one({"id": task_id}, {"_id": 0, "payload": 0})
+
+    async def watch(self, task_id: str):
+        # Yields the task each time its status or attempt count changes, ending once
+        # it finishes. Changes made in this process wake the watcher at once; changes
+        # from other processes are seen on the next poll.
+        event = asyncio.Event()
+        self._watchers.setdefault(task_id, set()).add(event)
+        last = None
+        try:
+            while True:
+                event.clear()
+                task = await self.get(task_id)
+                if task is None:
+                    return
+                state = (task["status"], task["attempts"])
+                if state != last:
+                    last = state
+                    yield task
+                if task["status"] in TERMINAL_STATUSES:
+                    return
+                try:
+                    await asyncio.wait_for(event.wait(), self.poll_seconds)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            self._watchers[task_id].discard(event)
+            if not self._watchers[task_id]:
+                del self._watchers[task_id]
+
+    def stats(self) -> Dict:
+        return {
+            "workers": self.workers,
+            "running": self._running,
+            "submitted": self.submitted,
+            "succeeded": self.succeeded,
+            "failed": self.failed,
+            "retried": self.retried,
+            "reclaimed": self.reclaimed,
+            "abandoned": self.abandoned,
+            "run_seconds_total": self.run_seconds_total,
+        }
@@ -0,0 +1,83 @@
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Set, Tuple
+
+
+class UserCache:
+    # Bounded LRU of user profiles keyed by (user id, token), each entry living at
+    # most ttl_seconds. Anything that changes a user must call invalidate_user().
+
+    def __init__(self, max_size: int = 10000, ttl_seconds: float = 300):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[float, Dict]]" = OrderedDict()
+        self._keys_by_user: Dict[str, Set[Tuple[str, str]]] = {}
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def get(self, user_id: str, token: str) -> Optional[Dict]:
+        key = (user_id, token)
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        expires_at, user = entry
+        if expires_at <= time.monotonic():
+            self._discard(key)
+            self.expirations += 1
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return user
+
+    def put(self, user_id: str, token: str, user: Dict) -> None:
+        if self.max_size <= 0:
+            return
+        key = (user_id, token)
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, user)
+        self._entries.move_to_end(key)
+        self._keys_by_user.setdefault(user_id, set()).add(key)
+
+        while len(self._entries) > self.max_size:
+            oldest = next(iter(self._entries))
+            self._discard(oldest)
+            self.evictions += 1
+
+    def invalidate_user(self, user_id: str) -> None:
+        for key in list(self._keys_by_user.get(user_id, ())):
+            self._discard(key)
+            self.invalidations += 1
+
+    def invalidate_token(self, user_id: str, token: str) -> None:
+        if (user_id, token) in self._entries:
+            self._discard((user_id, token))
+            self.invalidations += 1
+
+    def _discard(self, key: Tuple[str, str]) -> None:
+        self._entries.pop(key, None)
+        keys = self._keys_by_user.get(key[0])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_user[key[0]]
+
+    def stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+        }
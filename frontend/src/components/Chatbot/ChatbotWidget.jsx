@@ -26,6 +26,20 @@ const ChatbotWidget = () => {
     scrollToBottom();
   }, [messages]);
 
+  // Uploaded resumes are analyzed in the background; poll the task until it finishes
+  const waitForResumeTask = async (taskId) => {
+    for (;;) {
+      const { data } = await api.get(`/api/chatbot/tasks/${taskId}`);
+      if (data.status === 'succeeded') return data.result;
+      if (data.status === 'failed') {
+        const error = new Error(data.error);
+        error.detail = data.error;
+        throw error;
+      }
+      await new Promise((resolve) => setTimeout(resolve, 1500));
+    }
+  };
+
   const handleFileUpload = async (e) => {
     const file = e.target.files[0];
     if (!file) return;
@@ -46,19 +60,20 @@ const ChatbotWidget = () => {
           'Content-Type': 'multipart/form-data',
         },
       });
+      const result = await waitForResumeTask(response.data.task_id);
 
-      setSessionId(response.data.session_id);
-      setRecommendedJobs(response.data.recommended_jobs || []);
+      setSessionId(result.session_id);
+      setRecommendedJobs(result.recommended_jobs || []);
       setMessages([
         {
           role: 'assistant',
-          content: response.data.analysis,
+          content: result.analysis,
         },
       ]);
       setView('chat');
       toast.success('Resume analyzed successfully!');
     } catch (error) {
-      toast.error(error.response?.data?.detail || 'Failed to upload resume');
+      toast.error(error.response?.data?.detail || error.detail || 'Failed to upload resume');
     } finally {
       setLoading(false);
     }
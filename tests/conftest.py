@@ -0,0 +1,53 @@
+import os
+import sys
+import uuid
+from pathlib import Path
+
+import pytest
+
+# The backend is a flat set of modules imported by name, as server.py does
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+os.environ.setdefault("JOB_LIFETIME_DAYS", "0")
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+def database():
+    # A fresh in-memory database bound to the app, as the benchmarks do (no lifespan)
+    mongomock_motor = pytest.importorskip("mongomock_motor")
+    import server
+
+    database = mongomock_motor.AsyncMongoMockClient(tz_aware=True)["test"]
+    server.bind_database(database)
+    server.job_catalog.invalidate()
+    return database
+
+
+@pytest.fixture
+async def client(database):
+    import httpx
+    import server
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=server.app), base_url="http://test") as client:
+        yield client
+
+
+@pytest.fixture
+def login(database):
+    # Inserts a user and returns it with its Authorization header
+    import server
+
+    async def login(role="Employer"):
+        user_id = str(uuid.uuid4())
+        user = {
+            "id": user_id, "name": f"User {user_id[:8]}", "email": f"{user_id}@example.com",
+            "phone": 1234567890, "role": role, "created_at": server.utc_now(),
+        }
+        await database.users.insert_one(dict(user))
+        return user, {"Authorization": f"Bearer {server.create_jwt_token(user)}"}
+
+    return login
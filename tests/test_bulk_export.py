@@ -0,0 +1,90 @@
+import csv
+import io
+import json
+
+import pytest
+
+import server
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def applications(database, login, monkeypatch):
+    # Small Mongo batches and output chunks, so a single export crosses many of both
+    monkeypatch.setattr(server, "APPLICATION_EXPORT_BATCH_SIZE", 7)
+    monkeypatch.setattr(server.application_exporter, "chunk_bytes", 256)
+    # Nothing is held back as possibly still being written
+    monkeypatch.setattr(server, "APPLICATION_EXPORT_SETTLE_SECONDS", -60)
+
+    employer, auth = await login("Employer")
+    other, _ = await login("Employer")
+    docs = []
+    for i in range(45):
+        owner = other if i % 3 == 0 else employer
+        docs.append({
+            "id": f"app-{i:02d}", "name": f"Applicant {i}", "email": f"a{i}@example.com", "phone": i,
+            "address": "Pune", "cover_letter": "Hello", "applicant_id": {"user": f"seeker-{i}", "role": "Job Seeker"},
+            "employer_id": {"user": owner["id"], "role": "Employer"}, "resume": {"url": None, "status": "uploaded"},
+            "created_at": server.utc_now(),
+        })
+    await database.applications.insert_many(docs)
+    expected = [doc["id"] for doc in docs if doc["employer_id"]["user"] == employer["id"]]
+    return auth, expected
+
+
+async def export(client, auth, **params):
+    response = await client.get("/api/application/employer/export", params=params, headers=auth)
+    assert response.status_code == 200, response.text
+    return response
+
+
+def ndjson(response):
+    return [json.loads(line) for line in response.text.splitlines()]
+
+
+async def test_export_is_complete_in_order_and_only_the_callers(client, applications):
+    auth, expected = applications
+    rows = ndjson(await export(client, auth))
+    # 30 rows over batches of 7: every one once, in insertion (_id) order
+    assert [row["id"] for row in rows] == expected
+    assert len({row["cursor"] for row in rows}) == len(rows)
+    assert set(rows[0]) == {*server.APPLICATION_EXPORT_FIELDS, "cursor"}
+
+
+async def test_resuming_from_each_cursor_walks_the_rest(client, applications):
+    auth, expected = applications
+    seen, cursor = [], None
+    while True:
+        # Take a few rows, then resume after the last, as a client that dropped would
+        rows = ndjson(await export(client, auth, **({"cursor": cursor} if cursor else {})))[:4]
+        if not rows:
+            break
+        seen += [row["id"] for row in rows]
+        cursor = rows[-1]["cursor"]
+    assert seen == expected
+
+
+async def test_csv_export_with_selected_fields(client, applications):
+    auth, expected = applications
+    response = await export(client, auth, format="csv", fields="id,email")
+    assert response.headers["content-type"].startswith("text/csv")
+    records = list(csv.reader(io.StringIO(response.text)))
+    assert records[0] == ["id", "email", "cursor"]
+    assert [record[0] for record in records[1:]] == expected
+
+
+async def test_recent_rows_are_held_back(client, applications, monkeypatch):
+    auth, _ = applications
+    monkeypatch.setattr(server, "APPLICATION_EXPORT_SETTLE_SECONDS", 60)
+    assert (await export(client, auth)).text == ""
+
+
+async def test_export_rejects_bad_requests(client, applications, login):
+    auth, _ = applications
+    bad_cursor = await client.get("/api/application/employer/export", params={"cursor": "nope"}, headers=auth)
+    assert bad_cursor.status_code == 400
+    bad_field = await client.get("/api/application/employer/export", params={"fields": "id,password"}, headers=auth)
+    assert bad_field.status_code == 400
+    _, seeker = await login("Job Seeker")
+    assert (await client.get("/api/application/employer/export", headers=seeker)).status_code == 403
@@ -0,0 +1,108 @@
+import json
+
+import pytest
+from pydantic import BaseModel
+
+from bulk_import import BulkJobImporter, csv_rows, iter_lines, ndjson_rows
+
+pytestmark = pytest.mark.anyio
+
+
+async def chunked(data: bytes, size: int):
+    for start in range(0, len(data), size):
+        yield data[start:start + size]
+
+
+async def collect(iterator):
+    return [item async for item in iterator]
+
+
+async def test_iter_lines_joins_lines_across_chunks():
+    data = "﻿alpha\r\nbéta\ngamma".encode()
+    assert await collect(iter_lines(chunked(data, 3))) == ["alpha", "béta", "gamma"]
+
+
+async def test_iter_lines_reports_overlong_lines_and_keeps_going():
+    data = b"short\n" + b"x" * 50 + b"\nafter\n"
+    assert await collect(iter_lines(chunked(data, 7), max_chars=20)) == ["short", None, "after"]
+
+
+async def test_iter_lines_reports_an_overlong_last_line():
+    data = b"short\n" + b"x" * 50
+    assert await collect(iter_lines(chunked(data, 7), max_chars=20)) == ["short", None]
+
+
+async def test_ndjson_rows_reports_invalid_rows():
+    lines = [json.dumps({"title": "a"}), "", "not json", "[1]", "x" * 70000]
+    rows = await collect(ndjson_rows(iter_lines(chunked("\n".join(lines).encode(), 4096))))
+    assert rows[0] == (1, {"title": "a"}, None)
+    assert [row for row, _, _ in rows] == [1, 2, 3, 4]
+    assert rows[1][2].startswith("Invalid JSON")
+    assert rows[2][2] == "Each line must be a JSON object"
+    assert rows[3][2].startswith("Line is longer than")
+
+
+async def test_csv_rows_accepts_quoted_line_breaks():
+    data = b'title,description\nDev,"line one\nline two"\nOps,\n'
+    rows = await collect(csv_rows(iter_lines(chunked(data, 5))))
+    assert rows == [
+        (1, {"title": "Dev", "description": "line one\nline two"}, None),
+        (2, {"title": "Ops"}, None),
+    ]
+
+
+async def test_csv_rows_reports_column_count_mismatch():
+    rows = await collect(csv_rows(iter_lines(chunked(b"a,b\n1,2,3\n4,5\n", 64))))
+    assert rows == [(1, None, "Expected 2 columns, got 3"), (2, {"a": "4", "b": "5"}, None)]
+
+
+async def test_csv_rows_stops_at_a_runaway_quote():
+    data = b'title,description\nDev,ok\nOps,"never closed\n' + b"more text\n" * 100
+    rows = await collect(csv_rows(iter_lines(chunked(data, 64)), max_chars=200))
+    assert rows[0] == (1, {"title": "Dev", "description": "ok"}, None)
+    assert rows[1][0] == 2 and rows[1][1] is None
+    assert "unterminated quote" in rows[1][2]
+    assert len(rows) == 2
+
+
+async def test_csv_rows_reports_an_unterminated_quote_at_the_end():
+    rows = await collect(csv_rows(iter_lines(chunked(b'a,b\n1,"open\n', 64))))
+    assert rows == [(1, None, "Unterminated quoted field")]
+
+
+class Job(BaseModel):
+    title: str
+
+
+def make_job(fields):
+    job = Job(**fields)
+    return {"id": job.title, **job.model_dump()}
+
+
+@pytest.fixture
+def collection():
+    mongomock_motor = pytest.importorskip("mongomock_motor")
+    return mongomock_motor.AsyncMongoMockClient()["test"].jobs
+
+
+async def test_importer_inserts_in_batches_and_reports_each_row(collection):
+    lines = [json.dumps({"title": f"job-{i}"}) for i in range(5)] + ["{}", "oops"]
+    importer = BulkJobImporter(collection, batch_size=2)
+    entries = await collect(importer.run(ndjson_rows(iter_lines(chunked("\n".join(lines).encode(), 16))), make_job))
+
+    summary = entries[-1]["summary"]
+    assert (summary["rows"], summary["created"], summary["invalid"], summary["failed"]) == (7, 5, 2, 0)
+    assert sorted(entry["row"] for entry in entries[:-1]) == list(range(1, 8))
+    assert await collection.count_documents({}) == 5
+    assert importer.stats()["rejected"] == 2
+
+
+async def test_importer_stops_at_max_rows(collection):
+    lines = [json.dumps({"title": f"job-{i}"}) for i in range(5)]
+    importer = BulkJobImporter(collection, max_rows=3)
+    entries = await collect(importer.run(ndjson_rows(iter_lines(chunked("\n".join(lines).encode(), 16))), make_job))
+
+    assert [entry["row"] for entry in entries[:-1] if entry["status"] == "invalid"] == [4]
+    assert entries[-1]["summary"]["created"] == 3
+    assert await collection.count_documents({}) == 3
+
@@ -0,0 +1,134 @@
+import pytest
+
+import server
+from http_caching import ENCODINGS, etag_for, if_none_match, negotiate_encoding
+
+pytestmark = pytest.mark.anyio
+
+
+def job_payload(i: int, **fields):
+    return {
+        "title": f"Python Developer {i}",
+        "description": f"Job number {i}: build and run Python services with FastAPI and MongoDB.",
+        "category": "Software Development",
+        "country": "India",
+        "city": "Pune",
+        "location": f"{i} Main Street, Pune, India",
+        "fixed_salary": 50000 + i,
+        **fields,
+    }
+
+
+@pytest.fixture
+async def jobs(client, login):
+    # Enough jobs for a getall page to pass the compression threshold
+    _, auth = await login("Employer")
+    posted = []
+    for i in range(10):
+        response = await client.post("/api/job/post", json=job_payload(i), headers=auth)
+        assert response.status_code == 200, response.text
+        posted.append(response.json())
+    return posted, auth
+
+
+IDENTITY = {"Accept-Encoding": "identity"}
+
+
+def test_if_none_match_ignores_the_coding_suffix_and_weak_prefix():
+    etag = etag_for("a", 1)
+    assert if_none_match(etag, etag)
+    assert if_none_match(f'"other", W/{etag[:-1]}-gzip"', etag)
+    assert if_none_match("*", etag)
+    assert not if_none_match(None, etag)
+    assert not if_none_match('"other"', etag)
+
+
+@pytest.mark.parametrize("header, expected", [
+    ("gzip", "gzip"),
+    ("deflate, gzip;q=0.5", "gzip"),
+    ("gzip;q=0", None),
+    ("identity", None),
+    ("*", ENCODINGS[0]),
+    ("", None),
+])
+def test_negotiate_encoding(header, expected):
+    assert negotiate_encoding(header) == expected
+
+
+async def test_getall_answers_a_matching_if_none_match_with_304(client, jobs):
+    response = await client.get("/api/job/getall", headers=IDENTITY)
+    assert response.status_code == 200
+    etag = response.headers["etag"]
+    assert response.headers["cache-control"] == server.JOB_LIST_CACHE_CONTROL
+
+    revalidated = await client.get("/api/job/getall", headers={**IDENTITY, "If-None-Match": etag})
+    assert revalidated.status_code == 304
+    assert revalidated.content == b""
+    assert revalidated.headers["etag"] == etag
+
+    # A different query is a different representation
+    other = await client.get("/api/job/getall?limit=5", headers={**IDENTITY, "If-None-Match": etag})
+    assert other.status_code == 200
+    assert other.headers["etag"] != etag
+
+
+@pytest.mark.parametrize("catalog", [True, False])
+async def test_getall_etag_changes_after_update_and_delete(client, jobs, monkeypatch, catalog):
+    monkeypatch.setattr(server, "JOB_CATALOG_ENABLED", catalog)
+    posted, auth = jobs
+    first = (await client.get("/api/job/getall", headers=IDENTITY)).headers["etag"]
+    assert (await client.get("/api/job/getall", headers=IDENTITY)).headers["etag"] == first
+
+    response = await client.put(f"/api/job/update/{posted[0]['id']}", json=job_payload(0, city="Mumbai"), headers=auth)
+    assert response.status_code == 200
+    updated = await client.get("/api/job/getall", headers={**IDENTITY, "If-None-Match": first})
+    assert updated.status_code == 200
+    assert updated.headers["etag"] != first
+
+    response = await client.delete(f"/api/job/delete/{posted[1]['id']}", headers=auth)
+    assert response.status_code == 200
+    deleted = await client.get("/api/job/getall", headers={**IDENTITY, "If-None-Match": updated.headers["etag"]})
+    assert deleted.status_code == 200
+    assert deleted.headers["etag"] not in (first, updated.headers["etag"])
+    assert posted[1]["id"] not in [job["id"] for job in deleted.json()["jobs"]]
+
+
+async def test_single_job_etag_follows_its_revision(client, jobs):
+    posted, auth = jobs
+    url = f"/api/job/{posted[0]['id']}"
+    response = await client.get(url, headers={**auth, **IDENTITY})
+    etag = response.headers["etag"]
+    assert response.headers["cache-control"] == server.JOB_DETAIL_CACHE_CONTROL
+    assert (await client.get(url, headers={**auth, **IDENTITY, "If-None-Match": etag})).status_code == 304
+
+    await client.put(f"/api/job/update/{posted[0]['id']}", json=job_payload(0, city="Mumbai"), headers=auth)
+    response = await client.get(url, headers={**auth, **IDENTITY, "If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()["city"] == "Mumbai"
+
+
+async def test_getall_is_gzipped_only_when_the_client_accepts_it(client, jobs):
+    plain = await client.get("/api/job/getall", headers=IDENTITY)
+    assert "content-encoding" not in plain.headers
+    assert "Accept-Encoding" in plain.headers["vary"]
+
+    compressed = await client.get("/api/job/getall", headers={"Accept-Encoding": "gzip"})
+    assert compressed.headers["content-encoding"] == "gzip"
+    assert int(compressed.headers["content-length"]) < len(plain.content)
+    assert compressed.json() == plain.json()
+    # The compressed body gets its own strong ETag
+    assert compressed.headers["etag"] == plain.headers["etag"][:-1] + '-gzip"'
+
+
+async def test_compressed_304_keeps_the_coded_etag(client, jobs):
+    etag = (await client.get("/api/job/getall", headers={"Accept-Encoding": "gzip"})).headers["etag"]
+    revalidated = await client.get("/api/job/getall", headers={"Accept-Encoding": "gzip", "If-None-Match": etag})
+    assert revalidated.status_code == 304
+    assert revalidated.headers["etag"] == etag
+    assert "content-encoding" not in revalidated.headers
+
+
+async def test_small_responses_are_not_compressed(client, jobs):
+    response = await client.get("/api/job/getall?limit=1", headers={"Accept-Encoding": "gzip"})
+    assert len(response.content) < server.HTTP_COMPRESSION_MIN_BYTES
+    assert "content-encoding" not in response.headers
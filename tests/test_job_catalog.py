@@ -0,0 +1,82 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from job_catalog import JobCatalog
+
+pytestmark = pytest.mark.anyio
+
+EPOCH = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+def make_job(i: int, revision: int = 1, **fields):
+    return {"id": f"job-{i}", "job_posted_on": EPOCH + timedelta(minutes=i), "revision": revision, **fields}
+
+
+class FakeCursor:
+    def __init__(self, collection):
+        self.collection = collection
+
+    async def to_list(self, length):
+        if self.collection.gate is not None:
+            await self.collection.gate.wait()
+        return [dict(job) for job in self.collection.docs]
+
+
+class FakeJobs:
+    def __init__(self, docs):
+        self.docs = docs
+        self.gate = None
+
+    def find(self, query, projection):
+        return FakeCursor(self)
+
+
+class FakeDB:
+    def __init__(self, docs):
+        self.jobs = FakeJobs(docs)
+
+
+async def test_upsert_keeps_snapshot_sorted_and_fingerprint_matches_a_full_load():
+    docs = [make_job(i) for i in (1, 3, 5)]
+    catalog = JobCatalog(FakeDB(docs))
+    await catalog.refresh()
+
+    catalog.upsert(make_job(4))
+    catalog.upsert(make_job(3, revision=2))
+    catalog.remove("job-1")
+
+    assert [job["id"] for job in await catalog.get_jobs()] == ["job-5", "job-4", "job-3"]
+    assert (await catalog.get_job("job-3"))["revision"] == 2
+    assert await catalog.get_job("job-1") is None
+
+    fresh = JobCatalog(FakeDB([make_job(3, revision=2), make_job(4), make_job(5)]))
+    await fresh.refresh()
+    assert catalog.fingerprint == fresh.fingerprint
+
+
+async def test_upsert_keeps_iterators_over_the_old_snapshot_intact():
+    catalog = JobCatalog(FakeDB([make_job(i) for i in range(3)]))
+    await catalog.refresh()
+    jobs = await catalog.iter_jobs()
+    catalog.upsert(make_job(10))
+    assert [job["id"] for job in jobs] == ["job-2", "job-1", "job-0"]
+
+
+async def test_upsert_during_refresh_forces_another_refresh():
+    db = FakeDB([make_job(1)])
+    catalog = JobCatalog(db)
+    db.jobs.gate = asyncio.Event()
+    refresh = asyncio.create_task(catalog.refresh())
+    await asyncio.sleep(0)
+
+    # Written and applied while the read above is in flight, which returns without it
+    catalog.upsert(make_job(2))
+    db.jobs.gate.set()
+    await refresh
+    assert catalog.stats()["size"] == 1
+
+    # The write has landed by now; the next read reloads instead of serving the older read
+    db.jobs.docs.append(make_job(2))
+    assert [job["id"] for job in await catalog.get_jobs()] == ["job-2", "job-1"]
@@ -0,0 +1,80 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+import server
+from job_expiry import JobExpiryScheduler
+
+pytestmark = pytest.mark.anyio
+
+NOW = datetime(2026, 3, 10, 12, 0, tzinfo=timezone.utc)
+
+
+def job(job_id, posted_days_ago, now=NOW, **fields):
+    return {
+        "id": job_id, "title": f"Python Developer {job_id}",
+        "description": "Build APIs in python with fastapi and mongodb for a small team.",
+        "category": "Software Development", "country": "India", "city": "Pune",
+        "location": "1 Main Street, Pune, India", "expired": False,
+        "job_posted_on": now - timedelta(days=posted_days_ago), "posted_by": "employer", **fields,
+    }
+
+
+async def test_sweep_expires_old_jobs_and_archives_long_expired_ones(database):
+    await database.jobs.insert_many([
+        job("fresh", 10), job("old-1", 40), job("old-2", 50), job("old-3", 60),
+        job("gone", 400, expired=True, expired_at=NOW - timedelta(days=100)),
+        job("recently-expired", 400, expired=True, expired_at=NOW - timedelta(days=10)),
+    ])
+    notified = []
+    expiry = JobExpiryScheduler(database, lifetime_days=30, archive_after_days=90, batch_size=2, on_expired=notified.extend)
+
+    assert await expiry.run_once(NOW) == {"expired": 3, "archived": 1}
+    active = {doc["id"] async for doc in database.jobs.find({"expired": False})}
+    assert active == {"fresh"}
+    assert sorted(notified) == ["old-1", "old-2", "old-3"]
+    assert (await database.jobs.find_one({"id": "old-1"}))["expired_at"] == NOW
+    assert await database.jobs.find_one({"id": "gone"}) is None
+    assert [doc["id"] async for doc in database.jobs_archive.find()] == ["gone"]
+
+    # Nothing left to do; a second sweep changes nothing
+    assert await expiry.run_once(NOW) == {"expired": 0, "archived": 0}
+    assert expiry.stats()["expired"] == 3 and expiry.stats()["archived"] == 1
+
+    # 90 days on, the jobs expired by the first sweep are archived too
+    later = NOW + timedelta(days=91)
+    assert (await expiry.run_once(later))["archived"] == 4
+
+
+async def test_lifetime_zero_disables_expiry(database):
+    await database.jobs.insert_many([job("ancient", 3650), job("gone", 400, expired=True, expired_at=NOW - timedelta(days=100))])
+    expiry = JobExpiryScheduler(database, lifetime_days=0, archive_after_days=90)
+
+    expiry.start()
+    assert expiry.stats()["running"] is False
+    assert await expiry.run_once(NOW) == {"expired": 0, "archived": 1}
+    assert (await database.jobs.find_one({"id": "ancient"}))["expired"] is False
+
+
+async def test_expired_jobs_leave_listing_search_and_catalog(client, database, login, monkeypatch):
+    now = server.utc_now()
+    await database.jobs.insert_many([job("fresh", 1, now), job("stale", 45, now)])
+    monkeypatch.setattr(server.job_expiry, "lifetime_days", 30)
+
+    listed = (await client.get("/api/job/getall")).json()["jobs"]
+    assert {item["id"] for item in listed} == {"fresh", "stale"}
+    assert (await client.get("/api/job/search", params={"q": "python"})).json()["total"] == 2
+
+    # Expiring invalidates this worker's catalog (on_expired), so the next read reloads it
+    assert (await server.job_expiry.run_once())["expired"] == 1
+
+    listed = (await client.get("/api/job/getall")).json()["jobs"]
+    assert [item["id"] for item in listed] == ["fresh"]
+    assert (await client.get("/api/job/search", params={"q": "python"})).json()["total"] == 1
+    assert await server.job_catalog.get_job("stale") is None
+
+    # Still readable directly, marked expired
+    _, auth = await login("Job Seeker")
+    response = await client.get("/api/job/stale", headers=auth)
+    assert response.status_code == 200
+    assert response.json()["expired"] is True
@@ -0,0 +1,84 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi import HTTPException
+
+from job_catalog import JobCatalog
+from server import apply_job_cursor, build_job_filter, decode_job_cursor, encode_job_cursor, job_sort
+
+pytestmark = pytest.mark.anyio
+
+EPOCH = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+def make_jobs():
+    # Pairs of jobs share a timestamp, so the id tie-break is exercised on every page
+    return [
+        {"id": f"job-{i:02d}", "job_posted_on": EPOCH + timedelta(minutes=i // 2), "expired": False, "category": "IT"}
+        for i in range(25)
+    ]
+
+
+def test_cursor_round_trip():
+    job = {"id": "abc", "job_posted_on": EPOCH}
+    assert decode_job_cursor(encode_job_cursor(job)) == (EPOCH, "abc")
+
+
+@pytest.mark.parametrize("cursor", ["not-base64!", "bm9wZQ", encode_job_cursor({"id": "x", "job_posted_on": EPOCH})[:-4]])
+def test_invalid_cursor_is_a_400(cursor):
+    with pytest.raises(HTTPException) as raised:
+        decode_job_cursor(cursor)
+    assert raised.value.status_code == 400
+
+
+@pytest.mark.parametrize("sort", ["newest", "oldest"])
+async def test_mongo_pages_cover_every_job_once_in_order(sort):
+    mongomock_motor = pytest.importorskip("mongomock_motor")
+    collection = mongomock_motor.AsyncMongoMockClient(tz_aware=True)["test"].jobs
+    jobs = make_jobs()
+    await collection.insert_many([dict(job) for job in jobs])
+
+    seen, cursor = [], None
+    while True:
+        query = build_job_filter(category="IT")
+        if cursor:
+            query = apply_job_cursor(query, cursor, sort)
+        page = await collection.find(query, {"_id": 0}).sort(job_sort(sort)).limit(7).to_list(7)
+        seen += [job["id"] for job in page]
+        if len(page) < 7:
+            break
+        cursor = encode_job_cursor(page[-1])
+
+    expected = sorted(jobs, key=lambda job: (job["job_posted_on"], job["id"]), reverse=(sort == "newest"))
+    assert seen == [job["id"] for job in expected]
+
+
+class FakeDB:
+    def __init__(self, jobs):
+        self.jobs = self
+
+        class Cursor:
+            async def to_list(_, length):
+                return [dict(job) for job in jobs]
+
+        self._cursor = Cursor()
+
+    def find(self, query, projection):
+        return self._cursor
+
+
+@pytest.mark.parametrize("newest_first", [True, False])
+async def test_catalog_pages_match_mongo_order(newest_first):
+    jobs = make_jobs()
+    catalog = JobCatalog(FakeDB(jobs))
+
+    seen, after = [], None
+    while True:
+        page = list(job for _, job in zip(range(7), await catalog.iter_jobs(after, newest_first=newest_first)))
+        seen += [job["id"] for job in page]
+        if len(page) < 7:
+            break
+        after = decode_job_cursor(encode_job_cursor(page[-1]))
+
+    expected = sorted(jobs, key=lambda job: (job["job_posted_on"], job["id"]), reverse=newest_first)
+    assert seen == [job["id"] for job in expected]
@@ -0,0 +1,89 @@
+import pytest
+
+import server
+from job_ranking import JobIndex, job_terms, tokenize
+
+
+def make_job(job_id, title, description="General duties with a small friendly team.", category="Other", **fields):
+    return {
+        "id": job_id, "title": title, "description": description, "category": category,
+        "city": "Pune", "country": "India", "location": "1 Main Street, Pune, India", **fields,
+    }
+
+
+JOBS = [
+    make_job("accountant", "Accountant", "Bookkeeping, tax returns and excel reports.", "Finance"),
+    make_job("python", "Python Developer", "Build APIs with python, fastapi and mongodb.", "Software Development"),
+    make_job("designer", "Graphic Designer", "Brand work in figma and photoshop.", "Graphics & Design"),
+    make_job("react", "React Engineer", "Frontend work with react and typescript; some python scripting.", "Web Development"),
+    make_job("sales", "Sales Executive", "Negotiation and account management.", "Sales"),
+]
+
+RESUME = """Backend engineer, five years of Python. Built REST APIs with FastAPI and Django,
+stored data in MongoDB and PostgreSQL, deployed with Docker. Python, FastAPI, MongoDB."""
+
+
+@pytest.fixture
+def index():
+    index = JobIndex()
+    index.sync(JOBS)
+    return index
+
+
+def test_tokenize_drops_stopwords_and_keeps_tech_terms():
+    assert tokenize("The C++ and C# developer, Node.js on AWS") == ["c++", "c#", "developer", "node.js", "aws"]
+
+
+def test_title_terms_outweigh_description_terms():
+    terms = job_terms(make_job("x", "Python Developer", "Some python scripting.", "Software"))
+    assert terms["python"] == 4.0
+    assert terms["scripting"] == 1.0
+
+
+def test_relevant_jobs_rank_above_irrelevant_ones(index):
+    ranked = index.rank(RESUME, 5)
+    ids = [job["id"] for job, _ in ranked]
+    # Title match first, a passing mention second, jobs sharing no terms not at all
+    assert ids == ["python", "react"]
+    assert ranked[0][1] > ranked[1][1] > 0
+
+
+def test_rank_limits_to_k_best(index):
+    assert [job["id"] for job, _ in index.rank(RESUME, 1)] == ["python"]
+
+
+@pytest.mark.parametrize("text", ["", "   ", "the and of", "astronaut zoology"])
+def test_rank_with_nothing_to_match_is_empty(index, text):
+    assert index.rank(text, 5) == []
+
+
+def test_empty_index_ranks_nothing():
+    assert JobIndex().rank(RESUME, 5) == []
+    assert JobIndex().search("python", 10) == ([], 0)
+
+
+def test_ties_keep_insertion_order_whatever_k():
+    index = JobIndex()
+    index.sync([make_job(f"job-{i}", "Python Developer") for i in range(30)])
+    for k in (1, 5, 29, 30, 40):
+        assert [job["id"] for job, _ in index.rank("python", k)] == [f"job-{i}" for i in range(min(k, 30))]
+    page, total = index.search("python", 5, offset=10)
+    assert total == 30
+    assert [job["id"] for job in page] == [f"job-{i}" for i in range(10, 15)]
+
+
+def test_rank_follows_updates_and_removals(index):
+    index.upsert(make_job("designer", "Python Designer", "Design tools in python.", "Software Development"))
+    index.remove("python")
+    assert [job["id"] for job, _ in index.rank("python", 5)] == ["designer", "react"]
+    assert index.rank("figma", 5) == []
+
+
+def test_resume_candidates_put_ranked_jobs_first_then_newest(index, monkeypatch):
+    monkeypatch.setattr(server, "job_index", index)
+    monkeypatch.setattr(server, "RESUME_MATCH_CANDIDATES", 4)
+    newest_first = JOBS[::-1]
+    candidates = server.resume_match_candidates(RESUME, newest_first)
+    assert [job["id"] for job in candidates] == ["python", "react", "sales", "designer"]
+    # Nothing to match: just the newest jobs
+    assert server.resume_match_candidates("", newest_first) == newest_first[:4]
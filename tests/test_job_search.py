@@ -0,0 +1,155 @@
+import pytest
+
+import server
+
+pytestmark = pytest.mark.anyio
+
+
+def job_payload(title, description="Work with a small friendly team on products used by many.", **fields):
+    return {
+        "title": title,
+        "description": description,
+        "category": "Software Development",
+        "country": "India",
+        "city": "Pune",
+        "location": "1 Main Street, Pune, India",
+        "fixed_salary": 50000,
+        **fields,
+    }
+
+
+@pytest.fixture
+async def employer(client, login):
+    _, auth = await login("Employer")
+
+    async def post(title, **fields):
+        response = await client.post("/api/job/post", json=job_payload(title, **fields), headers=auth)
+        assert response.status_code == 200, response.text
+        return response.json()
+
+    return post, auth
+
+
+async def search(client, q, **params):
+    response = await client.get("/api/job/search", params={"q": q, **params})
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def ids(page):
+    return [job["id"] for job in page["jobs"]]
+
+
+async def test_search_ranks_matches_and_skips_the_rest(client, employer):
+    post, _ = employer
+    python = await post("Python Developer", description="Build APIs in python with fastapi and mongodb.")
+    react = await post("React Engineer", description="Frontend in react, with a little python scripting.")
+    await post("Accountant", description="Bookkeeping, tax returns and monthly excel reports.")
+
+    page = await search(client, "python")
+    assert ids(page) == [python["id"], react["id"]]
+    assert page["total"] == 2
+    assert page["next_offset"] is None
+    assert set(page["jobs"][0]) == set(server.JobResponse.model_fields)
+
+
+async def test_search_pages_with_offset(client, employer):
+    post, _ = employer
+    posted = [await post(f"Python Developer {i}") for i in range(5)]
+
+    first = await search(client, "python", limit=2)
+    assert first["total"] == 5 and first["next_offset"] == 2
+    second = await search(client, "python", limit=2, offset=2)
+    last = await search(client, "python", limit=2, offset=4)
+    assert last["next_offset"] is None
+    assert sorted(ids(first) + ids(second) + ids(last)) == sorted(job["id"] for job in posted)
+
+
+async def test_last_word_matches_as_a_prefix(client, employer):
+    post, _ = employer
+    job = await post("Kubernetes Administrator")
+    assert ids(await search(client, "kuber")) == [job["id"]]
+    # A trailing space means the word is finished
+    assert ids(await search(client, "kuber ")) == []
+
+
+async def test_updates_and_deletes_reach_the_index(client, employer):
+    post, auth = employer
+    job = await post("Python Developer")
+    other = await post("Python Tester")
+
+    response = await client.put(f"/api/job/update/{job['id']}", json=job_payload("Golang Developer"), headers=auth)
+    assert response.status_code == 200
+    assert ids(await search(client, "golang")) == [job["id"]]
+    assert ids(await search(client, "python")) == [other["id"]]
+
+    assert (await client.delete(f"/api/job/delete/{other['id']}", headers=auth)).status_code == 200
+    assert (await search(client, "python"))["total"] == 0
+
+
+async def test_writes_from_other_workers_show_up_after_a_refresh(client, employer, database):
+    post, _ = employer
+    job = await post("Python Developer")
+    await database.jobs.update_one({"id": job["id"]}, {"$set": {"title": "Rust Developer"}})
+    await database.jobs.insert_one({**job_payload("Rust Engineer"), "id": "from-elsewhere", "expired": False,
+                                    "job_posted_on": server.utc_now(), "posted_by": "someone"})
+    # Another worker's write is seen once the catalog reloads (TTL or change stream)
+    server.job_catalog.invalidate()
+
+    assert sorted(ids(await search(client, "rust"))) == sorted([job["id"], "from-elsewhere"])
+    assert ids(await search(client, "python")) == []
+
+
+async def test_empty_query_is_rejected(client):
+    response = await client.get("/api/job/search", params={"q": ""})
+    assert response.status_code == 422
+
+
+class FakeTextSearch:
+    # Stands in for the jobs collection on the $text path, which mongomock lacks
+    def __init__(self, jobs):
+        self.jobs = self
+        self._jobs = jobs
+        self.queries = []
+
+    def find(self, query, projection):
+        self.queries.append(query)
+        jobs = self._jobs
+
+        class Cursor:
+            def sort(self, *args):
+                return self
+
+            def skip(self, offset):
+                self.offset = offset
+                return self
+
+            def limit(self, limit):
+                self.count = limit
+                return self
+
+            async def to_list(self, length):
+                return [dict(job) for job in jobs[self.offset:self.offset + self.count]]
+
+        return Cursor()
+
+    async def count_documents(self, query):
+        self.queries.append(query)
+        return len(self._jobs)
+
+
+@pytest.mark.parametrize("setting", [("JOB_SEARCH_BACKEND", "mongo"), ("JOB_CATALOG_ENABLED", False)])
+async def test_mongo_text_search_fallback(client, employer, monkeypatch, setting):
+    post, _ = employer
+    jobs = [await post(f"Python Developer {i}") for i in range(3)]
+    for job in jobs:
+        job["job_posted_on"] = server.utc_now()
+    fake = FakeTextSearch(jobs)
+    monkeypatch.setattr(server, "read_db", fake)
+    monkeypatch.setattr(server, *setting)
+
+    page = await search(client, "python", limit=2)
+    assert fake.queries[0] == {"$text": {"$search": "python"}, "expired": False}
+    assert ids(page) == [job["id"] for job in jobs[:2]]
+    assert page["total"] == 3
+    assert page["next_offset"] == 2
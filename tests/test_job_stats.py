@@ -0,0 +1,129 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from job_stats import bucket_key, employer_dashboard, hour_of, rebuild_job_stats, recent_count, record_application
+
+pytestmark = pytest.mark.anyio
+
+NOW = datetime(2026, 3, 10, 12, 30, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+async def db():
+    mongomock_motor = pytest.importorskip("mongomock_motor")
+    db = mongomock_motor.AsyncMongoMockClient(tz_aware=True)["test"]
+    await db.job_stats.create_index("job_id", unique=True)
+    return db
+
+
+def application(job_id="job-1", created_at=NOW, status="pending"):
+    return {"job_id": job_id, "employer_id": {"user": "emp-1"}, "created_at": created_at, "status": status}
+
+
+async def stats_for(db, job_id="job-1"):
+    return await db.job_stats.find_one({"job_id": job_id}, {"_id": 0})
+
+
+def test_recent_count_ignores_stale_buckets():
+    current = hour_of(NOW)
+    stats = {"hourly": {
+        bucket_key(current): {"h": current, "n": 2},
+        bucket_key(current - 5): {"h": current - 5, "n": 3},
+        bucket_key(current - 30): {"h": current - 30, "n": 7},
+    }}
+    assert recent_count(stats, NOW) == 5
+
+
+def test_hour_of_treats_naive_datetimes_as_utc():
+    assert hour_of(NOW.replace(tzinfo=None)) == hour_of(NOW)
+
+
+async def test_record_application_counts_by_status_and_hour(db):
+    await record_application(db, application())
+    await record_application(db, application(status="accepted"))
+    await record_application(db, application(created_at=NOW - timedelta(hours=2)))
+
+    stats = await stats_for(db)
+    assert stats["employer_id"] == "emp-1"
+    assert stats["total"] == 3
+    assert stats["by_status"] == {"pending": 2, "accepted": 1}
+    assert stats["hourly"][bucket_key(hour_of(NOW))] == {"h": hour_of(NOW), "n": 2}
+    assert recent_count(stats, NOW) == 3
+
+
+async def test_record_application_resets_a_bucket_from_a_previous_day(db):
+    await record_application(db, application(created_at=NOW - timedelta(days=1)))
+    await record_application(db, application())
+
+    stats = await stats_for(db)
+    assert stats["total"] == 2
+    assert stats["hourly"] == {bucket_key(hour_of(NOW)): {"h": hour_of(NOW), "n": 1}}
+
+
+async def test_removing_an_application_decrements_its_counters(db):
+    old = application(created_at=NOW - timedelta(days=1))
+    await record_application(db, old)
+    await record_application(db, application())
+    await record_application(db, application(), delta=-1)
+    # Its bucket has been reclaimed by today's application; only the totals move
+    await record_application(db, old, delta=-1)
+
+    stats = await stats_for(db)
+    assert stats["total"] == 0
+    assert stats["by_status"] == {"pending": 0}
+    assert stats["hourly"][bucket_key(hour_of(NOW))]["n"] == 0
+
+
+async def test_applications_without_a_job_are_not_counted(db):
+    await record_application(db, application(job_id=None))
+    assert await db.job_stats.count_documents({}) == 0
+
+
+async def test_rebuild_matches_the_incremental_counters(db):
+    # In the order they were made, as record_application sees them
+    applications = [
+        application(created_at=NOW - timedelta(days=3)),
+        application(created_at=NOW - timedelta(hours=3)),
+        application(),
+        application(status="rejected"),
+        application(job_id="job-2"),
+    ]
+    for item in applications:
+        await db.applications.insert_one(dict(item))
+        await record_application(db, item)
+    incremental = {doc["job_id"]: doc async for doc in db.job_stats.find({}, {"_id": 0})}
+
+    await db.job_stats.delete_many({})
+    assert await rebuild_job_stats(db, now=NOW) == 2
+    rebuilt = {doc["job_id"]: doc async for doc in db.job_stats.find({}, {"_id": 0})}
+
+    for job_id in ("job-1", "job-2"):
+        assert rebuilt[job_id]["total"] == incremental[job_id]["total"]
+        assert rebuilt[job_id]["by_status"] == incremental[job_id]["by_status"]
+        assert recent_count(rebuilt[job_id], NOW) == recent_count(incremental[job_id], NOW)
+
+
+async def test_rebuild_drops_counters_for_jobs_without_applications(db):
+    await db.job_stats.insert_one({"job_id": "gone", "total": 4})
+    await db.applications.insert_one(application())
+
+    await rebuild_job_stats(db, job_id="gone", now=NOW)
+    assert await stats_for(db, "gone") is None
+    await rebuild_job_stats(db, now=NOW)
+    assert (await stats_for(db))["total"] == 1
+
+
+async def test_employer_dashboard_joins_jobs_and_counters(db):
+    await db.jobs.insert_many([
+        {"id": "job-1", "title": "Old", "posted_by": "emp-1", "expired": False, "job_posted_on": NOW - timedelta(days=2)},
+        {"id": "job-2", "title": "New", "posted_by": "emp-1", "expired": False, "job_posted_on": NOW},
+        {"id": "job-3", "title": "Other", "posted_by": "emp-2", "expired": False, "job_posted_on": NOW},
+    ])
+    await record_application(db, application())
+
+    dashboard = await employer_dashboard(db, "emp-1", NOW)
+    assert [row["id"] for row in dashboard] == ["job-2", "job-1"]
+    assert dashboard[0]["applications"] == {"total": 0, "last_24h": 0, "by_status": {}}
+    assert dashboard[1]["applications"] == {"total": 1, "last_24h": 1, "by_status": {"pending": 1}}
+    assert all("stats" not in row for row in dashboard)
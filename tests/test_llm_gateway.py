@@ -0,0 +1,138 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+
+from llm_gateway import LLMGateway
+
+pytestmark = pytest.mark.anyio
+
+
+class FakeCompletions:
+    # Holds every call until release() so tests can fill the gateway up
+    def __init__(self):
+        self.calls = []
+        self.gate = asyncio.Event()
+
+    async def create(self, **kwargs):
+        self.calls.append(kwargs)
+        await self.gate.wait()
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=f"reply {len(self.calls)}"))],
+            usage=SimpleNamespace(prompt_tokens=5, completion_tokens=5, total_tokens=10),
+        )
+
+    def release(self):
+        self.gate.set()
+
+
+def make_gateway(**options):
+    completions = FakeCompletions()
+    gateway = LLMGateway(lambda: SimpleNamespace(chat=SimpleNamespace(completions=completions)), **options)
+    return gateway, completions
+
+
+def request(text="hello", max_tokens=10):
+    return {"model": "test", "messages": [{"role": "user", "content": text}], "max_tokens": max_tokens}
+
+
+async def settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+async def test_calls_past_max_concurrency_queue_until_a_slot_frees():
+    gateway, completions = make_gateway(max_concurrency=2, user_concurrency=10)
+    tasks = [asyncio.create_task(gateway.complete(f"user-{i}", **request(f"q{i}"))) for i in range(3)]
+    await settle()
+    assert len(completions.calls) == 2
+    assert gateway.stats()["queued"] == 1
+
+    completions.release()
+    assert len(await asyncio.gather(*tasks)) == 3
+    assert gateway.stats()["admitted"] == 3
+    assert gateway.stats()["in_flight"] == 0
+
+
+async def test_full_queue_is_rejected_with_503_and_retry_after():
+    gateway, completions = make_gateway(max_concurrency=1, max_queue=1, user_concurrency=10)
+    tasks = [asyncio.create_task(gateway.complete(f"user-{i}", **request(f"q{i}"))) for i in range(2)]
+    await settle()
+    with pytest.raises(HTTPException) as raised:
+        await gateway.complete("user-x", **request("one too many"))
+    assert raised.value.status_code == 503
+    assert "Retry-After" in raised.value.headers
+    assert gateway.rejected_queue_full == 1
+    completions.release()
+    await asyncio.gather(*tasks)
+
+
+async def test_queue_wait_is_bounded_by_the_timeout():
+    gateway, completions = make_gateway(max_concurrency=1, queue_timeout_seconds=0.05, user_concurrency=10)
+    first = asyncio.create_task(gateway.complete("user-1", **request("first")))
+    await settle()
+    with pytest.raises(HTTPException) as raised:
+        await gateway.complete("user-2", **request("second"))
+    assert raised.value.status_code == 503
+    assert gateway.rejected_timeout == 1
+    assert gateway.stats()["queued"] == 0
+    completions.release()
+    await first
+
+
+async def test_per_user_limit_answers_429():
+    gateway, completions = make_gateway(max_concurrency=10, user_concurrency=1)
+    first = asyncio.create_task(gateway.complete("user-1", **request("first")))
+    await settle()
+    with pytest.raises(HTTPException) as raised:
+        await gateway.complete("user-1", **request("second"))
+    assert raised.value.status_code == 429
+    # Background work (no user) and other users are unaffected
+    others = [
+        asyncio.create_task(gateway.complete(None, **request("summary"))),
+        asyncio.create_task(gateway.complete("user-2", **request("other"))),
+    ]
+    await settle()
+    assert len(completions.calls) == 3
+    completions.release()
+    await asyncio.gather(first, *others)
+    assert gateway.stats()["rejected_user"] == 1
+
+
+async def test_token_budget_rejects_calls_it_cannot_cover_in_time():
+    gateway, completions = make_gateway(tokens_per_minute=100, queue_timeout_seconds=1)
+    completions.release()
+    with pytest.raises(HTTPException) as raised:
+        await gateway.complete("user-1", **request("big", max_tokens=1000))
+    assert raised.value.status_code == 429
+    assert gateway.rejected_budget == 1
+    # The rejected reservation was refunded, so a call that fits still goes through
+    assert await gateway.complete("user-1", **request("small", max_tokens=10))
+
+
+async def test_identical_concurrent_requests_share_one_upstream_call():
+    gateway, completions = make_gateway(user_concurrency=10)
+    tasks = [asyncio.create_task(gateway.complete(f"user-{i}", **request("same question"))) for i in range(3)]
+    await settle()
+    completions.release()
+    replies = await asyncio.gather(*tasks)
+    assert len(completions.calls) == 1
+    assert set(replies) == {"reply 1"}
+    assert gateway.coalesced == 2
+
+
+async def test_client_is_built_on_first_call_only():
+    built = []
+    completions = FakeCompletions()
+    completions.release()
+
+    def factory():
+        built.append(True)
+        return SimpleNamespace(chat=SimpleNamespace(completions=completions))
+
+    gateway = LLMGateway(factory)
+    assert built == [] and gateway.stats()["client_loaded"] is False
+    await gateway.complete("user-1", **request())
+    await gateway.complete("user-1", **request("again"))
+    assert built == [True]
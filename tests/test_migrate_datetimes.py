@@ -0,0 +1,42 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from migrate_datetimes import MIGRATION_ID, migrate_datetimes
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def db():
+    mongomock_motor = pytest.importorskip("mongomock_motor")
+    return mongomock_motor.AsyncMongoMockClient(tz_aware=True)["test"]
+
+
+async def test_string_timestamps_become_dates_and_completion_is_recorded(db):
+    await db.jobs.insert_one({"id": "a", "job_posted_on": "2024-01-02T03:04:05"})
+    await db.users.insert_one({"id": "u", "created_at": "2024-01-02T03:04:05+00:00"})
+    await migrate_datetimes(db)
+
+    job = await db.jobs.find_one({"id": "a"})
+    assert job["job_posted_on"] == datetime(2024, 1, 2, 3, 4, 5, tzinfo=timezone.utc)
+    marker = await db.migrations.find_one({"_id": MIGRATION_ID})
+    assert marker["converted"] == 2
+
+
+async def test_later_boots_skip_the_scan_unless_forced(db):
+    await migrate_datetimes(db)
+    await db.jobs.insert_one({"id": "late", "job_posted_on": "2024-01-02T03:04:05"})
+
+    await migrate_datetimes(db)
+    assert isinstance((await db.jobs.find_one({"id": "late"}))["job_posted_on"], str)
+
+    await migrate_datetimes(db, force=True)
+    assert isinstance((await db.jobs.find_one({"id": "late"}))["job_posted_on"], datetime)
+
+
+async def test_dry_run_changes_nothing(db):
+    await db.jobs.insert_one({"id": "a", "job_posted_on": "2024-01-02T03:04:05"})
+    await migrate_datetimes(db, dry_run=True)
+    assert isinstance((await db.jobs.find_one({"id": "a"}))["job_posted_on"], str)
+    assert await db.migrations.find_one({"_id": MIGRATION_ID}) is None
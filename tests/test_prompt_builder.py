@@ -0,0 +1,108 @@
+import pytest
+
+import server
+from prompt_builder import MESSAGE_OVERHEAD_TOKENS, PromptBuilder, count_tokens, truncate_to_tokens
+
+
+def prompt_tokens(messages):
+    return sum(count_tokens(message["content"]) + MESSAGE_OVERHEAD_TOKENS for message in messages)
+
+
+def make_jobs(count, description_words=200):
+    return [
+        {
+            "id": f"job-{i}", "title": f"Senior Python Developer {i}", "category": "IT",
+            "city": "Pune", "country": "India",
+            "description": " ".join(f"fastapi{i} mongodb kubernetes" for _ in range(description_words)),
+        }
+        for i in range(count)
+    ]
+
+
+def make_resume(lines):
+    return "\n".join(f"Built service number {i} with Python, FastAPI and MongoDB for a large client" for i in range(lines))
+
+
+def test_truncate_to_tokens():
+    text = "one two three four five six seven eight nine ten " * 20
+    truncated = truncate_to_tokens(text, 25)
+    assert count_tokens(truncated) <= 25
+    assert text.startswith(truncated)
+    assert truncate_to_tokens("short text", 100) == "short text"
+    assert truncate_to_tokens("anything", 0) == ""
+
+
+def test_reserve_counts_against_the_budget():
+    builder = PromptBuilder(100)
+    builder.reserve("system", "You are helpful.")
+    assert builder.used_tokens == count_tokens("You are helpful.") + MESSAGE_OVERHEAD_TOKENS
+    assert builder.remaining_tokens == 100 - builder.used_tokens
+
+
+def test_reserve_past_the_budget_leaves_nothing_to_add():
+    builder = PromptBuilder(5)
+    builder.reserve("system", "word " * 50)
+    assert builder.remaining_tokens == 0
+    assert builder.add("jobs", ["a job"]) == []
+
+
+def test_add_takes_whole_items_in_order_until_the_budget_runs_out():
+    builder = PromptBuilder(50)
+    items = [f"item number {i} is here" for i in range(20)]
+    chosen = builder.add("items", items)
+    assert chosen == items[:len(chosen)]
+    assert 0 < len(chosen) < len(items)
+    assert builder.used_tokens <= 50
+
+
+def test_add_respects_its_own_cap():
+    builder = PromptBuilder(1000)
+    builder.add("jobs", ["some job line here"] * 100, max_tokens=40)
+    assert builder.sections["jobs"] <= 40
+    assert builder.remaining_tokens >= 960
+
+
+def test_truncate_last_fills_the_remaining_space():
+    builder = PromptBuilder(30)
+    chosen = builder.add("resume", ["short line", "a much longer line " * 30], truncate_last=True)
+    assert len(chosen) == 2
+    assert chosen[1].startswith("a much longer line")
+    assert len(chosen[1]) < len("a much longer line " * 30)
+    assert builder.used_tokens <= 30
+
+
+@pytest.mark.parametrize("budget", [2500, 800])
+@pytest.mark.parametrize("jobs, resume_lines", [(0, 0), (3, 5), (20, 10), (20, 2000)])
+def test_resume_analysis_prompt_stays_within_budget(monkeypatch, budget, jobs, resume_lines):
+    monkeypatch.setattr(server, "RESUME_PROMPT_TOKEN_BUDGET", budget)
+    messages = server.build_resume_analysis_messages(make_resume(resume_lines), make_jobs(jobs))
+    assert prompt_tokens(messages) <= server.RESUME_PROMPT_TOKEN_BUDGET
+
+
+def test_resume_analysis_prompt_keeps_best_jobs_first():
+    prompt = server.build_resume_analysis_messages(make_resume(2000), make_jobs(60))[1]["content"]
+    assert "Senior Python Developer 0 " in prompt
+    assert "Senior Python Developer 59 " not in prompt
+
+
+@pytest.mark.parametrize("budget", [3000, 600])
+@pytest.mark.parametrize("turns, summary_words, resume_lines", [(0, 0, 0), (4, 50, 5), (40, 2000, 2000)])
+def test_chat_prompt_stays_within_budget(monkeypatch, budget, turns, summary_words, resume_lines):
+    monkeypatch.setattr(server, "CHAT_PROMPT_TOKEN_BUDGET", budget)
+    session = {"resume_text": make_resume(resume_lines)}
+    if summary_words:
+        session["summary"] = "The user asked about roles " * summary_words
+    history = [
+        {"role": "user" if i % 2 == 0 else "assistant", "content": f"Message {i} " + "about jobs in Pune " * 60}
+        for i in range(turns)
+    ]
+    messages = server.build_chat_messages(session, history, make_jobs(20), "Which of these suits me best?")
+    assert prompt_tokens(messages) <= server.CHAT_PROMPT_TOKEN_BUDGET
+    assert messages[-1] == {"role": "user", "content": "Which of these suits me best?"}
+
+
+def test_chat_prompt_drops_oldest_turns_first():
+    history = [{"role": "user", "content": f"Turn {i} " + "word " * 300} for i in range(40)]
+    messages = server.build_chat_messages({}, history, [], "Next question")
+    kept = [message["content"] for message in messages[1:-1]]
+    assert kept and kept == [message["content"] for message in history[-len(kept):]]
@@ -0,0 +1,66 @@
+import httpx
+import pytest
+from fastapi import FastAPI, File, UploadFile
+
+from resume_storage import RequestSizeLimitMiddleware
+
+pytestmark = pytest.mark.anyio
+
+LIMIT = 64 * 1024
+BOUNDARY = "limit-test"
+
+
+def make_app(received):
+    app = FastAPI()
+
+    @app.post("/upload")
+    async def upload(resume: UploadFile = File(...)):
+        received.append(len(await resume.read()))
+        return {"ok": True}
+
+    app.add_middleware(RequestSizeLimitMiddleware, max_bytes=LIMIT, paths=["/upload"])
+    return app
+
+
+def multipart(size: int) -> bytes:
+    return (
+        f'--{BOUNDARY}\r\nContent-Disposition: form-data; name="resume"; filename="cv.pdf"\r\n'
+        f"Content-Type: application/pdf\r\n\r\n"
+    ).encode() + b"x" * size + f"\r\n--{BOUNDARY}--\r\n".encode()
+
+
+async def chunked(body: bytes, chunk: int = 8192):
+    # An async iterable body goes out without a Content-Length
+    for start in range(0, len(body), chunk):
+        yield body[start:start + chunk]
+
+
+async def post(app, content, headers=None):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        return await client.post(
+            "/upload", content=content,
+            headers={"Content-Type": f"multipart/form-data; boundary={BOUNDARY}", **(headers or {})},
+        )
+
+
+async def test_declared_length_over_the_limit_is_rejected_up_front():
+    received = []
+    response = await post(make_app(received), multipart(LIMIT * 2))
+    assert response.status_code == 413
+    assert received == []
+
+
+async def test_chunked_body_over_the_limit_is_rejected_while_streaming():
+    received = []
+    response = await post(make_app(received), chunked(multipart(LIMIT * 4)))
+    assert response.status_code == 413
+    assert response.json() == {"detail": "Uploaded file is too large"}
+    assert received == []
+
+
+async def test_chunked_body_under_the_limit_goes_through():
+    received = []
+    response = await post(make_app(received), chunked(multipart(LIMIT // 2)))
+    assert response.status_code == 200
+    assert received == [LIMIT // 2]
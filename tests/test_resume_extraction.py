@@ -0,0 +1,76 @@
+import asyncio
+import time
+
+import pytest
+
+import resume_extraction
+from resume_extraction import ExtractionTimeout, ResumeExtractor
+
+pytestmark = pytest.mark.anyio
+
+
+# Module-level so the spawned pool workers can import them
+def quick(content, max_pages, max_chars, timeout_seconds):
+    return content.decode()[:max_chars]
+
+
+def slow(content, max_pages, max_chars, timeout_seconds):
+    time.sleep(float(content))
+    return "done"
+
+
+def hang(content, max_pages, max_chars, timeout_seconds):
+    time.sleep(60)
+
+
+@pytest.fixture
+def extractor(monkeypatch):
+    monkeypatch.setitem(resume_extraction.EXTRACTORS, "quick", quick)
+    monkeypatch.setitem(resume_extraction.EXTRACTORS, "slow", slow)
+    monkeypatch.setitem(resume_extraction.EXTRACTORS, "hang", hang)
+    extractor = ResumeExtractor(max_workers=1, max_chars=5, timeout_seconds=1.0, grace_seconds=0.5)
+    yield extractor
+    extractor.shutdown()
+
+
+async def test_quick_extraction_respects_max_chars(extractor):
+    assert await extractor.extract("quick", b"hello world") == "hello"
+
+
+async def test_time_limit_starts_when_the_job_reaches_a_worker(extractor):
+    # Start the pool first so process start-up is not part of either job
+    await extractor.extract("quick", b"warm")
+    # One worker: the second job queues for ~1s, longer than what is left of its limit if that counted
+    results = await asyncio.gather(extractor.extract("slow", b"1.0"), extractor.extract("slow", b"1.0"))
+    assert results == ["done", "done"]
+    assert extractor.timeouts == 0
+
+
+async def test_hung_workers_are_killed_and_the_pool_keeps_serving(extractor):
+    for _ in range(2):
+        with pytest.raises(ExtractionTimeout):
+            await extractor.extract("hang", b"")
+    assert extractor.timeouts == 2
+    assert extractor.pool_restarts == 2
+    assert await extractor.extract("quick", b"after") == "after"
+
+
+async def test_jobs_killed_with_a_hung_worker_are_retried(monkeypatch):
+    monkeypatch.setitem(resume_extraction.EXTRACTORS, "quick", quick)
+    monkeypatch.setitem(resume_extraction.EXTRACTORS, "slow", slow)
+    monkeypatch.setitem(resume_extraction.EXTRACTORS, "hang", hang)
+    extractor = ResumeExtractor(max_workers=2, timeout_seconds=1.0, grace_seconds=0.5)
+    try:
+        await asyncio.gather(extractor.extract("quick", b"warm"), extractor.extract("quick", b"warm"))
+
+        async def slow_after_delay():
+            # Still running in the other worker when the hung one is killed, 1.5s in
+            await asyncio.sleep(1.0)
+            return await extractor.extract("slow", b"0.8")
+
+        hung, finished = await asyncio.gather(extractor.extract("hang", b""), slow_after_delay(), return_exceptions=True)
+        assert isinstance(hung, ExtractionTimeout)
+        assert finished == "done"
+        assert extractor.pool_restarts == 1
+    finally:
+        extractor.shutdown()
@@ -0,0 +1,86 @@
+import os
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+import server
+from fake_cloudinary import FakeCloudinaryUploader
+from resume_storage import PendingUploadSweeper
+
+pytestmark = pytest.mark.anyio
+
+NOW = datetime(2026, 3, 10, 12, 0, tzinfo=timezone.utc)
+
+
+def application(app_id, status, minutes_ago):
+    return {"id": app_id, "resume": {"public_id": None, "url": None, "status": status},
+            "created_at": NOW - timedelta(minutes=minutes_ago)}
+
+
+async def test_sweeper_fails_only_stale_pending_uploads(database):
+    await database.applications.insert_many([
+        application("stale", "pending", 60), application("recent", "pending", 5),
+        application("done", "uploaded", 60), application("failed", "failed", 60),
+    ])
+    sweeper = PendingUploadSweeper(database, stale_seconds=15 * 60)
+
+    assert await sweeper.run_once(NOW) == 1
+    statuses = {doc["id"]: doc["resume"]["status"] async for doc in database.applications.find()}
+    assert statuses == {"stale": "failed", "recent": "pending", "done": "uploaded", "failed": "failed"}
+    assert await sweeper.run_once(NOW) == 0
+    assert sweeper.stats()["failed"] == 1
+
+
+@pytest.fixture
+def background_mode(monkeypatch):
+    monkeypatch.setattr(server, "RESUME_UPLOAD_MODE", "background")
+    backend = FakeCloudinaryUploader()
+    monkeypatch.setattr(server.resume_uploader, "backend", backend)
+    spooled = []
+    spool = server.spool_upload_to_disk
+
+    def spool_and_record(upload):
+        spooled.append(spool(upload))
+        return spooled[-1]
+
+    monkeypatch.setattr(server, "spool_upload_to_disk", spool_and_record)
+    return backend, spooled
+
+
+async def apply(client, auth):
+    return await client.post(
+        "/api/application/post",
+        data={"name": "Jane Doe", "email": "jane@example.com", "cover_letter": "Hello", "phone": "123",
+              "address": "Pune", "employer_id": "employer-1"},
+        files={"resume": ("cv.pdf", b"%PDF-1.4 resume", "application/pdf")},
+        headers=auth,
+    )
+
+
+async def test_background_upload_completes_and_removes_the_copy(client, login, database, background_mode):
+    backend, spooled = background_mode
+    _, auth = await login("Job Seeker")
+
+    response = await apply(client, auth)
+    assert response.status_code == 200, response.text
+    assert response.json()["resume_status"] == "pending"
+
+    # The background task has run by the time the ASGI call returns
+    saved = await database.applications.find_one({"id": response.json()["application_id"]})
+    assert saved["resume"]["status"] == "uploaded"
+    assert list(backend.files.values()) == [b"%PDF-1.4 resume"]
+    assert not os.path.exists(spooled[0])
+
+
+async def test_failed_insert_removes_the_spooled_copy(client, login, database, background_mode, monkeypatch):
+    _, spooled = background_mode
+    _, auth = await login("Job Seeker")
+
+    async def broken(db, application, delta=1):
+        raise RuntimeError("counters unavailable")
+
+    monkeypatch.setattr(server, "record_application", broken)
+    with pytest.raises(RuntimeError):
+        await apply(client, auth)
+    assert len(spooled) == 1
+    assert not os.path.exists(spooled[0])
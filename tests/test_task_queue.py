@@ -0,0 +1,125 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi import HTTPException
+
+from task_queue import TaskQueue
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def collection():
+    mongomock_motor = pytest.importorskip("mongomock_motor")
+    return mongomock_motor.AsyncMongoMockClient(tz_aware=True)["test"].resume_tasks
+
+
+def make_queue(collection, handler, **options):
+    options = {"workers": 1, "max_attempts": 3, "lease_seconds": 30, "retry_base_seconds": 0.01, "poll_seconds": 0.01, **options}
+    return TaskQueue(collection, handler, **options)
+
+
+async def wait_for_status(queue, task_id, statuses=("succeeded", "failed"), timeout=2.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while True:
+        task = await queue.get(task_id)
+        if task["status"] in statuses or asyncio.get_running_loop().time() > deadline:
+            return task
+        await asyncio.sleep(0.01)
+
+
+async def test_task_runs_and_keeps_only_the_result(collection):
+    async def handler(task):
+        return {"echo": task["payload"]["text"]}
+
+    queue = make_queue(collection, handler)
+    queue.start()
+    try:
+        task = await queue.submit({"payload": {"text": "hi"}})
+        done = await wait_for_status(queue, task["id"])
+    finally:
+        await queue.stop()
+    assert done["status"] == "succeeded"
+    assert done["result"] == {"echo": "hi"}
+    assert "payload" not in await collection.find_one({"id": task["id"]})
+
+
+async def test_retryable_failures_are_retried_up_to_max_attempts(collection):
+    calls = []
+
+    async def handler(task):
+        calls.append(task["attempts"])
+        raise HTTPException(status_code=503, detail="busy")
+
+    queue = make_queue(collection, handler)
+    queue.start()
+    try:
+        task = await queue.submit({"payload": {}})
+        done = await wait_for_status(queue, task["id"])
+    finally:
+        await queue.stop()
+    assert done["status"] == "failed"
+    assert calls == [1, 2, 3]
+
+
+async def test_client_errors_fail_without_retrying(collection):
+    calls = []
+
+    async def handler(task):
+        calls.append(task["attempts"])
+        raise HTTPException(status_code=400, detail="Unsupported file")
+
+    queue = make_queue(collection, handler)
+    queue.start()
+    try:
+        task = await queue.submit({"payload": {}})
+        done = await wait_for_status(queue, task["id"])
+    finally:
+        await queue.stop()
+    assert (done["status"], done["error"], calls) == ("failed", "Unsupported file", [1])
+
+
+async def lapsed_task(collection, attempts):
+    now = datetime.now(timezone.utc)
+    await collection.insert_one({
+        "id": f"lapsed-{attempts}", "status": "running", "attempts": attempts, "worker_id": "dead-worker",
+        "available_at": now - timedelta(minutes=5), "lease_expires_at": now - timedelta(seconds=1),
+        "payload": {}, "created_at": now, "updated_at": now,
+    })
+    return f"lapsed-{attempts}"
+
+
+async def test_lapsed_lease_is_reclaimed_while_attempts_remain(collection):
+    task_id = await lapsed_task(collection, attempts=1)
+    queue = make_queue(collection, handler=None)
+    claimed = await queue._claim()
+    assert claimed["id"] == task_id
+    assert claimed["attempts"] == 2
+    assert queue.reclaimed == 1
+
+
+async def test_lapsed_lease_on_the_last_attempt_is_failed_not_reclaimed(collection):
+    task_id = await lapsed_task(collection, attempts=3)
+    queue = make_queue(collection, handler=None)
+    assert await queue._claim() is None
+    assert await queue._fail_abandoned() == 1
+    task = await queue.get(task_id)
+    assert task["status"] == "failed"
+    assert "lease_expires_at" not in task
+    assert queue.stats()["abandoned"] == 1
+
+
+async def test_idle_workers_sweep_abandoned_tasks(collection):
+    task_id = await lapsed_task(collection, attempts=3)
+
+    async def handler(task):
+        return {}
+
+    queue = make_queue(collection, handler)
+    queue.start()
+    try:
+        task = await wait_for_status(queue, task_id)
+    finally:
+        await queue.stop()
+    assert task["status"] == "failed"